@@ -1,7 +1,20 @@
+import logging
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from config import LOG_LEVEL
 from routes.upload import router as upload_router
 from routes.analyze import router as analyze_router
 from routes.pdf import router as pdf_router
+from routes.results import router as results_router
+from services.llm_service import call_scheduler, llm_memo, model_cascade, token_ledger
+from services.pdf_service import pdf_reports
+from services.resume_service import analysis_jobs
+from shared.telemetry import telemetry
+
+logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+# Only the backend's own modules log at LOG_LEVEL; libraries keep the WARNING default
+for name in ("services", "shared"):
+    logging.getLogger(name).setLevel(LOG_LEVEL)
 
 app = FastAPI()
 
@@ -9,7 +22,36 @@ app = FastAPI()
 app.include_router(upload_router)
 app.include_router(analyze_router)
 app.include_router(pdf_router)
+app.include_router(results_router)
+
+# Existing stats, exported as gauges alongside the telemetry spans
+telemetry.metrics.add_collector("analysis_jobs", analysis_jobs.metrics)
+telemetry.metrics.add_collector("pdf_reports", pdf_reports.stats)
+telemetry.metrics.add_collector("llm_scheduler", call_scheduler.stats)
+telemetry.metrics.add_collector("llm_tokens", token_ledger.summary)
+telemetry.metrics.add_collector("model_cascade", model_cascade.stats)
+if llm_memo is not None:
+    telemetry.metrics.add_collector("llm_memo", llm_memo.stats)
+
+@app.on_event("startup")
+def start_analysis_workers():
+    # Also re-queues jobs left unfinished by a previous run
+    analysis_jobs.start()
+
+@app.on_event("shutdown")
+def stop_analysis_workers():
+    analysis_jobs.stop(timeout=5)
+    pdf_reports.close()
 
 @app.get("/")
 def home():
     return {"message": "Welcome to the Resume Analysis API!"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus metrics: span durations (PDF extraction, LLM calls, response
+    parsing and validation, pipeline stages, whole analyses), LLM token counts
+    and retries, and the job queue, report renderer and LLM client stats.
+    """
+    return PlainTextResponse(telemetry.metrics.render(), media_type="text/plain; version=0.0.4")
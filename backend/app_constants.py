@@ -23,6 +23,17 @@ TMP_DIR = Path(__file__).resolve().parent.joinpath("data", "tmp")
 
 #  2. PROMPT TEMPLATES
 
+# Every prompt starts with the resume and then the template's instructions,
+# so all calls for one resume share an identical prefix that provider-side
+# prompt caching can reuse. Templates therefore never embed the resume.
+RESUME_PREFIX = """You are an expert recruiter reviewing the resume delimited by <resume></resume>.
+
+<resume>
+{resume}
+</resume>
+
+"""
+
 templates = {}
 
 # 2.1 Contact information Section
@@ -99,6 +110,11 @@ templates[
 1. Rate the quality of the Education section by giving an integer score from 0 to 100. 
 2. Evaluate (in three sentences and in {language}) the quality of the Education section.
 3. Format your response as a dictionary with the following keys: score__edu, evaluation__edu.
+
+Education extracted from the resume:
+<education>
+{education}
+</education>
 """
 
 # 2.6. Skills
@@ -114,6 +130,11 @@ templates[
 1. Rate the quality of the Skills section by giving an integer score from 0 to 100.
 2. Evaluate (in three sentences and in {language}) the quality of the Skills section.
 3. Format your response as a dictionary with the following keys: score__skills, evaluation__skills.
+
+Skills extracted from the resume:
+<skills>
+{skills}
+</skills>
 """
 
 # 2.7. Languages
@@ -133,6 +154,11 @@ templates[
 1. Rate the quality of the language section by giving an integer score from 0 to 100.
 2. Evaluate (in three sentences and in {language}) the quality of the language section.
 3. Format your response as a dictionary with the following keys: score__language,evaluation__language.
+
+Languages extracted from the resume:
+<languages>
+{languages}
+</languages>
 """
 
 # 2.8. Certifications
@@ -158,13 +184,35 @@ templates[
 1. Rate the certifications by giving an integer score from 0 to 100.
 2. Evaluate (in three sentences and in {language}) the certifications and the quality of the text.
 3. Format your response as a dictionary with the following keys: score__certif,evaluation__certif.
+
+Certifications extracted from the resume:
+<certifications>
+{certifications}
+</certifications>
 """
 
 
+# 2.9. Resume section each template needs when LLM_SHARED_RESUME_PREFIX is off;
+# templates not listed get the full resume text
+template_sections = {
+    "Contact__information": "Contact Information",
+    "CV__summary": "Professional Summary",
+    "Work__experience": "Work Experience",
+    "CV__Projects": "Projects",
+    "CV__Education": "Education",
+    "Education__evaluation": "Education",
+    "candidate__skills": "Skills",
+    "Skills__evaluation": "Skills",
+    "CV__Languages": "Languages",
+    "Languages__evaluation": "Languages",
+    "CV__Certifications": "Certifications",
+    "Certif__evaluation": "Certifications",
+}
+
+
 # 3. PROMPTS
 
-PROMPT_IMPROVE_SUMMARY = """Your are given a resume (delimited by <resume></resume>) \
-and a summary (delimited by <summary></summary>).
+PROMPT_IMPROVE_SUMMARY = """You are given the summary of the resume above (delimited by <summary></summary>).
 1. In {language}, evaluate the summary (format and content) .
 2. Rate the summary by giving an integer score from 0 to 100. \
 If the summary is "unknown", the score is 0.
@@ -176,10 +224,6 @@ Please include: years of experience, top skills and experiences, some of the big
 <summary>
 {summary}
 </summary>
-------
-<resume>
-{resume}
-</resume>
 """
 
 PROMPT_IMPROVE_WORK_EXPERIENCE = """you are given a work experience text delimited by triple backticks.
@@ -204,7 +248,7 @@ Format your text as a string in {language}.
 project text: ```{text}```
 """
 
-PROMPT_EVALUATE_RESUME = """You are given a resume delimited by triple backticks. 
+PROMPT_EVALUATE_RESUME = """Evaluate the resume above.
 1. Provide an overview of the resume in {language}.
 2. Provide a comprehensive analysis of the three main strengths of the resume in {language}. \
 Format the top 3 strengths as string containg three bullet points.
@@ -213,6 +257,12 @@ Format the top 3 weaknesses as string containg three bullet points.
 4. Format your response as a dictionary with the following keys: resume_cv_overview, top_3_strengths, top_3_weaknesses.
 
 The strengths and weaknesses lie in the format, style and content of the resume.
-
-Resume: ```{text}```
 """
+
+# 3.1. Prompts are also served from `templates`. Variables other than
+# {language} are supplied per call: the evaluators above get the output of
+# their extractor, the PROMPT_IMPROVE_* prompts the text they improve.
+templates["PROMPT_IMPROVE_SUMMARY"] = PROMPT_IMPROVE_SUMMARY
+templates["PROMPT_IMPROVE_WORK_EXPERIENCE"] = PROMPT_IMPROVE_WORK_EXPERIENCE
+templates["PROMPT_IMPROVE_PROJECT"] = PROMPT_IMPROVE_PROJECT
+templates["PROMPT_EVALUATE_RESUME"] = PROMPT_EVALUATE_RESUME
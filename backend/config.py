@@ -8,3 +8,63 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 COHERE_API_KEY = os.getenv("COHERE_API_KEY")
+
+# Level of the backend's own log messages (analysis timings, failed sections)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# LLM response memoization: "memory", "file" or "off"
+LLM_MEMO_BACKEND = os.getenv("LLM_MEMO_BACKEND", "memory")
+LLM_MEMO_DIR = os.getenv("LLM_MEMO_DIR", "./tmp/llm_memo")
+LLM_MEMO_MAX_ENTRIES = int(os.getenv("LLM_MEMO_MAX_ENTRIES", "4096"))
+
+# Maximum prompt tokens per LLM call; longer resume text is compacted to fit
+LLM_CALL_TOKEN_BUDGET = int(os.getenv("LLM_CALL_TOKEN_BUDGET", "8000"))
+
+# Language the LLM writes its evaluations in ({language} in the prompt templates)
+LLM_ASSISTANT_LANGUAGE = os.getenv("LLM_ASSISTANT_LANGUAGE", "english")
+# Start every prompt with the whole resume so all calls for a resume share a
+# prefix that provider prompt caching can reuse; "0" sends section templates
+# only their section (fewer input tokens per call, but no cached prefix)
+LLM_SHARED_RESUME_PREFIX = os.getenv("LLM_SHARED_RESUME_PREFIX", "1") != "0"
+
+# Maximum LLM calls in flight per provider through the shared clients
+LLM_PROVIDER_CONCURRENCY = int(os.getenv("LLM_PROVIDER_CONCURRENCY", "8"))
+
+# Rate limit, retry and hedging policy shared by all LLM calls (see shared/call_scheduler.py)
+LLM_RATE_LIMIT_RPM = float(os.getenv("LLM_RATE_LIMIT_RPM", "300"))
+LLM_RATE_LIMIT_BURST = float(os.getenv("LLM_RATE_LIMIT_BURST", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+# Seconds after which a slow call is hedged with a second request; 0 disables hedging
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+
+# Model tiers, cheapest first, as "[provider/]model[:input_cost:output_cost]" (USD per
+# million tokens). Every call starts on the first tier and is re-run on the next one
+# when its response is invalid, scores out of 0..100 or has evaluations shorter
+# than LLM_CASCADE_MIN_WORDS words
+LLM_MODEL_TIERS = os.getenv("LLM_MODEL_TIERS", "OpenAI/gpt-4o-mini:0.15:0.60,OpenAI/gpt-4o:2.50:10.00")
+LLM_CASCADE_MIN_WORDS = int(os.getenv("LLM_CASCADE_MIN_WORDS", "4"))
+
+# Pipeline stages (LLM calls) run at once per analysis
+ANALYSIS_PIPELINE_WORKERS = int(os.getenv("ANALYSIS_PIPELINE_WORKERS", "8"))
+# Skills and spoken languages are extracted locally, without their LLM call, when at
+# least this share of their section is recognized; above 1 always asks the LLM
+LOCAL_EXTRACTION_MIN_CONFIDENCE = float(os.getenv("LOCAL_EXTRACTION_MIN_CONFIDENCE", "0.8"))
+
+# Analyses taking at least this many seconds get a sampled stack profile
+# (collapsed stacks) written to PROFILE_DIR; 0 disables the profiler
+PROFILE_SLOW_SECONDS = float(os.getenv("PROFILE_SLOW_SECONDS", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./tmp/profiles")
+
+# Background analysis jobs: worker threads and the SQLite job store
+ANALYSIS_JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "2"))
+ANALYSIS_JOBS_DB = os.getenv("ANALYSIS_JOBS_DB", "./tmp/analysis_jobs.sqlite")
+# Seconds a running job stays leased to its process without renewal before
+# another process may take it over
+ANALYSIS_JOB_LEASE_SECONDS = float(os.getenv("ANALYSIS_JOB_LEASE_SECONDS", "60"))
+
+# PDF reports: renderer processes run at once, and the on-disk report cache
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_REPORTS_DIR = os.getenv("PDF_REPORTS_DIR", "./static/reports")
+PDF_REPORT_CACHE_MAX_BYTES = int(os.getenv("PDF_REPORT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 
 class ContactInformation(BaseModel):
     candidate_name: Optional[str] = "unknown"
@@ -41,9 +41,50 @@ class SkillsEvaluation(BaseModel):
     evaluation_skills: Optional[str] = "No evaluation"
     score_skills: int = -1
 
+class Education(BaseModel):
+    edu_college: Optional[str] = "unknown"
+    edu_degree: Optional[str] = "unknown"
+    edu_start_date: Optional[str] = "unknown"
+    edu_end_date: Optional[str] = "unknown"
+
+class EducationEvaluation(BaseModel):
+    education: List[Education] = []
+    evaluation_edu: Optional[str] = "No evaluation"
+    score_edu: int = -1
+
+class SpokenLanguage(BaseModel):
+    spoken_language: str
+    language_fluency: Optional[str] = "unknown"
+
+class LanguagesEvaluation(BaseModel):
+    languages: List[SpokenLanguage] = []
+    evaluation_language: Optional[str] = "No evaluation"
+    score_language: int = -1
+
+class Certification(BaseModel):
+    certif_title: str
+    certif_organization: Optional[str] = "unknown"
+    certif_date: Optional[str] = "unknown"
+    certif_expiry_date: Optional[str] = "unknown"
+    certif_details: Optional[str] = "unknown"
+
+class CertificationsEvaluation(BaseModel):
+    certifications: List[Certification] = []
+    evaluation_certif: Optional[str] = "No evaluation"
+    score_certif: int = -1
+
+class ResumeOverview(BaseModel):
+    resume_cv_overview: Optional[str] = "unknown"
+    top_3_strengths: Optional[Union[str, List[str]]] = "unknown"
+    top_3_weaknesses: Optional[Union[str, List[str]]] = "unknown"
+
 class ResumeAnalysisResponse(BaseModel):
     contact_info: ContactInformation
     summary: SummaryEvaluation
     work_experience: List[WorkExperience]
     projects: List[ProjectDetails]
     skills: SkillsEvaluation
+    education: EducationEvaluation = EducationEvaluation()
+    languages: LanguagesEvaluation = LanguagesEvaluation()
+    certifications: CertificationsEvaluation = CertificationsEvaluation()
+    overview: ResumeOverview = ResumeOverview()
@@ -1,14 +1,19 @@
+import json
 from fastapi import APIRouter, HTTPException
-from services.resume_service import analyze_resume
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from services.resume_service import analysis_jobs, iter_analysis_events, submit_analysis_job
 from pathlib import Path
 
 router = APIRouter()
 UPLOAD_DIR = Path("./tmp")
 
-@router.post("/analyze_resume")
+@router.post("/analyze_resume", status_code=202)
 async def analyze(document_id: str):
     """
-    Analyze the uploaded resume using the provided document ID.
+    Queue analysis of the uploaded resume and return the job ID immediately.
+
+    Poll /analysis_jobs/{job_id} or /get_analysis_results for the outcome.
     """
     file_path = UPLOAD_DIR / document_id
     
@@ -16,7 +21,56 @@ async def analyze(document_id: str):
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Document not found.")
     
-    # Analyze the resume
-    analysis_results = analyze_resume(document_id)
+    # Hashing the upload and the SQLite insert are blocking, keep them off the event loop
+    job_id, deduplicated = await run_in_threadpool(submit_analysis_job, document_id)
     
-    return {"status": "success", "results": analysis_results}
+    return {"status": "queued", "job_id": job_id, "document_id": document_id, "deduplicated": deduplicated}
+
+@router.get("/analysis_jobs/metrics")
+async def job_metrics():
+    """
+    Queue depth, running jobs and submission counters of the analysis workers.
+    """
+    return analysis_jobs.metrics()
+
+@router.get("/analysis_jobs/{job_id}")
+async def job_status(job_id: str):
+    """
+    Status of an analysis job, with its results once done.
+    """
+    job = await run_in_threadpool(analysis_jobs.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+@router.post("/analyze_resume/stream")
+def analyze_stream(document_id: str, format: str = "sse"):
+    """
+    Analyze the uploaded resume, streaming each section result as it completes.
+
+    `format` is "sse" (Server-Sent Events, the default) or "ndjson". The last
+    event is "result", carrying the full analysis and overallScore; failures
+    are reported as an "error" event.
+    """
+    file_path = UPLOAD_DIR / document_id
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Document not found.")
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'sse' or 'ndjson'.")
+
+    def encode(event, data):
+        if format == "sse":
+            return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        return json.dumps({"event": event, **data}) + "\n"
+
+    def stream():
+        # Runs in Starlette's threadpool, so the blocking LLM calls do not stall the event loop
+        yield encode("start", {"document_id": document_id})
+        try:
+            for event, data in iter_analysis_events(document_id):
+                yield encode(event, data)
+        except Exception as e:
+            yield encode("error", {"detail": str(e)})
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type, headers={"Cache-Control": "no-cache"})
@@ -1,9 +1,97 @@
-from fastapi import APIRouter
-from services.pdf_service import generate_pdf
+import asyncio
+import os
+import re
+from typing import List
+from fastapi import APIRouter, Body, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.background import BackgroundTask
+from services.pdf_service import pdf_reports
+from services.resume_service import load_results
 
 router = APIRouter()
 
+REPORT_NAME = re.compile(r"report-[0-9a-f]+-[0-9a-f]+\.pdf")
+MAX_EXPORT_DOCUMENTS = 100
+
 @router.post("/generate_pdf_report")
 async def generate_report(document_id: str):
-    pdf_path = generate_pdf(document_id)
-    return {"status": "success", "pdf_url": f"/static/{pdf_path}"}
+    """
+    Render the PDF report of an analyzed resume and return its download URL.
+
+    Reports are cached per (analysis, template version), so asking again for
+    the same analysis returns the existing file without re-rendering.
+    """
+    # SQLite lookup is blocking, keep it off the event loop
+    results, job = await run_in_threadpool(load_results, document_id)
+    if job is not None:
+        return JSONResponse(status_code=202, content={"status": job["status"], "job_id": job["job_id"]})
+    if results is None:
+        raise HTTPException(status_code=404, detail="Analysis results not found.")
+    try:
+        path, cached = await pdf_reports.render(results)
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"PDF rendering failed: {e}")
+    return {"status": "success", "pdf_url": f"/pdf_reports/{path.name}", "cached": cached}
+
+@router.get("/pdf_reports/metrics")
+async def report_metrics():
+    """
+    Renders, cache hits and in-flight renders of the PDF report workers.
+    """
+    return pdf_reports.stats()
+
+@router.get("/pdf_reports/{file_name}")
+async def download_report(file_name: str):
+    """
+    Download a rendered report by the name returned in `pdf_url`.
+    """
+    path = pdf_reports.directory / file_name
+    if not REPORT_NAME.fullmatch(file_name) or not path.exists():
+        raise HTTPException(status_code=404, detail="Report not found.")
+    return FileResponse(path, media_type="application/pdf", filename=file_name)
+
+@router.post("/export_pdf_reports")
+async def export_reports(document_ids: List[str] = Body(..., embed=True)):
+    """
+    Export the reports of several analyzed resumes as one zip archive.
+
+    Reports are rendered concurrently through the renderer pool (cached ones
+    are reused) and held until they are in the archive, so the cache limit
+    cannot remove them in between. The archive's manifest.json gives each
+    document's status: "exported", "pending" (analysis still running),
+    "not_found" or "failed".
+    """
+    document_ids = list(dict.fromkeys(document_ids))
+    if not document_ids or len(document_ids) > MAX_EXPORT_DOCUMENTS:
+        raise HTTPException(status_code=400, detail=f"Pass between 1 and {MAX_EXPORT_DOCUMENTS} document IDs.")
+
+    async def export_one(document_id):
+        results, job = await run_in_threadpool(load_results, document_id)
+        if job is not None:
+            return {"document_id": document_id, "status": "pending", "job_id": job["job_id"]}, None
+        if results is None:
+            return {"document_id": document_id, "status": "not_found"}, None
+        try:
+            path, cached = await pdf_reports.render(results, hold=True)
+        except OSError as e:
+            return {"document_id": document_id, "status": "failed", "detail": str(e)}, None
+        held.append(path)
+        return {"document_id": document_id, "status": "exported", "cached": cached}, path
+
+    held = []
+    try:
+        exported = await asyncio.gather(*(export_one(document_id) for document_id in document_ids))
+        manifest = [entry for entry, _ in exported]
+        reports = [(entry["document_id"], path) for entry, path in exported if path is not None]
+        if not reports:
+            return JSONResponse(status_code=404, content={"status": "error", "reports": manifest})
+        archive = await run_in_threadpool(pdf_reports.export_zip, reports, manifest)
+    finally:
+        pdf_reports.release(held)
+    return FileResponse(
+        archive,
+        media_type="application/zip",
+        filename="resume_analysis_reports.zip",
+        background=BackgroundTask(os.remove, archive),
+    )
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException
-from services.resume_service import get_saved_analysis_results
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from services.resume_service import load_results
 
 router = APIRouter()
 
 @router.get("/get_analysis_results")
 async def get_results(document_id: str):
-    results = get_saved_analysis_results(document_id)
+    # The job store is SQLite; read it off the event loop
+    results, job = await run_in_threadpool(load_results, document_id)
+    if job is not None:
+        return JSONResponse(status_code=202, content={"status": job["status"], "job_id": job["job_id"]})
     if not results:
         raise HTTPException(status_code=404, detail="Analysis results not found.")
     return {"status": "success", "results": results}
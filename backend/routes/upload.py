@@ -1,9 +1,17 @@
 from fastapi import APIRouter, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
+import shutil
+import uuid
 
 router = APIRouter()
 UPLOAD_DIR = Path("./tmp")
 
+def save_upload(source, file_path: Path):
+    """Stream the spooled upload to disk instead of reading it all into memory"""
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
 @router.post("/upload_resume")
 async def upload_resume(file: UploadFile = File(...)):
     """
@@ -13,10 +21,12 @@ async def upload_resume(file: UploadFile = File(...)):
     if not UPLOAD_DIR.exists():
         UPLOAD_DIR.mkdir(parents=True)
     
-    # Save the uploaded file
-    file_path = UPLOAD_DIR / file.filename
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
+    # Save the uploaded file under a unique name so concurrent uploads of
+    # files with the same client-supplied name never overwrite each other
+    document_id = f"{uuid.uuid4().hex}{Path(file.filename or '').suffix.lower() or '.pdf'}"
+    file_path = UPLOAD_DIR / document_id
+    # Blocking file I/O runs off the event loop
+    await run_in_threadpool(save_upload, file.file, file_path)
     
-    # Return the document ID (the file name)
-    return {"status": "success", "document_id": file.filename}
+    # Return the document ID (the stored file name)
+    return {"status": "success", "document_id": document_id, "filename": file.filename}
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# Modules shared with server/ (telemetry, call scheduling, parsing, ...) live in
+# the repository's shared/ package; make it importable however the app is started
+ROOT = str(Path(__file__).resolve().parent.parent.parent)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
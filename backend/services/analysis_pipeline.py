@@ -0,0 +1,501 @@
+import ast
+import json
+import logging
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from models.resume_analysis import (
+    CertificationsEvaluation,
+    ContactInformation,
+    EducationEvaluation,
+    LanguagesEvaluation,
+    ProjectDetails,
+    ResumeAnalysisResponse,
+    ResumeOverview,
+    SkillsEvaluation,
+    SummaryEvaluation,
+    WorkExperience,
+)
+from services.local_extractors import contact_value_found, extract_contact, extract_languages, extract_skills
+from shared.response_parsing import iter_json_values, validate
+from shared.telemetry import propagate_context, telemetry
+
+logger = logging.getLogger(__name__)
+
+# invoke(template_key, **variables) -> raw LLM response text, bound to one resume
+Invoke = Callable[..., str]
+
+_BULLET_RE = re.compile(r"^[\s\-*•▪●–·]+")
+
+class Stage(NamedTuple):
+    """
+    A pipeline step. `run` receives the results of the stages named in
+    `after`, keyed by stage name, and starts as soon as all of them finished.
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    after: Tuple[str, ...] = ()
+
+class StageResult(NamedTuple):
+    name: str
+    status: str  # "done", "failed" or "skipped" (a dependency did not finish)
+    value: Any
+    error: Optional[str]
+    started: float  # seconds since the pipeline started
+    seconds: float
+
+    def timing(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "status": self.status,
+            "started": round(self.started, 3),
+            "seconds": round(self.seconds, 3),
+            **({"error": self.error} if self.error else {}),
+        }
+
+class StageGraph:
+    """
+    Stages run as a dependency graph on a thread pool.
+
+    Among ready stages, those with the longest chain of dependents start
+    first, so a full pool delays leaf stages rather than the critical path.
+
+    Raises:
+        ValueError: on duplicate stage names, unknown dependencies or cycles.
+    """
+
+    def __init__(self, stages: Sequence[Stage]):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Duplicate stage names")
+        for stage in stages:
+            unknown = set(stage.after) - self.stages.keys()
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {', '.join(sorted(unknown))}")
+        # Kahn's algorithm: every stage must become ready at some point
+        pending = {name: set(stage.after) for name, stage in self.stages.items()}
+        order = []
+        while pending:
+            ready = [name for name, after in pending.items() if not after]
+            if not ready:
+                raise ValueError(f"Stage dependency cycle among: {', '.join(sorted(pending))}")
+            for name in ready:
+                del pending[name]
+            for after in pending.values():
+                after.difference_update(ready)
+            order.extend(ready)
+        # Longest chain of stages depending on each stage
+        self.depth = {name: 0 for name in self.stages}
+        for name in reversed(order):
+            for dependency in self.stages[name].after:
+                self.depth[dependency] = max(self.depth[dependency], self.depth[name] + 1)
+
+    def run(self, max_workers: int = 8) -> Iterator[StageResult]:
+        """
+        Run every stage, yielding each result as soon as the stage finishes.
+
+        A stage whose dependency failed or was skipped is skipped itself.
+        """
+        started = time.perf_counter()
+        waiting = {name: set(stage.after) for name, stage in self.stages.items()}
+        results: Dict[str, StageResult] = {}
+
+        def execute(stage: Stage, inputs: Dict[str, Any]) -> StageResult:
+            begin = time.perf_counter()
+            try:
+                with telemetry.span("pipeline_stage", stage=stage.name):
+                    value, status, error = stage.run(inputs), "done", None
+            except Exception as e:
+                value, status, error = None, "failed", f"{type(e).__name__}: {e}"
+            return StageResult(stage.name, status, value, error, begin - started, time.perf_counter() - begin)
+
+        # Stage spans belong to the trace of the thread running the graph
+        run_stage = propagate_context(execute)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            running = set()
+            while waiting or running:
+                ready = sorted((name for name, after in waiting.items() if not after), key=lambda name: -self.depth[name])
+                for name in ready:
+                    del waiting[name]
+                    stage = self.stages[name]
+                    blocked = [dep for dep in stage.after if results[dep].status != "done"]
+                    if blocked:
+                        error = f"{blocked[0]} did not finish"
+                        result = StageResult(name, "skipped", None, error, time.perf_counter() - started, 0.0)
+                        results[name] = result
+                        for after in waiting.values():
+                            after.discard(name)
+                        yield result
+                        continue
+                    running.add(executor.submit(run_stage, stage, {dep: results[dep].value for dep in stage.after}))
+                if not running:
+                    continue
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results[result.name] = result
+                    for after in waiting.values():
+                        after.discard(result.name)
+                    yield result
+
+def parse_llm_output(text: str, expected: type) -> Any:
+    """
+    First JSON value of type `expected` (dict or list) in an LLM response.
+
+    Falls back to a Python literal, as the templates ask for "a dictionary".
+    """
+    with telemetry.span("response_parse", expected=expected.__name__):
+        for value in iter_json_values(text):
+            if isinstance(value, expected):
+                return value
+        opener, closer = ("{", "}") if expected is dict else ("[", "]")
+        start, end = text.find(opener), text.rfind(closer)
+        if 0 <= start < end:
+            try:
+                value = ast.literal_eval(text[start:end + 1])
+                if isinstance(value, expected):
+                    return value
+            except (ValueError, SyntaxError):
+                pass
+        raise ValueError(f"No {expected.__name__} found in LLM response")
+
+def validated(data: Any, model: type):
+    """`validate` timed as a response_validation span."""
+    with telemetry.span("response_validation", model=model.__name__):
+        return validate(data, model)
+
+def snake_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Template output keys (candidate__name) to model field names (candidate_name)."""
+    return {key.replace("__", "_"): value for key, value in data.items()}
+
+def entries(text: str) -> List[Dict[str, Any]]:
+    """A "list of dictionaries" response; a single dictionary counts as one entry."""
+    try:
+        return [snake_keys(entry) for entry in parse_llm_output(text, list) if isinstance(entry, dict)]
+    except ValueError:
+        return [snake_keys(parse_llm_output(text, dict))]
+
+class ResponseCheck(NamedTuple):
+    """What a template's response must contain to be kept without escalation"""
+    expected: type  # JSON type of the response
+    scores: Tuple[str, ...] = ()  # keys holding a 0..100 score
+    texts: Tuple[str, ...] = ()  # keys holding evaluation text
+
+RESPONSE_CHECKS = {
+    "Contact__information": ResponseCheck(dict, ("score__ContactInfo",), ("evaluation__ContactInfo",)),
+    "PROMPT_IMPROVE_SUMMARY": ResponseCheck(dict, ("score__summary",), ("evaluation__summary", "CV__summary_enhanced")),
+    "Work__experience": ResponseCheck(list),
+    "PROMPT_IMPROVE_WORK_EXPERIENCE": ResponseCheck(dict, ("Score__WorkExperience",), ("Comments__WorkExperience",)),
+    "CV__Projects": ResponseCheck(list),
+    "PROMPT_IMPROVE_PROJECT": ResponseCheck(dict, ("Score__project",), ("Comments__project",)),
+    "CV__Education": ResponseCheck(list),
+    "Education__evaluation": ResponseCheck(dict, ("score__edu",), ("evaluation__edu",)),
+    "candidate__skills": ResponseCheck(list),
+    "Skills__evaluation": ResponseCheck(dict, ("score__skills",), ("evaluation__skills",)),
+    "CV__Languages": ResponseCheck(list),
+    "Languages__evaluation": ResponseCheck(dict, ("score__language",), ("evaluation__language",)),
+    "CV__Certifications": ResponseCheck(list),
+    "Certif__evaluation": ResponseCheck(dict, ("score__certif",), ("evaluation__certif",)),
+    "PROMPT_EVALUATE_RESUME": ResponseCheck(dict, (), ("resume_cv_overview",)),
+}
+
+def response_issue(template_key: str, text: str, min_words: int = 4) -> Optional[str]:
+    """
+    Why a template's response should be re-run on a stronger model, or None to keep it.
+
+    Reasons: "invalid" (no JSON of the expected type or a missing key),
+    "score_out_of_range" and "short_content" (an evaluation text under
+    `min_words` words). Templates without a check are always kept.
+    """
+    check = RESPONSE_CHECKS.get(template_key)
+    if check is None:
+        return None
+    try:
+        data = parse_llm_output(text, check.expected)
+    except ValueError:
+        return "invalid"
+    if check.expected is not dict:
+        return None
+    for key in check.scores:
+        try:
+            score = float(data[key])
+        except (KeyError, TypeError, ValueError):
+            return "invalid"
+        if not 0 <= score <= 100:
+            return "score_out_of_range"
+    for key in check.texts:
+        if key not in data:
+            return "invalid"
+        if len(str(data[key]).split()) < min_words:
+            return "short_content"
+    return None
+
+def entry_texts(section_text: str, titles: Sequence[str]) -> List[str]:
+    """
+    The resume text of each titled entry: from the line naming it to the next entry.
+
+    Titles are searched in order, so repeated titles map to successive
+    entries. Entries whose title is not found verbatim get just their title.
+    """
+    lines = section_text.splitlines()
+    lowered = [line.lower() for line in lines]
+    found = []
+    cursor = 0
+    for title in titles:
+        needle = (title or "").strip().lower()
+        candidates = [i for i in range(len(lines)) if needle and needle in lowered[i]]
+        line = next((i for i in candidates if i >= cursor), candidates[0] if candidates else None)
+        if line is not None:
+            cursor = line + 1
+        found.append(line)
+    starts = sorted(line for line in found if line is not None)
+    texts = []
+    for title, line in zip(titles, found):
+        if line is None:
+            texts.append(title or "")
+            continue
+        end = next((start for start in starts if start > line), len(lines))
+        texts.append("\n".join(lines[line:end]).strip())
+    return texts
+
+def body_lines(entry_text: str) -> List[str]:
+    """Lines after an entry's title line, without bullet markers."""
+    lines = (_BULLET_RE.sub("", line).strip() for line in entry_text.splitlines()[1:])
+    return [line for line in lines if line]
+
+def section_score(model) -> Optional[int]:
+    """The section's score, the mean of its entries' scores for lists; None if unscored."""
+    if isinstance(model, list):
+        scores = [score for score in (section_score(entry) for entry in model) if score is not None]
+        return round(sum(scores) / len(scores)) if scores else None
+    for name, value in model:
+        if name.startswith("score") and isinstance(value, int):
+            return value if value >= 0 else None
+    return None
+
+def fan_out(fn: Callable[[Any], Any], items: Sequence[Any], max_workers: int) -> List[Any]:
+    """fn over items concurrently, in order; on its own pool so stages never wait on their own pool."""
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(len(items), max(1, max_workers))) as pool:
+        return list(pool.map(propagate_context(fn), items))
+
+# Response section -> stage producing it, in response order
+SECTION_STAGES = {
+    "contact_info": "contact_info",
+    "summary": "summary",
+    "work_experience": "work_experience",
+    "projects": "projects",
+    "skills": "skills",
+    "education": "education",
+    "languages": "languages",
+    "certifications": "certifications",
+    "overview": "overview",
+}
+
+# What a section holds when its stage failed or was skipped
+SECTION_DEFAULTS = {
+    "contact_info": ContactInformation,
+    "summary": SummaryEvaluation,
+    "work_experience": list,
+    "projects": list,
+    "skills": SkillsEvaluation,
+    "education": EducationEvaluation,
+    "languages": LanguagesEvaluation,
+    "certifications": CertificationsEvaluation,
+    "overview": ResumeOverview,
+}
+
+def resume_stages(
+    invoke: Invoke,
+    resume_text: str,
+    segments=None,
+    fan_out_workers: int = 4,
+    min_local_confidence: Optional[float] = None,
+) -> List[Stage]:
+    """
+    Stages extracting and evaluating every resume section with the prompt templates.
+
+    Extractors have no dependencies and all start at once; each evaluator
+    starts when its extractor finishes and gets its output, and work
+    experiences and projects are improved one entry per call. Section
+    evaluators are skipped, without an LLM call, when nothing was extracted.
+
+    With `min_local_confidence`, skills and spoken languages come from the
+    local extractors (services/local_extractors.py) instead of an LLM call
+    when at least that share of their section was recognized. The email,
+    phone and profile URLs found in the text pass the same gate, and only
+    fill contact fields the LLM left empty or filled with values that are
+    not in the resume. Evaluations and scores always come from the LLM.
+    """
+    def section_text(section: str) -> str:
+        if segments is None:
+            return resume_text
+        return segments.span_text(section) or resume_text
+
+    def span_text(section: str) -> Optional[str]:
+        return segments.span_text(section) if segments is not None else None
+
+    def local(field: str, extraction) -> bool:
+        """Whether a local extraction stands in for the field's LLM call, counted per source."""
+        if min_local_confidence is None:
+            return False
+        hit = bool(extraction.values) and extraction.confidence >= min_local_confidence
+        telemetry.count("local_extractions", field=field, source="local" if hit else "llm")
+        return hit
+
+    def contact_info(_):
+        data = snake_keys(parse_llm_output(invoke("Contact__information"), dict))
+        if min_local_confidence is not None:
+            for field, extraction in extract_contact(resume_text, segments).items():
+                if not contact_value_found(field, data.get(field), resume_text) and local(field, extraction):
+                    data[field] = extraction.values if field == "candidate_social_media" else extraction.values[0]
+        return validated(data, ContactInformation)
+
+    def summary(inputs):
+        cv_summary = inputs["summary_text"].strip() or "unknown"
+        data = snake_keys(parse_llm_output(invoke("PROMPT_IMPROVE_SUMMARY", summary=cv_summary), dict))
+        return validated({**data, "CV_summary": cv_summary}, SummaryEvaluation)
+
+    def work_experience(inputs):
+        jobs = inputs["work_entries"]
+        texts = entry_texts(section_text("Work Experience"), [job.get("job_title") for job in jobs])
+
+        def improve(item):
+            job, text = item
+            review = parse_llm_output(invoke("PROMPT_IMPROVE_WORK_EXPERIENCE", text=text), dict)
+            return validated({
+                "job_title": job.get("job_title") or "unknown",
+                "company": job.get("job_company") or "unknown",
+                "start_date": job.get("job_start_date") or "unknown",
+                "end_date": job.get("job_end_date") or "unknown",
+                "responsibilities": body_lines(text),
+                "score": review.get("Score__WorkExperience", -1),
+                "comments": review.get("Comments__WorkExperience") or "No comments provided",
+                "improvement": review.get("Improvement__WorkExperience") or "No improvements made",
+            }, WorkExperience)
+
+        return fan_out(improve, list(zip(jobs, texts)), fan_out_workers)
+
+    def projects(inputs):
+        items = inputs["project_entries"]
+        texts = entry_texts(section_text("Projects"), [item.get("project_title") for item in items])
+
+        def improve(item):
+            project, text = item
+            review = parse_llm_output(invoke("PROMPT_IMPROVE_PROJECT", text=text), dict)
+            return validated({
+                "project_title": project.get("project_title") or "unknown",
+                "start_date": project.get("project_start_date") or "unknown",
+                "end_date": project.get("project_end_date") or "unknown",
+                "project_description": " ".join(body_lines(text)) or "No description available",
+                "score_project": review.get("Score__project", -1),
+                "comments_project": review.get("Comments__project") or "No comments",
+                "improvement_project": review.get("Improvement__project") or "No improvements",
+            }, ProjectDetails)
+
+        return fan_out(improve, list(zip(items, texts)), fan_out_workers)
+
+    def evaluated(name, extracted_stage, template_key, variable, field, model):
+        """Stage running an evaluator template on its extractor's output, stored in `field`."""
+        def run(inputs):
+            extracted = inputs[extracted_stage]
+            if not extracted:
+                return validated({field: []}, model)
+            data = snake_keys(parse_llm_output(invoke(template_key, **{variable: json.dumps(extracted)}), dict))
+            return validated({**data, field: extracted}, model)
+        return Stage(name, run, (extracted_stage,))
+
+    def skills_list(_):
+        extraction = extract_skills(span_text("Skills"))
+        if local("skills", extraction):
+            return extraction.values
+        text = invoke("candidate__skills")
+        try:
+            values = parse_llm_output(text, list)
+        except ValueError:
+            values = [_BULLET_RE.sub("", line).strip() for line in text.splitlines()]
+        return [str(value) for value in values if str(value).strip()]
+
+    def language_entries(_):
+        extraction = extract_languages(span_text("Languages"))
+        if local("languages", extraction):
+            return extraction.values
+        return entries(invoke("CV__Languages"))
+
+    def overview(_):
+        return validated(snake_keys(parse_llm_output(invoke("PROMPT_EVALUATE_RESUME"), dict)), ResumeOverview)
+
+    return [
+        Stage("contact_info", contact_info),
+        Stage("summary_text", lambda _: invoke("CV__summary")),
+        Stage("summary", summary, ("summary_text",)),
+        Stage("work_entries", lambda _: entries(invoke("Work__experience"))),
+        Stage("work_experience", work_experience, ("work_entries",)),
+        Stage("project_entries", lambda _: entries(invoke("CV__Projects"))),
+        Stage("projects", projects, ("project_entries",)),
+        Stage("skills_list", skills_list),
+        evaluated("skills", "skills_list", "Skills__evaluation", "skills", "candidate_skills", SkillsEvaluation),
+        Stage("education_entries", lambda _: entries(invoke("CV__Education"))),
+        evaluated("education", "education_entries", "Education__evaluation", "education", "education", EducationEvaluation),
+        Stage("language_entries", language_entries),
+        evaluated("languages", "language_entries", "Languages__evaluation", "languages", "languages", LanguagesEvaluation),
+        Stage("certification_entries", lambda _: entries(invoke("CV__Certifications"))),
+        evaluated(
+            "certifications", "certification_entries", "Certif__evaluation", "certifications", "certifications",
+            CertificationsEvaluation,
+        ),
+        Stage("overview", overview),
+    ]
+
+def iter_pipeline_events(
+    invoke: Invoke,
+    resume_text: str,
+    segments=None,
+    max_workers: int = 8,
+    min_local_confidence: Optional[float] = None,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run the resume stages, yielding events as sections complete.
+
+    Yields ("progress", {stage, status, started, seconds, completed, total}) as each
+    stage finishes, ("section", {name, data, overallScore}) for each response
+    section as soon as its stage finishes (failed sections keep their
+    defaults and are left out of the overall score), then ("result",
+    {results, overallScore, stages}) with the full ResumeAnalysisResponse and
+    the timing of every stage. `min_local_confidence` is passed to
+    `resume_stages`.
+    """
+    graph = StageGraph(resume_stages(
+        invoke, resume_text, segments, fan_out_workers=max_workers, min_local_confidence=min_local_confidence,
+    ))
+    section_of_stage = {stage: section for section, stage in SECTION_STAGES.items()}
+    sections: Dict[str, Any] = {}
+    scores: Dict[str, int] = {}
+    timings = []
+
+    def overall_score() -> int:
+        return round(sum(scores.values()) / len(scores)) if scores else 0
+
+    for result in graph.run(max_workers):
+        timings.append(result.timing())
+        yield "progress", {**timings[-1], "completed": len(timings), "total": len(graph.stages)}
+        section = section_of_stage.get(result.name)
+        if section is None:
+            continue
+        if result.status == "done":
+            value = result.value
+            score = section_score(value)
+            if score is not None:
+                scores[section] = score
+        else:
+            logger.error("Error analyzing %s: %s", section, result.error)
+            value = SECTION_DEFAULTS[section]()
+        sections[section] = value
+        data = [entry.model_dump() for entry in value] if isinstance(value, list) else value.model_dump()
+        yield "section", {"name": section, "data": data, "overallScore": overall_score()}
+
+    response = ResumeAnalysisResponse(**sections)
+    yield "result", {"results": response.model_dump(), "overallScore": overall_score(), "stages": timings}
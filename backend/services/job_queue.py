@@ -0,0 +1,265 @@
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Job states; QUEUED and RUNNING jobs are "in flight"
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+class JobStore:
+    """SQLite-backed record of analysis jobs and their results.
+
+    Every submitted document_id maps to a job; identical in-flight
+    submissions share one job, so several documents can point at it.
+
+    A running job is leased to the worker process that claimed it (`owner`,
+    `lease_expires`); the owner renews the lease while the job runs, and
+    other processes only take the job over once the lease has expired.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, dedup_key TEXT NOT NULL, document_id TEXT NOT NULL, "
+            "status TEXT NOT NULL, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+            "owner TEXT, lease_expires REAL)"
+        )
+        # Stores created before jobs were leased
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_expires", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key, status)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_documents ("
+            "document_id TEXT PRIMARY KEY, job_id TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def create_or_join(self, document_id: str, dedup_key: str) -> Tuple[str, bool]:
+        """
+        Create a queued job for the document, or attach it to an in-flight job
+        with the same dedup key.
+
+        Returns:
+            (job_id, created) where created is False for a deduplicated submission.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE dedup_key = ? AND status IN (?, ?) "
+                "ORDER BY created_at DESC LIMIT 1",
+                (dedup_key, QUEUED, RUNNING)
+            ).fetchone()
+            created = row is None
+            job_id = uuid.uuid4().hex if created else row[0]
+            if created:
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, dedup_key, document_id, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, dedup_key, document_id, QUEUED, time.time())
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_documents (document_id, job_id) VALUES (?, ?)",
+                (document_id, job_id)
+            )
+            self._conn.commit()
+            return job_id, created
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Mark a job running under `owner`, unless it finished or another
+        owner holds an unexpired lease on it.
+
+        Returns:
+            True if the caller now owns the job and should run it.
+        """
+        now = time.time()
+        with self._lock:
+            claimed = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, lease_expires = ?, started_at = ? "
+                "WHERE job_id = ? AND (status = ? OR (status = ? AND (lease_expires IS NULL OR lease_expires < ?)))",
+                (RUNNING, owner, now + lease_seconds, now, job_id, QUEUED, RUNNING, now)
+            ).rowcount == 1
+            self._conn.commit()
+            return claimed
+
+    def renew(self, owner: str, lease_seconds: float):
+        """Extend the lease of every job `owner` is running"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE owner = ? AND status = ?",
+                (time.time() + lease_seconds, owner, RUNNING)
+            )
+            self._conn.commit()
+
+    def mark_done(self, job_id: str, result: Dict[str, Any]):
+        self._update(job_id, status=DONE, result=json.dumps(result), finished_at=time.time())
+
+    def mark_failed(self, job_id: str, error: str):
+        self._update(job_id, status=FAILED, error=error, finished_at=time.time())
+
+    def _update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE job_id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, document_id, status, result, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(
+            ("job_id", "document_id", "status", "result", "error", "created_at", "started_at", "finished_at"), row
+        ))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def get_for_document(self, document_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id FROM job_documents WHERE document_id = ?", (document_id,)
+            ).fetchone()
+        return self.get(row[0]) if row else None
+
+    def unfinished(self):
+        """
+        (job_id, document_id) of jobs still queued or running without a live
+        lease, oldest first
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT job_id, document_id FROM jobs "
+                "WHERE status = ? OR (status = ? AND (lease_expires IS NULL OR lease_expires < ?)) ORDER BY created_at",
+                (QUEUED, RUNNING, time.time())
+            ).fetchall()
+
+class JobQueue:
+    """
+    In-process queue of analysis jobs served by a pool of worker threads.
+
+    Handlers are blocking (LLM calls), so they run on the worker threads
+    rather than the FastAPI event loop. Workers start on first submission;
+    queued jobs and running jobs whose lease expired (their process died)
+    are re-queued at that point. A job only runs after this queue claims
+    it in the store, so processes sharing a store never take over a job
+    whose owner is still renewing its lease.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: Callable[[str], Dict[str, Any]],
+        workers: int = 2,
+        lease_seconds: float = 60.0
+    ):
+        self.store = store
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stopped = threading.Event()
+        self._queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue()
+        self._threads = []
+        self._lease_thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self.counters = {"submitted": 0, "deduplicated": 0, "completed": 0, "failed": 0}
+        self._running = 0
+
+    def start(self):
+        with self._start_lock:
+            if self._threads:
+                return
+            for job_id, document_id in self.store.unfinished():
+                self._queue.put((job_id, document_id))
+            self._stopped.clear()
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"analysis-job-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            self._lease_thread = threading.Thread(target=self._renew_leases, name="analysis-job-leases", daemon=True)
+            self._lease_thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Let workers finish their current job and exit"""
+        with self._start_lock:
+            self._stopped.set()
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join(timeout)
+            if self._lease_thread is not None:
+                self._lease_thread.join(timeout)
+            self._threads = []
+            self._lease_thread = None
+
+    def submit(self, document_id: str, dedup_key: str) -> Tuple[str, bool]:
+        """
+        Enqueue analysis of a document.
+
+        Args:
+            document_id (str): Uploaded document to analyze.
+            dedup_key (str): Jobs with the same key that are still in flight are shared.
+
+        Returns:
+            (job_id, deduplicated)
+        """
+        self.start()
+        job_id, created = self.store.create_or_join(document_id, dedup_key)
+        with self._metrics_lock:
+            self.counters["submitted"] += 1
+            if not created:
+                self.counters["deduplicated"] += 1
+        if created:
+            self._queue.put((job_id, document_id))
+        return job_id, not created
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job_id, document_id = item
+            if not self.store.claim(job_id, self.owner, self.lease_seconds):
+                # Finished, or running in another process that holds its lease
+                continue
+            with self._metrics_lock:
+                self._running += 1
+            try:
+                self.store.mark_done(job_id, self.handler(document_id))
+                outcome = "completed"
+            except Exception as e:
+                self.store.mark_failed(job_id, str(e))
+                outcome = "failed"
+            with self._metrics_lock:
+                self._running -= 1
+                self.counters[outcome] += 1
+
+    def _renew_leases(self):
+        while not self._stopped.wait(self.lease_seconds / 3):
+            self.store.renew(self.owner, self.lease_seconds)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "running": self._running,
+                "workers": len(self._threads),
+                **self.counters,
+            }
@@ -1,7 +1,58 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
-from app_constants import templates  # Import the templates correctly
-from config import OPENAI_API_KEY, GOOGLE_API_KEY
+from app_constants import RESUME_PREFIX, templates, template_sections
+from config import (
+    OPENAI_API_KEY,
+    GOOGLE_API_KEY,
+    LLM_MEMO_BACKEND,
+    LLM_MEMO_DIR,
+    LLM_MEMO_MAX_ENTRIES,
+    LLM_CALL_TOKEN_BUDGET,
+    LLM_ASSISTANT_LANGUAGE,
+    LLM_SHARED_RESUME_PREFIX,
+    LLM_PROVIDER_CONCURRENCY,
+    LLM_RATE_LIMIT_RPM,
+    LLM_RATE_LIMIT_BURST,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_HEDGE_AFTER,
+    LLM_MODEL_TIERS,
+)
+from shared.call_scheduler import CallScheduler
+from shared.llm_memo import create_memo
+from shared.model_cascade import ModelCascade, parse_tiers
+from services.prompt_templates import TemplateRegistry
+from shared.telemetry import TOKEN_BUCKETS, telemetry
+from shared.token_budget import TokenLedger, compact_text, count_tokens, encoding_name_for_model
+
+# Every template compiled and validated at import, so a malformed template fails here
+prompt_templates = TemplateRegistry(templates, RESUME_PREFIX, defaults={"language": LLM_ASSISTANT_LANGUAGE})
+
+# Memo of LLM responses on (template version, normalized resume text, model, temperature, variables)
+llm_memo = create_memo(LLM_MEMO_BACKEND, LLM_MEMO_DIR, max_entries=LLM_MEMO_MAX_ENTRIES)
+
+# Prompt/response token counts of every LLM call, labelled by template key
+token_ledger = TokenLedger()
+
+# Per-provider rate limiting, retry with backoff and optional hedging for every LLM call
+call_scheduler = CallScheduler(
+    rate_per_minute=LLM_RATE_LIMIT_RPM,
+    burst=LLM_RATE_LIMIT_BURST,
+    max_retries=LLM_MAX_RETRIES,
+    base_delay=LLM_BACKOFF_BASE,
+    max_delay=LLM_BACKOFF_MAX,
+)
+
+def count_escalation(tier, reason):
+    telemetry.count("model_escalations", help="LLM calls re-run on a stronger model", tier=tier.model, reason=reason)
+
+# Cheapest-first model tiers; per-tier calls, escalations, latency, tokens and cost
+model_cascade = ModelCascade(parse_tiers(LLM_MODEL_TIERS, default_provider="OpenAI"), on_escalate=count_escalation)
 
 def instantiate_llm(provider, temperature=0.5, top_p=0.95, model_name=None):
     """
@@ -25,19 +76,232 @@ def instantiate_llm(provider, temperature=0.5, top_p=0.95, model_name=None):
     else:
         raise ValueError("Unsupported LLM provider. Supported providers: OpenAI, Google.")
 
-def invoke_llm(llm, resume_text, template_key):
+class LLMClientRegistry:
+    """
+    Shared LLM clients keyed by (provider, model, temperature, top_p).
+
+    Each client owns its HTTP connection pool, so reusing clients keeps
+    connections alive across requests instead of paying a new TLS handshake
+    per analysis. Calls through a registry client are limited to
+    `concurrency` in flight per provider.
+    """
+
+    def __init__(self, factory=None, concurrency=LLM_PROVIDER_CONCURRENCY):
+        self.factory = factory or instantiate_llm
+        self.concurrency = concurrency
+        self._clients = {}
+        self._providers = {}  # id(client) -> provider
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider, temperature=0.5, top_p=0.95, model_name=None):
+        """
+        Return the shared client for this configuration, creating it on first use.
+        """
+        key = (provider, model_name, temperature, top_p)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self.factory(provider, temperature=temperature, top_p=top_p, model_name=model_name)
+                self._clients[key] = client
+                self._providers[id(client)] = provider
+            return client
+
+    def provider_of(self, llm):
+        return self._providers.get(id(llm), type(llm).__name__)
+
+    def limit(self, llm):
+        """
+        Semaphore bounding the synchronous calls in flight to llm's provider.
+        """
+        provider = self.provider_of(llm)
+        with self._lock:
+            if provider not in self._semaphores:
+                self._semaphores[provider] = threading.BoundedSemaphore(self.concurrency)
+            return self._semaphores[provider]
+
+    @asynccontextmanager
+    async def alimit(self, llm):
+        """
+        Async counterpart of `limit`, sharing its semaphore so that sync and
+        async calls count against one limit per provider. A full semaphore is
+        polled with asyncio.sleep, keeping the event loop free.
+        """
+        semaphore = self.limit(llm)
+        delay = 0.001
+        while not semaphore.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(0.05, delay * 2)
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def __len__(self):
+        return len(self._clients)
+
+llm_clients = LLMClientRegistry()
+
+def get_llm(provider, temperature=0.5, top_p=0.95, model_name=None):
+    """
+    Shared client from `llm_clients`; prefer this over instantiate_llm in request paths.
+    """
+    return llm_clients.get(provider, temperature=temperature, top_p=top_p, model_name=model_name)
+
+@lru_cache(maxsize=None)
+def prompt_overhead_tokens(encoding_name):
+    """
+    Tokens of everything but the resume in the longest template's prompt.
+    """
+    return max(
+        count_tokens(template.render("", **{name: "" for name in template.variables}), encoding_name)
+        for template in prompt_templates.values()
+    )
+
+def build_prompt(template_key, resume_text, segments, encoding_name, variables=None):
+    """
+    Render the template for the resume, compacting the resume if the prompt
+    could exceed LLM_CALL_TOKEN_BUDGET.
+
+    The resume is compacted to the same budget whichever template is used,
+    so every prompt for a resume starts with the same prefix.
+
+    Returns:
+        (prompt, original_tokens) where original_tokens is the uncompacted size.
+    """
+    template = prompt_templates[template_key]
+    instructions = template.instructions(**(variables or {}))
+    original_tokens = count_tokens(template.prefix(resume_text) + instructions, encoding_name)
+    resume_budget = max(0, LLM_CALL_TOKEN_BUDGET - prompt_overhead_tokens(encoding_name))
+    if count_tokens(resume_text, encoding_name) > resume_budget:
+        resume_text = compact_text(resume_text, resume_budget, segments, encoding_name)
+    return template.prefix(resume_text) + instructions, original_tokens
+
+def prepare_call(llm, resume_text, template_key, segments, variables):
+    """
+    Validate the call up front and pick the text and encoding it uses.
+
+    Returns:
+        (template, resume_text, model_name, encoding_name)
+
+    Raises:
+        KeyError: for an unknown template.
+        TemplateError: if `variables` do not match the template's placeholders.
+    """
+    template = prompt_templates[template_key]
+    template.check(variables)
+    if segments is not None and not LLM_SHARED_RESUME_PREFIX and template_key in template_sections:
+        resume_text = segments.section_text(template_sections[template_key])
+    model_name = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+    return template, resume_text, model_name, encoding_name_for_model(model_name)
+
+def record_llm_usage(span, template_key, prompt_tokens, response_tokens):
+    """Attach token counts to an llm_call span and the per-template token histograms."""
+    span.set(prompt_tokens=prompt_tokens, response_tokens=response_tokens)
+    telemetry.observe("llm_prompt_tokens", prompt_tokens, TOKEN_BUCKETS, "Prompt tokens per LLM call", template=template_key)
+    telemetry.observe("llm_response_tokens", response_tokens, TOKEN_BUCKETS, "Response tokens per LLM call", template=template_key)
+
+def retry_recorder(span, template_key):
+    """call_scheduler on_retry callback counting the retries of one LLM call."""
+    def on_retry(attempt, error):
+        span.set(retries=attempt, last_error=type(error).__name__)
+        telemetry.count("llm_retries", help="Retried LLM call attempts", template=template_key)
+    return on_retry
+
+def invoke_llm(llm, resume_text, template_key, segments=None, **variables):
     """
     Invoke the LLM using the specified prompt template.
 
     Args:
         llm: The instantiated LLM object (OpenAI or Google).
         resume_text: The input text (resume content).
-        template_key: The key to retrieve the correct prompt template.
+        template_key: The key of the template in `prompt_templates`.
+        segments: Optional DocumentSegments for the resume, used to compact
+            prompts over LLM_CALL_TOKEN_BUDGET tokens. With
+            LLM_SHARED_RESUME_PREFIX off, section templates also only
+            receive their own section (plus a short header).
+        **variables: Per-call template variables, e.g. summary= for PROMPT_IMPROVE_SUMMARY.
 
     Returns:
-        LLM response content.
+        LLM response content. Responses are memoized in `llm_memo` under the
+        template's version hash, so re-invoking with equivalent (normalized)
+        text skips the LLM call. Calls go through `call_scheduler`; rate-limit
+        and server errors are retried, and the last error is raised once
+        retries run out. Calls that reach the LLM are recorded as "llm_call"
+        telemetry spans with their token counts and retries.
+    """
+    template, resume_text, model_name, encoding_name = prepare_call(llm, resume_text, template_key, segments, variables)
+
+    def call():
+        with telemetry.span("llm_call", template=template_key, model=model_name) as span:
+            prompt, original_tokens = build_prompt(template_key, resume_text, segments, encoding_name, variables)
+            def attempt():
+                with llm_clients.limit(llm):
+                    return llm.invoke(prompt)
+
+            response = call_scheduler.call(
+                llm_clients.provider_of(llm), attempt,
+                hedge_after=LLM_HEDGE_AFTER or None, on_retry=retry_recorder(span, template_key),
+            )
+            prompt_tokens = count_tokens(prompt, encoding_name)
+            response_tokens = count_tokens(response.content, encoding_name)
+            token_ledger.record(template_key, prompt_tokens, response_tokens, original_tokens)
+            model_cascade.record_tokens(model_name, prompt_tokens, response_tokens)
+            record_llm_usage(span, template_key, prompt_tokens, response_tokens)
+            return response.content
+
+    if llm_memo is None:
+        return call()
+    return llm_memo.get_or_call(
+        template.cache_key, resume_text, model_name, getattr(llm, "temperature", None), call, variables=variables
+    )
+
+def invoke_cascade(resume_text, template_key, check=None, segments=None, temperature=0.5, **variables):
     """
-    # Access the correct prompt template from app_constants
-    prompt = templates[template_key].format(text=resume_text)
-    response = llm.invoke(prompt)
-    return response.content
+    invoke_llm through `model_cascade`, on the shared client of each tier.
+
+    Args:
+        check: Called with the response text; returns None to accept it or
+            the reason to re-run the call on the next tier. Errors also
+            escalate, except on the last tier where they are raised.
+
+    Returns:
+        The accepted response content, else the last tier's.
+    """
+    def call(tier):
+        llm = get_llm(tier.provider, temperature=temperature, model_name=tier.model)
+        return invoke_llm(llm, resume_text, template_key, segments=segments, **variables)
+
+    return model_cascade.run(call, check)
+
+async def ainvoke_llm(llm, resume_text, template_key, segments=None, **variables):
+    """
+    Async variant of invoke_llm using the client's `ainvoke`.
+
+    Arguments, compaction and memoization are the same as invoke_llm.
+    """
+    template, resume_text, model_name, encoding_name = prepare_call(llm, resume_text, template_key, segments, variables)
+
+    async def call():
+        with telemetry.span("llm_call", template=template_key, model=model_name) as span:
+            prompt, original_tokens = build_prompt(template_key, resume_text, segments, encoding_name, variables)
+            async def attempt():
+                async with llm_clients.alimit(llm):
+                    return await llm.ainvoke(prompt)
+
+            response = await call_scheduler.acall(
+                llm_clients.provider_of(llm), attempt,
+                hedge_after=LLM_HEDGE_AFTER or None, on_retry=retry_recorder(span, template_key),
+            )
+            prompt_tokens = count_tokens(prompt, encoding_name)
+            response_tokens = count_tokens(response.content, encoding_name)
+            token_ledger.record(template_key, prompt_tokens, response_tokens, original_tokens)
+            model_cascade.record_tokens(model_name, prompt_tokens, response_tokens)
+            record_llm_usage(span, template_key, prompt_tokens, response_tokens)
+            return response.content
+
+    if llm_memo is None:
+        return await call()
+    return await llm_memo.aget_or_call(
+        template.cache_key, resume_text, model_name, getattr(llm, "temperature", None), call, variables=variables
+    )
@@ -0,0 +1,344 @@
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+# Skill keywords recognised in the skills section; aliases map to the canonical name
+SKILL_TERMS = [
+    # Programming languages
+    "Python", "Java", "JavaScript", "TypeScript", "C", "C++", "C#", "Go", "Golang", "Rust", "Ruby", "PHP",
+    "Kotlin", "Swift", "Objective-C", "Scala", "R", "MATLAB", "Perl", "Haskell", "Elixir", "Erlang", "Clojure",
+    "Dart", "Lua", "Julia", "Fortran", "COBOL", "Visual Basic", "VBA", "Groovy", "F#", "Assembly", "Bash",
+    "Shell", "PowerShell", "SQL", "PL/SQL", "T-SQL", "NoSQL", "HTML", "HTML5", "CSS", "CSS3", "Sass", "Solidity",
+    # Frameworks and libraries
+    "React", "React Native", "Angular", "AngularJS", "Vue", "Vue.js", "Svelte", "Next.js", "Nuxt", "jQuery",
+    "Redux", "Node.js", "Express", "NestJS", "Django", "Flask", "FastAPI", "Spring", "Spring Boot", "Hibernate",
+    "Ruby on Rails", "Rails", "Laravel", "Symfony", ".NET", "ASP.NET", ".NET Core", "Entity Framework",
+    "Flutter", "Xamarin", "Ionic", "Electron", "Bootstrap", "Tailwind", "GraphQL", "gRPC", "REST", "REST APIs",
+    "Microservices", "Pandas", "NumPy", "SciPy", "scikit-learn", "TensorFlow", "PyTorch", "Keras", "XGBoost",
+    "LightGBM", "OpenCV", "NLTK", "spaCy", "Hugging Face", "LangChain", "Matplotlib", "Seaborn", "Plotly",
+    "Selenium", "Cypress", "Jest", "Mocha", "JUnit", "pytest", "Celery", "RabbitMQ", "Kafka", "Apache Kafka",
+    # Data and cloud
+    "Spark", "Apache Spark", "PySpark", "Hadoop", "Hive", "Airflow", "Apache Airflow", "dbt", "Flink", "Beam",
+    "Databricks", "Snowflake", "BigQuery", "Redshift", "Tableau", "Power BI", "Looker", "Excel", "ETL",
+    "Data Warehousing", "Data Modeling", "Data Analysis", "Data Visualization", "Statistics", "Machine Learning",
+    "Deep Learning", "NLP", "Natural Language Processing", "Computer Vision", "MLOps", "LLMs", "Generative AI",
+    "PostgreSQL", "MySQL", "SQLite", "Oracle", "SQL Server", "MongoDB", "Redis", "Cassandra", "DynamoDB",
+    "Elasticsearch", "Neo4j", "MariaDB", "Firebase", "Supabase", "AWS", "Amazon Web Services", "Azure",
+    "Microsoft Azure", "GCP", "Google Cloud", "Google Cloud Platform", "Heroku", "Vercel", "Lambda", "EC2", "S3",
+    "Docker", "Kubernetes", "Helm", "Terraform", "Ansible", "Puppet", "Chef", "Jenkins", "GitHub Actions",
+    "GitLab CI", "CircleCI", "CI/CD", "DevOps", "Linux", "Unix", "Windows", "macOS", "Nginx", "Apache",
+    "Prometheus", "Grafana", "Datadog", "Splunk", "ELK", "Git", "GitHub", "GitLab", "Bitbucket", "SVN", "Jira",
+    "Confluence", "Trello", "Notion", "Figma", "Sketch", "Adobe XD", "Photoshop", "Illustrator", "InDesign",
+    "Adobe Creative Suite", "AutoCAD", "SolidWorks", "Unity", "Unreal Engine", "Blender", "SAP", "Salesforce",
+    "HubSpot", "Google Analytics", "SEO", "SEM", "WordPress", "Shopify", "Microsoft Office", "Word", "PowerPoint",
+    "Outlook", "Google Workspace", "Networking", "TCP/IP", "Cybersecurity", "Penetration Testing", "OAuth",
+    # Practices
+    "Agile", "Scrum", "Kanban", "Lean", "Six Sigma", "TDD", "BDD", "Unit Testing", "Test Automation", "QA",
+    "OOP", "Design Patterns", "System Design", "Distributed Systems", "Cloud Computing", "Serverless",
+    "API Design", "UX", "UI", "UI/UX", "User Research", "Wireframing", "Prototyping", "Project Management",
+    "Product Management", "Business Analysis", "Financial Analysis", "Financial Modeling", "Budgeting",
+    "Forecasting", "Accounting", "Bookkeeping", "Digital Marketing", "Content Marketing", "Social Media",
+    "Copywriting", "Sales", "Customer Service", "CRM", "Recruiting", "Procurement", "Logistics",
+    "Supply Chain", "Risk Management", "Compliance",
+    # Soft skills
+    "Communication", "Leadership", "Teamwork", "Collaboration", "Problem Solving", "Problem-Solving",
+    "Critical Thinking", "Time Management", "Adaptability", "Creativity", "Negotiation", "Public Speaking",
+    "Presentation", "Mentoring", "Coaching", "Stakeholder Management", "Team Management", "People Management",
+    "Conflict Resolution", "Decision Making", "Attention to Detail", "Organization", "Multitasking",
+    "Analytical Thinking", "Interpersonal Skills", "Customer Focus", "Strategic Planning", "Emotional Intelligence",
+]
+SKILL_ALIASES = {
+    "js": "JavaScript", "ts": "TypeScript", "k8s": "Kubernetes", "postgres": "PostgreSQL", "mssql": "SQL Server",
+    "sklearn": "scikit-learn", "tf": "TensorFlow", "gcloud": "Google Cloud", "ms office": "Microsoft Office",
+    "ms excel": "Excel", "powerbi": "Power BI", "nodejs": "Node.js", "node": "Node.js", "reactjs": "React",
+    "react.js": "React", "vuejs": "Vue.js", "ml": "Machine Learning", "ai": "Artificial Intelligence",
+    "artificial intelligence": "Artificial Intelligence",
+}
+
+# Spoken languages by English name, with common native names as aliases
+LANGUAGE_NAMES = [
+    "English", "French", "German", "Spanish", "Portuguese", "Italian", "Dutch", "Flemish", "Swedish", "Norwegian",
+    "Danish", "Finnish", "Icelandic", "Polish", "Czech", "Slovak", "Slovenian", "Croatian", "Serbian", "Bosnian",
+    "Macedonian", "Bulgarian", "Romanian", "Moldovan", "Hungarian", "Greek", "Albanian", "Turkish", "Russian",
+    "Ukrainian", "Belarusian", "Lithuanian", "Latvian", "Estonian", "Georgian", "Armenian", "Azerbaijani",
+    "Kazakh", "Uzbek", "Arabic", "Hebrew", "Persian", "Farsi", "Dari", "Pashto", "Kurdish", "Urdu", "Hindi",
+    "Bengali", "Punjabi", "Gujarati", "Marathi", "Tamil", "Telugu", "Kannada", "Malayalam", "Sinhala", "Nepali",
+    "Chinese", "Mandarin", "Cantonese", "Japanese", "Korean", "Vietnamese", "Thai", "Lao", "Khmer", "Burmese",
+    "Malay", "Indonesian", "Tagalog", "Filipino", "Javanese", "Mongolian", "Tibetan", "Swahili", "Amharic",
+    "Somali", "Yoruba", "Igbo", "Hausa", "Zulu", "Xhosa", "Afrikaans", "Malagasy", "Catalan", "Basque",
+    "Galician", "Irish", "Welsh", "Scottish Gaelic", "Breton", "Luxembourgish", "Maltese", "Latin",
+    "Esperanto", "Sign Language", "American Sign Language", "British Sign Language",
+]
+LANGUAGE_ALIASES = {
+    "français": "French", "francais": "French", "deutsch": "German", "español": "Spanish", "espanol": "Spanish",
+    "castellano": "Spanish", "português": "Portuguese", "portugues": "Portuguese", "italiano": "Italian",
+    "nederlands": "Dutch", "svenska": "Swedish", "norsk": "Norwegian", "dansk": "Danish", "suomi": "Finnish",
+    "polski": "Polish", "čeština": "Czech", "română": "Romanian", "magyar": "Hungarian", "ελληνικά": "Greek",
+    "türkçe": "Turkish", "русский": "Russian", "українська": "Ukrainian", "العربية": "Arabic", "עברית": "Hebrew",
+    "فارسی": "Persian", "हिन्दी": "Hindi", "中文": "Chinese", "普通话": "Mandarin", "日本語": "Japanese",
+    "한국어": "Korean", "tiếng việt": "Vietnamese", "bahasa indonesia": "Indonesian", "bahasa melayu": "Malay",
+    "asl": "American Sign Language", "bsl": "British Sign Language",
+}
+# Fluency wordings, matched as written next to a language
+FLUENCY_TERMS = [
+    "native", "native speaker", "mother tongue", "first language", "bilingual", "fluent", "fluency", "proficient",
+    "full professional proficiency", "professional working proficiency", "limited working proficiency",
+    "elementary proficiency", "native or bilingual proficiency", "working knowledge", "advanced",
+    "upper intermediate", "upper-intermediate", "intermediate", "pre-intermediate", "conversational", "basic",
+    "beginner", "elementary", "a1", "a2", "b1", "b2", "c1", "c2",
+]
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[a-z]{2,}", re.IGNORECASE)
+_PHONE_RE = re.compile(r"(?<![\w/.])\+?\(?\d[\d \t().-]{5,}\d(?![\w/])")
+_YEAR_RANGE_RE = re.compile(r"(?:19|20)\d\d\s*[-–.]\s*(?:(?:19|20)\d\d|\d\d)")
+_URL_RE = re.compile(
+    r"(?:https?://|www\.)[^\s|,;<>()\"']+"
+    r"|(?<![@\w.-])(?:[a-z0-9-]+\.)+(?:com|org|net|io|dev|me|co|ai|app|info|site|page|xyz|tech|de|fr|uk|es|it|nl|eu)"
+    r"/[^\s|,;<>()\"']+",
+    re.IGNORECASE,
+)
+_ITEM_LABEL_RE = re.compile(r"^[^:]{1,40}:\s*")
+_BULLET_RE = re.compile(r"^[\s\-*•▪●–·]+")
+
+# Lines at the top of an unsegmented resume searched for contact details
+HEADER_LINES = 8
+# Confidence of an email found outside the contact region
+OUTSIDE_CONTACT_CONFIDENCE = 0.5
+# LLM placeholders for a contact field it did not find
+EMPTY_CONTACT_VALUES = {"", "unknown", "none", "n/a", "not provided", "not available"}
+# Longer skill items are sentences: only their dictionary keywords are kept
+MAX_SKILL_WORDS = 5
+
+class Match(NamedTuple):
+    term: str  # canonical dictionary entry
+    start: int
+    end: int
+
+class Extraction(NamedTuple):
+    values: List[Any]
+    confidence: float  # share of the section's items that were recognized
+
+class PhraseIndex:
+    """
+    Aho-Corasick automaton over a phrase dictionary, finding every phrase in
+    one pass over the text.
+
+    Matching is case-insensitive and only whole words count: a match may
+    not be preceded or followed by a letter or digit.
+    """
+
+    def __init__(self, phrases: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[tuple]] = [[]]  # (phrase length, canonical term) ending at the node
+        for phrase, term in phrases.items():
+            node = 0
+            for char in phrase.lower():
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                    self._goto[node][char] = child
+                node = child
+            self._outputs[node].append((len(phrase), term))
+        # Failure links, breadth first: the longest proper suffix that is also a prefix
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def find(self, text: str) -> List[Match]:
+        """Leftmost-longest whole-word matches, not overlapping, in text order"""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lowercase to several; keep offsets aligned with text
+            lowered = "".join(char.lower()[:1] for char in text)
+        found = []
+        node = 0
+        for end, char in enumerate(lowered, 1):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, term in self._outputs[node]:
+                start = end - length
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    found.append(Match(term, start, end))
+        found.sort(key=lambda match: (match.start, match.start - match.end))
+        matches, last_end = [], 0
+        for match in found:
+            if match.start >= last_end:
+                matches.append(match)
+                last_end = match.end
+        return matches
+
+def build_index(terms: Iterable[str], aliases: Optional[Dict[str, str]] = None) -> PhraseIndex:
+    return PhraseIndex({**{term: term for term in terms}, **(aliases or {})})
+
+# Built once at import and shared by all analyses
+skill_index = build_index(SKILL_TERMS, SKILL_ALIASES)
+language_index = build_index(LANGUAGE_NAMES, LANGUAGE_ALIASES)
+fluency_index = build_index(FLUENCY_TERMS)
+
+def section_body(span: str) -> str:
+    """A section span without its heading line; keeps text after a "Heading:" colon."""
+    heading, _, rest = span.partition("\n")
+    _, colon, inline = heading.partition(":")
+    return f"{inline}\n{rest}" if colon else rest
+
+def split_items(text: str) -> List[str]:
+    """List items of a section: separated by lines, commas, semicolons, pipes or bullets, outside parentheses."""
+    items, current, depth = [], [], 0
+    for char in text:
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(depth - 1, 0)
+        elif char == "\n" or (depth == 0 and char in ",;|•·▪●"):
+            items.append("".join(current))
+            current = []
+            depth = 0
+            continue
+        current.append(char)
+    items.append("".join(current))
+    cleaned = [_BULLET_RE.sub("", item).strip().rstrip(".") for item in items]
+    return [item for item in cleaned if any(char.isalnum() for char in item)]
+
+def unmatched_words(text: str, matches: List[Match]) -> List[str]:
+    """Words of text outside the matches"""
+    pieces, last_end = [], 0
+    for match in matches:
+        pieces.append(text[last_end:match.start])
+        last_end = match.end
+    pieces.append(text[last_end:])
+    return re.findall(r"\w+", " ".join(pieces))
+
+def extract_skills(span: Optional[str]) -> Extraction:
+    """
+    Skills listed in the skills section span, in order.
+
+    Short items are kept as written ("Python (Pandas, NumPy)"); sentences
+    contribute only their dictionary keywords. Confidence is the share of
+    items containing a known skill.
+    """
+    if not span:
+        return Extraction([], 0.0)
+    skills: Dict[str, str] = {}
+    recognized = 0
+    items = [_ITEM_LABEL_RE.sub("", item) for item in split_items(section_body(span))]
+    items = [item for item in items if item]
+    for item in items:
+        matches = skill_index.find(item)
+        recognized += bool(matches)
+        values = [item] if len(item.split()) <= MAX_SKILL_WORDS else [match.term for match in matches]
+        for value in values:
+            skills.setdefault(value.lower(), value)
+    return Extraction(list(skills.values()), recognized / len(items) if items else 0.0)
+
+def extract_languages(span: Optional[str]) -> Extraction:
+    """
+    Spoken languages of the languages section span with their fluency.
+
+    Values are {"spoken_language", "language_fluency"} entries with English
+    language names. A language takes the fluency written after it (before
+    the next language), else a fluency written before all languages of the
+    item ("Fluent in English and German"). Confidence is the share of items naming a known language or just a
+    fluency.
+    """
+    if not span:
+        return Extraction([], 0.0)
+    languages: Dict[str, Dict[str, str]] = {}
+    recognized = 0
+    items = split_items(section_body(span))
+    for item in items:
+        found = language_index.find(item)
+        levels = fluency_index.find(item)
+        recognized += bool(found) or (bool(levels) and not unmatched_words(item, levels))
+        for index, language in enumerate(found):
+            next_start = found[index + 1].start if index + 1 < len(found) else len(item)
+            after = [level for level in levels if language.end <= level.start < next_start]
+            leading = [level for level in levels if level.end <= found[0].start]
+            level = (after or leading[-1:] or [None])[0]
+            fluency = item[level.start:level.end] if level else "unknown"
+            entry = languages.setdefault(language.term, {"spoken_language": language.term, "language_fluency": "unknown"})
+            if entry["language_fluency"] == "unknown":
+                entry["language_fluency"] = fluency
+    if not languages:
+        return Extraction([], 0.0)
+    return Extraction(list(languages.values()), recognized / len(items))
+
+def contact_region(resume_text: str, segments=None) -> str:
+    """The contact section span, else the first lines of the resume."""
+    span = segments.span_text("Contact Information") if segments is not None else None
+    return span or "\n".join(resume_text.strip().splitlines()[:HEADER_LINES])
+
+def phone_numbers(text: str) -> Iterable[str]:
+    """Phone numbers in text, as written: 7 to 15 digits that are not a year range"""
+    for match in _PHONE_RE.finditer(text):
+        phone = match.group().strip()
+        digits = sum(char.isdigit() for char in phone)
+        if 7 <= digits <= 15 and not _YEAR_RANGE_RE.fullmatch(phone):
+            yield phone
+
+def extract_contact(resume_text: str, segments=None) -> Dict[str, Extraction]:
+    """
+    Email, phone number and profile URLs of the contact region, keyed by
+    ContactInformation field; fields not found are left out.
+
+    Values found in the contact region have confidence 1; an email only
+    found elsewhere in the resume has OUTSIDE_CONTACT_CONFIDENCE.
+    """
+    region = contact_region(resume_text, segments)
+    contact: Dict[str, Extraction] = {}
+    email = _EMAIL_RE.search(region)
+    if email:
+        contact["candidate_email"] = Extraction([email.group()], 1.0)
+    else:
+        email = _EMAIL_RE.search(resume_text)
+        if email:
+            contact["candidate_email"] = Extraction([email.group()], OUTSIDE_CONTACT_CONFIDENCE)
+    phone = next(iter(phone_numbers(region)), None)
+    if phone:
+        contact["candidate_phone"] = Extraction([phone], 1.0)
+    emails = {match.span() for match in _EMAIL_RE.finditer(region)}
+    urls = []
+    for match in _URL_RE.finditer(region):
+        if any(start <= match.start() < end for start, end in emails):
+            continue
+        url = match.group().rstrip(".")
+        url = url if url.lower().startswith("http") else f"https://{url}"
+        if url not in urls:
+            urls.append(url)
+    if urls:
+        contact["candidate_social_media"] = Extraction(urls, 1.0)
+    return contact
+
+def _bare_url(url: str) -> str:
+    return re.sub(r"^(?:https?://)?(?:www\.)?", "", url.strip().lower()).rstrip("/")
+
+def contact_value_found(field: str, value: Any, resume_text: str) -> bool:
+    """
+    Whether an LLM's contact field value is filled in and appears in the
+    resume: emails and profile URLs as written (ignoring case, URL scheme
+    and "www."), phone numbers by their digits. A value failing this was
+    left empty or made up, and may be replaced by a local extraction.
+    """
+    if field == "candidate_social_media":
+        return bool(value) and isinstance(value, list) and all(
+            isinstance(url, str) and _bare_url(url) and _bare_url(url) in resume_text.lower() for url in value
+        )
+    if not isinstance(value, str) or value.strip().lower() in EMPTY_CONTACT_VALUES:
+        return False
+    if field == "candidate_email":
+        return bool(_EMAIL_RE.fullmatch(value.strip())) and value.strip().lower() in resume_text.lower()
+    if field == "candidate_phone":
+        digits = re.sub(r"\D", "", value)
+        return len(digits) >= 7 and any(digits in re.sub(r"\D", "", phone) for phone in phone_numbers(resume_text))
+    return True
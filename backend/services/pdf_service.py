@@ -1,29 +1,352 @@
+import asyncio
+import hashlib
+import html
+import json
+import os
+import string
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
 import pdfkit
 
-def generate_pdf(document_id: str, analysis_results):
+from config import PDF_RENDER_WORKERS, PDF_REPORTS_DIR, PDF_REPORT_CACHE_MAX_BYTES
+
+# 1. HTML templates, compiled once at import
+
+PAGE_TEMPLATE = string.Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Resume Analysis Report</title>
+<style>
+body { font-family: Helvetica, Arial, sans-serif; font-size: 11pt; color: #222; margin: 0 24px; }
+h1 { font-size: 20pt; margin-bottom: 4px; }
+h2 { font-size: 14pt; border-bottom: 1px solid #ccc; padding-bottom: 2px; margin-top: 22px; }
+h3 { font-size: 12pt; margin: 12px 0 2px; }
+.score { float: right; font-weight: bold; }
+.muted { color: #666; }
+</style>
+</head>
+<body>
+<h1>Resume Analysis Report</h1>
+<p class="muted">$candidate_name &middot; $candidate_title</p>
+$sections
+</body>
+</html>
+""")
+
+SECTION_TEMPLATE = string.Template("""<h2>$title <span class="score">$score</span></h2>
+$body
+""")
+
+ENTRY_TEMPLATE = string.Template("""<h3>$title <span class="muted">$subtitle</span> <span class="score">$score</span></h3>
+$body
+""")
+
+PARAGRAPH_TEMPLATE = string.Template("<p><b>$label</b> $text</p>\n")
+
+# wkhtmltopdf options; part of the template version since they change the output
+PDF_OPTIONS = {"page-size": "A4", "encoding": "UTF-8", "margin-top": "12mm", "margin-bottom": "12mm", "quiet": ""}
+
+# Changes whenever the templates or PDF options change, invalidating cached reports
+TEMPLATE_VERSION = hashlib.sha256(
+    "\0".join([
+        PAGE_TEMPLATE.template,
+        SECTION_TEMPLATE.template,
+        ENTRY_TEMPLATE.template,
+        PARAGRAPH_TEMPLATE.template,
+        json.dumps(PDF_OPTIONS, sort_keys=True),
+    ]).encode()
+).hexdigest()[:12]
+
+def _text(value: Any) -> str:
+    if value is None:
+        return "unknown"
+    if isinstance(value, list):
+        return ", ".join(_text(item) for item in value) or "none"
+    return html.escape(str(value)).replace("\n", "<br>")
+
+def _score(value: Any) -> str:
+    return f"{value}/100" if isinstance(value, int) and value >= 0 else ""
+
+def _paragraphs(*rows: Tuple[str, Any]) -> str:
+    return "".join(
+        PARAGRAPH_TEMPLATE.substitute(label=html.escape(label), text=_text(value))
+        for label, value in rows
+        if value not in (None, "", [])
+    )
+
+def _section(title: str, score: Any, body: str) -> str:
+    return SECTION_TEMPLATE.substitute(title=html.escape(title), score=_score(score), body=body)
+
+def _entry(title: Any, subtitle: str, score: Any, body: str) -> str:
+    return ENTRY_TEMPLATE.substitute(title=_text(title), subtitle=html.escape(subtitle), score=_score(score), body=body)
+
+def _dates(entry: Dict[str, Any], start: str, end: str) -> str:
+    dates = [entry.get(start), entry.get(end)]
+    return " - ".join(str(date) for date in dates if date and date != "unknown")
+
+def render_report_html(results: Dict[str, Any]) -> str:
     """
-    Generate a PDF file containing the resume analysis results.
+    Render stored analysis results (a ResumeAnalysisResponse dict) to HTML.
 
-    Args:
-        document_id (str): ID of the analyzed document.
-        analysis_results: The analysis results to include in the PDF.
+    Sections missing from older results are left out.
+    """
+    contact = results.get("contact_info") or {}
+    summary = results.get("summary") or {}
+    skills = results.get("skills") or {}
+    education = results.get("education") or {}
+    languages = results.get("languages") or {}
+    certifications = results.get("certifications") or {}
+    overview = results.get("overview") or {}
+
+    sections = [
+        _section("Overview", None, _paragraphs(
+            ("Overview:", overview.get("resume_cv_overview")),
+            ("Strengths:", overview.get("top_3_strengths")),
+            ("Weaknesses:", overview.get("top_3_weaknesses")),
+        )) if overview else "",
+        _section("Contact Information", contact.get("score_ContactInfo"), _paragraphs(
+            ("Name:", contact.get("candidate_name")),
+            ("Title:", contact.get("candidate_title")),
+            ("Location:", contact.get("candidate_location")),
+            ("Email:", contact.get("candidate_email")),
+            ("Phone:", contact.get("candidate_phone")),
+            ("Links:", contact.get("candidate_social_media")),
+            ("Evaluation:", contact.get("evaluation_ContactInfo")),
+        )),
+        _section("Summary", summary.get("score_summary"), _paragraphs(
+            ("Summary:", summary.get("CV_summary")),
+            ("Evaluation:", summary.get("evaluation_summary")),
+            ("Suggested summary:", summary.get("CV_summary_enhanced")),
+        )),
+        _section("Work Experience", None, "".join(
+            _entry(job.get("job_title"), " ".join(filter(None, [job.get("company"), _dates(job, "start_date", "end_date")])),
+                   job.get("score"), _paragraphs(
+                       ("Responsibilities:", job.get("responsibilities")),
+                       ("Comments:", job.get("comments")),
+                       ("Improvement:", job.get("improvement")),
+                   ))
+            for job in results.get("work_experience") or []
+        )),
+        _section("Projects", None, "".join(
+            _entry(project.get("project_title"), _dates(project, "start_date", "end_date"), project.get("score_project"),
+                   _paragraphs(
+                       ("Description:", project.get("project_description")),
+                       ("Comments:", project.get("comments_project")),
+                       ("Improvement:", project.get("improvement_project")),
+                   ))
+            for project in results.get("projects") or []
+        )),
+        _section("Skills", skills.get("score_skills"), _paragraphs(
+            ("Skills:", skills.get("candidate_skills")),
+            ("Evaluation:", skills.get("evaluation_skills")),
+        )),
+        _section("Education", education.get("score_edu"), "".join(
+            _entry(entry.get("edu_degree"), " ".join(filter(None, [entry.get("edu_college"), _dates(entry, "edu_start_date", "edu_end_date")])), None, "")
+            for entry in education.get("education") or []
+        ) + _paragraphs(("Evaluation:", education.get("evaluation_edu")))) if education else "",
+        _section("Languages", languages.get("score_language"), _paragraphs(
+            ("Languages:", [f"{entry.get('spoken_language')} ({entry.get('language_fluency')})" for entry in languages.get("languages") or []]),
+            ("Evaluation:", languages.get("evaluation_language")),
+        )) if languages else "",
+        _section("Certifications", certifications.get("score_certif"), "".join(
+            _entry(entry.get("certif_title"), " ".join(filter(None, [entry.get("certif_organization"), _dates(entry, "certif_date", "certif_expiry_date")])), None, "")
+            for entry in certifications.get("certifications") or []
+        ) + _paragraphs(("Evaluation:", certifications.get("evaluation_certif")))) if certifications else "",
+    ]
+    return PAGE_TEMPLATE.substitute(
+        candidate_name=_text(contact.get("candidate_name")),
+        candidate_title=_text(contact.get("candidate_title")),
+        sections="".join(sections),
+    )
+
+def analysis_hash(results: Dict[str, Any]) -> str:
+    """Content hash of analysis results, independent of key order"""
+    return hashlib.sha256(json.dumps(results, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+# 2. Rendering
 
-    Returns:
-        str: Path to the generated PDF file.
+@lru_cache(maxsize=1)
+def wkhtmltopdf_configuration():
     """
-    # Construct HTML content for the PDF using analysis results
-    html_content = f"""
-    <h1>Resume Analysis Report</h1>
-    <h2>Contact Information</h2>
-    <p>Name: {analysis_results.contact_info.candidate_name}</p>
-    <p>Email: {analysis_results.contact_info.candidate_email}</p>
-    <h2>Summary Evaluation</h2>
-    <p>Summary: {analysis_results.summary.CV_summary}</p>
-    <p>Score: {analysis_results.summary.score_summary}</p>
+    Locate the wkhtmltopdf binary once; pdfkit otherwise runs `which` for every report.
     """
+    return pdfkit.configuration()
+
+def render_with_wkhtmltopdf(html_content: str, output_path: Path):
+    pdfkit.from_string(html_content, str(output_path), options=PDF_OPTIONS, configuration=wkhtmltopdf_configuration())
+
+class ReportRenderer:
+    """
+    PDF reports rendered by a bounded pool of workers and cached on disk.
+
+    Reports are keyed by (analysis hash, TEMPLATE_VERSION), so the same
+    results are rendered once and later requests are served from disk.
+    At most `workers` renderer processes (wkhtmltopdf) run at a time;
+    concurrent requests for a report already being rendered share its
+    render. Files are written under a temporary name and renamed, so a
+    partially written PDF is never served. Once the cache exceeds
+    `max_bytes`, the least recently written reports are removed, except
+    reports still being rendered or held by a caller (see `render`).
+
+    Args:
+        directory: Where reports are cached.
+        workers: Renderer processes run at once.
+        render: render(html, output_path); defaults to wkhtmltopdf via pdfkit.
+        max_bytes: Cache size limit; 0 disables the limit.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        workers: int = 2,
+        render: Optional[Callable[[str, Path], None]] = None,
+        max_bytes: int = 0,
+    ):
+        self.directory = Path(directory)
+        self.workers = max(1, workers)
+        self.render_pdf = render or render_with_wkhtmltopdf
+        self.max_bytes = max_bytes
+        self._executor = None
+        self._in_flight: Dict[str, Future] = {}
+        # Report name -> callers holding it; held reports are never pruned
+        self._held: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats_counters = {"rendered": 0, "cache_hits": 0, "shared": 0, "failed": 0}
+
+    def path_for(self, results: Dict[str, Any]) -> Path:
+        return self.directory / f"report-{analysis_hash(results)}-{TEMPLATE_VERSION}.pdf"
+
+    def submit(self, results: Dict[str, Any], hold: bool = False) -> Tuple[Future, bool]:
+        """
+        Start rendering the report for `results` unless it is cached or already in flight.
+
+        With `hold`, the report is protected from pruning until `release`.
+
+        Returns:
+            (future resolving to the PDF path, whether it was served from the cache)
+        """
+        path = self.path_for(results)
+        with self._lock:
+            if hold:
+                self._held[path.name] = self._held.get(path.name, 0) + 1
+            if path.exists():
+                self.stats_counters["cache_hits"] += 1
+                future = Future()
+                future.set_result(path)
+                return future, True
+            future = self._in_flight.get(path.name)
+            if future is not None:
+                self.stats_counters["shared"] += 1
+                return future, False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf-render")
+            future = self._executor.submit(self._render, results, path)
+            self._in_flight[path.name] = future
+        return future, False
+
+    async def render(self, results: Dict[str, Any], hold: bool = False) -> Tuple[Path, bool]:
+        """
+        Awaitable `submit`: the event loop keeps serving requests while workers render.
+
+        With `hold`, the returned report is not pruned (by renders of other
+        reports) until the caller passes it to `release`; a failed render
+        releases it itself.
+        """
+        future, cached = self.submit(results, hold)
+        try:
+            return await asyncio.wrap_future(future), cached
+        except BaseException:
+            if hold:
+                self.release([self.path_for(results)])
+            raise
+
+    def release(self, paths: Iterable[Path]):
+        """Let reports held by `render(..., hold=True)` be pruned again"""
+        with self._lock:
+            for path in paths:
+                count = self._held.get(path.name, 0) - 1
+                if count > 0:
+                    self._held[path.name] = count
+                else:
+                    self._held.pop(path.name, None)
+
+    def _render(self, results: Dict[str, Any], path: Path) -> Path:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            html_content = render_report_html(results)
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".render-", suffix=".pdf")
+            os.close(fd)
+            try:
+                self.render_pdf(html_content, Path(tmp_name))
+                os.replace(tmp_name, path)
+            finally:
+                if os.path.exists(tmp_name):
+                    os.remove(tmp_name)
+            with self._lock:
+                self.stats_counters["rendered"] += 1
+            self._prune()
+            return path
+        except Exception:
+            with self._lock:
+                self.stats_counters["failed"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(path.name, None)
+
+    def _prune(self):
+        if not self.max_bytes:
+            return
+        reports = []
+        for path in self.directory.glob("report-*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            reports.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in reports)
+        # Under the lock, so a report cannot be held or served from the cache while it is removed
+        with self._lock:
+            for _, size, path in sorted(reports):
+                if total <= self.max_bytes:
+                    break
+                if path.name in self._held or path.name in self._in_flight:
+                    continue
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def export_zip(self, reports: Iterable[Tuple[str, Path]], manifest: List[Dict[str, Any]]) -> Path:
+        """
+        Bundle rendered reports, named by document ID, into a temporary zip with a manifest.json.
+
+        The caller removes the returned file.
+        """
+        fd, zip_name = tempfile.mkstemp(prefix="reports-", suffix=".zip")
+        os.close(fd)
+        # PDFs are already compressed; storing them keeps the export cheap
+        with zipfile.ZipFile(zip_name, "w", compression=zipfile.ZIP_STORED) as archive:
+            for document_id, path in reports:
+                archive.write(path, f"resume_analysis_{document_id}.pdf")
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+        return Path(zip_name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats_counters, "in_flight": len(self._in_flight), "held": len(self._held), "workers": self.workers
+            }
 
-    # Generate PDF and save to file
-    pdf_file = f"./static/reports/resume_analysis_{document_id}.pdf"
-    pdfkit.from_string(html_content, pdf_file)
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
 
-    return pdf_file
+pdf_reports = ReportRenderer(PDF_REPORTS_DIR, workers=PDF_RENDER_WORKERS, max_bytes=PDF_REPORT_CACHE_MAX_BYTES)
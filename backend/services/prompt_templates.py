@@ -0,0 +1,161 @@
+import hashlib
+import string
+from typing import Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple, Union
+
+RESUME_VARIABLE = "resume"
+
+class TemplateError(ValueError):
+    """A prompt template that cannot be compiled or rendered"""
+
+def _parse(text: str, key: str) -> List[Tuple[str, Optional[str], str, Optional[str]]]:
+    try:
+        fields = list(string.Formatter().parse(text))
+    except ValueError as e:
+        raise TemplateError(f"{key}: {e}")
+    for _, name, _, _ in fields:
+        if name is not None and not name.isidentifier():
+            raise TemplateError(f"{key}: placeholders must be plain names, got {{{name}}}")
+    return fields
+
+class PromptTemplate:
+    """
+    A template compiled once into literal text and the fields left to fill.
+
+    Variables with a registry default are substituted at compile time; the
+    remaining ones (`variables`) must be passed to `render`. Rendered prompts
+    are the shared resume prefix followed by the instructions.
+    """
+
+    def __init__(self, key: str, instructions: str, prefix: Tuple[str, str], defaults: Mapping[str, str]):
+        self.key = key
+        self.prefix_head, self.prefix_tail = prefix
+        self._parts: List[Union[str, Tuple[str, str, Optional[str]]]] = []
+        for literal, name, format_spec, conversion in _parse(instructions, key):
+            if literal:
+                self._parts.append(literal)
+            if name is None:
+                continue
+            if name == RESUME_VARIABLE:
+                raise TemplateError(f"{key}: the resume goes in the shared prefix, not in {{{RESUME_VARIABLE}}}")
+            if name in defaults:
+                self._parts.append(self._format(defaults[name], format_spec, conversion))
+            else:
+                self._parts.append((name, format_spec, conversion))
+        # Merge adjacent literals so rendering is one join over few parts
+        merged: List[Union[str, Tuple[str, str, Optional[str]]]] = []
+        for part in self._parts:
+            if isinstance(part, str) and merged and isinstance(merged[-1], str):
+                merged[-1] += part
+            else:
+                merged.append(part)
+        self._parts = merged
+        self.variables: FrozenSet[str] = frozenset(part[0] for part in merged if isinstance(part, tuple))
+        self._static = merged[0] if len(merged) == 1 and isinstance(merged[0], str) else None
+        source = "\0".join(
+            [self.prefix_head, self.prefix_tail]
+            + [part if isinstance(part, str) else "{%s:%s!%s}" % part for part in merged]
+        )
+        self.version = hashlib.sha256(source.encode()).hexdigest()[:12]
+
+    @staticmethod
+    def _format(value, format_spec: str, conversion: Optional[str]) -> str:
+        if conversion == "r":
+            value = repr(value)
+        elif conversion == "a":
+            value = ascii(value)
+        elif conversion == "s":
+            value = str(value)
+        return format(value, format_spec)
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Identifies the rendered prompt text up to its variables; changes
+        whenever the template, prefix or defaults change.
+        """
+        return f"{self.key}@{self.version}"
+
+    def check(self, variables: Mapping[str, object]):
+        """
+        Raise TemplateError unless `variables` are exactly the ones this template needs.
+        """
+        missing = self.variables - variables.keys()
+        unexpected = variables.keys() - self.variables
+        if missing or unexpected:
+            problems = []
+            if missing:
+                problems.append(f"missing {', '.join(sorted(missing))}")
+            if unexpected:
+                problems.append(f"unexpected {', '.join(sorted(unexpected))}")
+            raise TemplateError(f"Template {self.key}: {'; '.join(problems)}")
+
+    def instructions(self, **variables) -> str:
+        """The template text after the prefix, with its variables filled in."""
+        if self._static is not None and not variables:
+            return self._static
+        self.check(variables)
+        return "".join(
+            part if isinstance(part, str) else self._format(variables[part[0]], part[1], part[2])
+            for part in self._parts
+        )
+
+    def prefix(self, resume: str) -> str:
+        return self.prefix_head + resume + self.prefix_tail
+
+    def render(self, resume: str, **variables) -> str:
+        """
+        Full prompt: the resume prefix, identical for every template, then the instructions.
+
+        Raises:
+            TemplateError: if a variable is missing or not used by the template.
+        """
+        return self.prefix_head + resume + self.prefix_tail + self.instructions(**variables)
+
+class TemplateRegistry(Mapping[str, PromptTemplate]):
+    """
+    Every prompt template compiled and validated up front.
+
+    Construction fails with a TemplateError listing every malformed template
+    (bad braces, positional fields, a {resume} placeholder), so problems
+    surface at import rather than on the first LLM call.
+
+    Args:
+        templates: template key -> instructions text.
+        prefix: text before the instructions, with a single {resume} placeholder.
+        defaults: values for variables shared by all templates, e.g. {language}.
+    """
+
+    def __init__(self, templates: Mapping[str, str], prefix: str, defaults: Optional[Mapping[str, str]] = None):
+        prefix_fields = {name for _, name, _, _ in _parse(prefix, "prefix") if name is not None}
+        if prefix_fields != {RESUME_VARIABLE}:
+            raise TemplateError(f"prefix: needs exactly one {{{RESUME_VARIABLE}}} placeholder, got {sorted(prefix_fields)}")
+        head, tail = prefix.format(**{RESUME_VARIABLE: "\0"}).split("\0")
+        self.defaults = dict(defaults or {})
+        self._templates: Dict[str, PromptTemplate] = {}
+        errors = []
+        for key, text in templates.items():
+            try:
+                self._templates[key] = PromptTemplate(key, text, (head, tail), self.defaults)
+            except TemplateError as e:
+                errors.append(str(e))
+        if errors:
+            raise TemplateError("Invalid prompt templates:\n" + "\n".join(errors))
+
+    def __getitem__(self, key: str) -> PromptTemplate:
+        try:
+            return self._templates[key]
+        except KeyError:
+            raise KeyError(f"Unknown prompt template {key!r}; known templates: {', '.join(sorted(self._templates))}")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._templates)
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def variables(self) -> Dict[str, FrozenSet[str]]:
+        """Per-call variables each template still needs after defaults."""
+        return {key: template.variables for key, template in self._templates.items()}
+
+    def versions(self) -> Dict[str, str]:
+        return {key: template.version for key, template in self._templates.items()}
@@ -1,46 +1,149 @@
-from services.llm_service import instantiate_llm, invoke_llm
+import hashlib
+import json
+import logging
+from services.analysis_pipeline import iter_pipeline_events, response_issue
+from services.llm_service import invoke_cascade
+from shared.pdf_extraction import PageLayout, iter_file_page_layouts, join_pages
+from shared.section_segmenter import segment_document
+from services.job_queue import JobQueue, JobStore
+from shared.telemetry import SlowRequestProfiler, telemetry
 from models.resume_analysis import ResumeAnalysisResponse
-from config import OPENAI_API_KEY
-from app_constants import templates  # Contains prompt templates
+from config import (
+    OPENAI_API_KEY,
+    ANALYSIS_JOB_LEASE_SECONDS,
+    ANALYSIS_JOB_WORKERS,
+    ANALYSIS_JOBS_DB,
+    ANALYSIS_PIPELINE_WORKERS,
+    LLM_CASCADE_MIN_WORDS,
+    LOCAL_EXTRACTION_MIN_CONFIDENCE,
+    PROFILE_SLOW_SECONDS,
+    PROFILE_DIR,
+)
 
-def load_resume_text(file_path: str) -> str:
+logger = logging.getLogger(__name__)
+
+# Writes a sampled stack profile of analyses slower than PROFILE_SLOW_SECONDS
+slow_request_profiler = SlowRequestProfiler(PROFILE_SLOW_SECONDS, PROFILE_DIR)
+
+def load_resume_layout(file_path: str) -> PageLayout:
     """
     Load the resume content from the uploaded file.
+
+    PDFs are extracted with pdfminer, keeping the font size and weight of
+    each line for section detection; other files are read as plain text.
+    """
+    with telemetry.span("pdf_extraction") as span:
+        with open(file_path, 'rb') as file:
+            is_pdf = file.read(5) == b'%PDF-'
+            if is_pdf:
+                file.seek(0)
+                pages = list(iter_file_page_layouts(file))
+                span.set(pages=len(pages))
+                layout = join_pages(pages)
+        if not is_pdf:
+            with open(file_path, 'r') as file:
+                layout = PageLayout(file.read(), [])
+        span.set(characters=len(layout.text))
+        return layout
+
+def iter_analysis_events(document_id: str):
+    """
+    Analyze the resume, yielding each section result as soon as it is ready.
+
+    Yields (event, data) pairs: a "section" event per analyzed section, with
+    the overall score of the sections scored so far, then a final "result"
+    event carrying the full ResumeAnalysisResponse, overallScore and the
+    timing of every pipeline stage (see services/analysis_pipeline.py).
+    "progress" events report each stage as it finishes. The whole run is
+    recorded as an "analysis" telemetry span.
     """
-    with open(file_path, 'r') as file:
-        return file.read()
+    with telemetry.span("analysis"):
+        # Load the resume content from the uploaded file
+        layout = load_resume_layout(f"./tmp/{document_id}")
+        resume_text = layout.text
+        # Split the resume into sections once, using the line styles to find headings;
+        # used to compact long resumes and locate entries
+        segments = segment_document(resume_text, layout.lines)
+
+        # Each call starts on the cheapest model tier (shared clients) and is escalated if its response looks wrong
+        def invoke(template_key, **variables):
+            return invoke_cascade(
+                resume_text, template_key, lambda text: response_issue(template_key, text, LLM_CASCADE_MIN_WORDS),
+                segments=segments, **variables
+            )
+
+        # LOCAL_EXTRACTION_MIN_CONFIDENCE above 1 turns local extraction off
+        min_local_confidence = LOCAL_EXTRACTION_MIN_CONFIDENCE if LOCAL_EXTRACTION_MIN_CONFIDENCE <= 1 else None
+        yield from iter_pipeline_events(
+            invoke, resume_text, segments,
+            max_workers=ANALYSIS_PIPELINE_WORKERS, min_local_confidence=min_local_confidence,
+        )
 
 def analyze_resume(document_id: str):
     """
     Analyze the resume by invoking LLM with various prompts and returning results.
     """
-    # Load the resume content from the uploaded file
-    resume_text = load_resume_text(f"./tmp/{document_id}")
-
-    # Instantiate LLM using OpenAI or another provider
-    llm = instantiate_llm(
-        provider="OpenAI",
-        temperature=0.5,
-        model_name="gpt-3.5-turbo"
-    )
-
-    # Example: Analyze summary section using LLM
-    summary_content = invoke_llm(
-        llm,
-        resume_text,
-        template_key="PROMPT_EVALUATE_RESUME"
-    )
-
-    # Build the response using dynamic fields
-    response_data = {
-        "contact_info": {
-            "candidate_name": "John Doe",
-            "candidate_email": "johndoe@example.com"
-        },
-        "summary": {"CV_summary": summary_content, "score_summary": 85},
-        "work_experience": [],
-        "projects": [],
-        "skills": {"candidate_skills": ["Python", "React"], "score_skills": 90}
-    }
-
-    return ResumeAnalysisResponse(**response_data)
+    # Run the generator to the end so its analysis span closes with the result
+    for event, data in iter_analysis_events(document_id):
+        if event == "result":
+            results = data["results"]
+    return ResumeAnalysisResponse(**results)
+
+def analyze_document(document_id: str) -> dict:
+    """
+    Job handler: analyze the resume and return the JSON-serializable results.
+
+    Logs the seconds spent per span (PDF extraction, LLM calls, parsing, ...)
+    and the path of the slow-request profile, if any, as one JSON message;
+    the span durations also feed the telemetry histograms.
+    """
+    with slow_request_profiler.profile(f"analysis-{document_id}") as profile, telemetry.trace() as trace:
+        results = analyze_resume(document_id).model_dump()
+    logger.info("%s", json.dumps({
+        "event": "analysis_timings",
+        "document_id": document_id,
+        "seconds": round(trace.elapsed(), 4),
+        "spans": trace.totals(),
+        **({"profile": profile["path"]} if "path" in profile else {}),
+    }))
+    return results
+
+analysis_jobs = JobQueue(
+    JobStore(ANALYSIS_JOBS_DB), analyze_document, workers=ANALYSIS_JOB_WORKERS, lease_seconds=ANALYSIS_JOB_LEASE_SECONDS
+)
+
+def submit_analysis_job(document_id: str):
+    """
+    Queue analysis of an uploaded resume.
+
+    Uploads with identical content share the job that is already in flight.
+
+    Returns:
+        (job_id, deduplicated)
+    """
+    with open(f"./tmp/{document_id}", 'rb') as file:
+        dedup_key = hashlib.sha256(file.read()).hexdigest()
+    return analysis_jobs.submit(document_id, dedup_key)
+
+def get_saved_analysis_results(document_id: str):
+    """
+    Return the stored analysis results for a document, or None if its job
+    is missing, still in flight or failed.
+    """
+    job = analysis_jobs.store.get_for_document(document_id)
+    if job is None or job["status"] != "done":
+        return None
+    return job["result"]
+
+def load_results(document_id: str):
+    """
+    Stored results and job status of a document: (results, None) once
+    analyzed, (None, job) while its job is queued or running, else (None, None).
+    """
+    results = get_saved_analysis_results(document_id)
+    if results:
+        return results, None
+    job = analysis_jobs.store.get_for_document(document_id)
+    if job is not None and job["status"] in ("queued", "running"):
+        return None, job
+    return None, None
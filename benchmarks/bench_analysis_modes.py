@@ -0,0 +1,87 @@
+"""Compare tokens and wall time of the resume analysis modes.
+
+Usage:
+    python benchmarks/bench_analysis_modes.py path/to/resume.pdf [--runs 3] [--modes sequential,batched]
+
+Runs `analyze_resume` against the configured Gemini model tiers and reports, per
+mode, the number of LLM calls, prompt/response tokens (from the response
+usage metadata) and wall time.
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+
+import resume_service  # noqa: E402
+
+
+class CountingModel:
+    """Wraps the Gemini model and accumulates per-call token usage"""
+
+    def __init__(self, model):
+        self.model = model
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+
+    def generate_content(self, prompt, **kwargs):
+        response = self.model.generate_content(prompt, **kwargs)
+        self.calls += 1
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_token_count
+            self.response_tokens += usage.candidates_token_count
+        return response
+
+
+def run_mode(mode: str, file_bytes: bytes, filename: str, runs: int, counters: List[CountingModel]) -> dict:
+    timings = []
+    for counter in counters:
+        counter.reset()
+    for _ in range(runs):
+        start = time.perf_counter()
+        # Keep the report readable by dropping the service's progress logging
+        with contextlib.redirect_stderr(io.StringIO()):
+            resume_service.analyze_resume(file_bytes, filename, mode=mode, use_cache=False)
+        timings.append(time.perf_counter() - start)
+    return {
+        "mode": mode,
+        "calls": sum(counter.calls for counter in counters) / runs,
+        "prompt_tokens": sum(counter.prompt_tokens for counter in counters) / runs,
+        "response_tokens": sum(counter.response_tokens for counter in counters) / runs,
+        "wall_median_s": statistics.median(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", type=Path)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", default=",".join(resume_service.ANALYSIS_MODES))
+    args = parser.parse_args()
+
+    # Every run must reach the model: results are neither cached per document nor memoized per section
+    resume_service.section_memo = None
+    # One counter per model tier; escalated calls count towards the totals too
+    resume_service.models = {name: CountingModel(model) for name, model in resume_service.models.items()}
+    counters = list(resume_service.models.values())
+    file_bytes = args.pdf.read_bytes()
+
+    print(f"{'mode':<12}{'calls':>8}{'prompt tok':>12}{'resp tok':>10}{'wall (s)':>10}")
+    for mode in args.modes.split(","):
+        row = run_mode(mode, file_bytes, args.pdf.name, args.runs, counters)
+        print(f"{row['mode']:<12}{row['calls']:>8.1f}{row['prompt_tokens']:>12.0f}"
+              f"{row['response_tokens']:>10.0f}{row['wall_median_s']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
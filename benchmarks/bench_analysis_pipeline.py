@@ -0,0 +1,162 @@
+"""Offline harness for the backend analysis pipeline with a deterministic fake LLM.
+
+Usage:
+    python benchmarks/bench_analysis_pipeline.py [--latency 0.2] [--workers 8] [--local-confidence 0.8]
+
+Runs backend/services/analysis_pipeline.py through `invoke_llm` against
+FakeChatModel with `template_responder`, which answers each prompt template
+with a fixed, well-formed response for RESUME_TEXT, and reports per-stage
+timings and the wall time with `--workers` stages in parallel vs. one at a
+time, plus the number of LLM calls with and without local extraction.
+
+tests/test_analysis_pipeline.py checks the same runs: every field filled,
+dependency order, determinism and local vs. LLM extraction.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import config  # noqa: E402
+
+config.OPENAI_API_KEY = config.OPENAI_API_KEY or "sk-benchmark"
+
+from services import llm_service  # noqa: E402
+from services.analysis_pipeline import iter_pipeline_events, resume_stages  # noqa: E402
+from shared.call_scheduler import CallScheduler  # noqa: E402
+from shared.section_segmenter import segment_document  # noqa: E402
+from fake_chat_model import FakeChatModel  # noqa: E402
+
+RESUME_TEXT = """Jane Smith
+Senior Data Engineer
+Berlin, Germany | jane.smith@example.com | +49 30 1234567 | github.com/janesmith
+
+Summary
+Data engineer with 8 years of experience building batch and streaming pipelines.
+
+Work Experience
+Senior Data Engineer, Acme Analytics (2020 - Present)
+- Led migration of nightly ETL to Spark, cutting runtime by 60%
+- Built a streaming ingestion service handling 50k events per second
+Data Engineer, Globex (2016 - 2020)
+- Designed the warehouse schema used by 40 analysts
+
+Projects
+Open Route Planner (2021)
+- Route optimisation library in Python with 2k GitHub stars
+
+Education
+MSc Computer Science, TU Berlin (2014 - 2016)
+
+Skills
+Python, SQL, Spark, Kafka, Airflow, Terraform
+
+Languages
+English (fluent), German (native)
+
+Certifications
+AWS Certified Data Analytics, Amazon Web Services (2022)
+"""
+
+RESPONSES = {
+    "Contact__information": {
+        "candidate__name": "Jane Smith", "candidate__title": "Senior Data Engineer",
+        "candidate__location": "Berlin, Germany", "candidate__email": "jane.smith@example.com",
+        "candidate__phone": "+49 30 1234567", "candidate__social_media": ["https://github.com/janesmith"],
+        "evaluation__ContactInfo": "Complete and easy to find.", "score__ContactInfo": 90,
+    },
+    "CV__summary": "Data engineer with 8 years of experience building batch and streaming pipelines.",
+    "PROMPT_IMPROVE_SUMMARY": {
+        "evaluation__summary": "Concise but lacks a clear objective.", "score__summary": 70,
+        "CV__summary_enhanced": "Data engineer with 8 years of experience scaling pipelines to 50k events/s.",
+    },
+    "Work__experience": [
+        {"job__title": "Senior Data Engineer", "job__company": "Acme Analytics", "job__start_date": "2020", "job__end_date": "Present"},
+        {"job__title": "Data Engineer", "job__company": "Globex", "job__start_date": "2016", "job__end_date": "2020"},
+    ],
+    "PROMPT_IMPROVE_WORK_EXPERIENCE": {
+        "Score__WorkExperience": 80, "Comments__WorkExperience": "Impact is clearly quantified.",
+        "Improvement__WorkExperience": "Add team size and scope.",
+    },
+    "CV__Projects": [{"project__title": "Open Route Planner", "project__start_date": "2021", "project__end_date": "2021"}],
+    "PROMPT_IMPROVE_PROJECT": {"Score__project": 75, "Comments__project": "Good traction for a side project.", "Improvement__project": "Describe the algorithm."},
+    "CV__Education": [{"edu__college": "TU Berlin", "edu__degree": "MSc Computer Science", "edu__start_date": "2014", "edu__end_date": "2016"}],
+    "Education__evaluation": {"score__edu": 85, "evaluation__edu": "Relevant degree from a strong university."},
+    "candidate__skills": ["Python", "SQL", "Spark", "Kafka", "Airflow", "Terraform"],
+    "Skills__evaluation": {"score__skills": 88, "evaluation__skills": "Strong, modern data stack."},
+    "CV__Languages": [{"spoken__language": "English", "language__fluency": "fluent"}, {"spoken__language": "German", "language__fluency": "native"}],
+    "Languages__evaluation": {"score__language": 80, "evaluation__language": "Bilingual with a fluent second language."},
+    "CV__Certifications": [{"certif__title": "AWS Certified Data Analytics", "certif__organization": "Amazon Web Services", "certif__date": "2022", "certif__expiry_date": "2025", "certif__details": "Specialty"}],
+    "Certif__evaluation": {"score__certif": 70, "evaluation__certif": "Relevant and recent cloud certification."},
+    "PROMPT_EVALUATE_RESUME": {
+        "resume_cv_overview": "Experienced data engineer with streaming expertise.", "top_3_strengths": "- Impact\n- Stack\n- Scale",
+        "top_3_weaknesses": "- Objective\n- Team size\n- Formatting",
+    },
+}
+
+# Stage -> stages whose results it reads
+DEPENDENCIES = {stage.name: stage.after for stage in resume_stages(lambda key, **variables: "", RESUME_TEXT)}
+
+
+def template_responder(prompt):
+    """The RESPONSES entry of the template the prompt was rendered from"""
+    instructions = prompt[prompt.rfind("</resume>"):]
+    for key, template in llm_service.prompt_templates.items():
+        marker = template.instructions(**{name: "\0" for name in template.variables}).split("\0")[0][:120]
+        if marker in instructions:
+            response = RESPONSES[key]
+            return response if isinstance(response, str) else "```json\n" + json.dumps(response) + "\n```"
+    raise KeyError(f"No fake response for prompt: {instructions[:200]!r}")
+
+
+def run(llm, workers, min_local_confidence=None):
+    segments = segment_document(RESUME_TEXT)
+
+    def invoke(template_key, **variables):
+        return llm_service.invoke_llm(llm, RESUME_TEXT, template_key, segments=segments, **variables)
+
+    start = time.perf_counter()
+    events = list(iter_pipeline_events(
+        invoke, RESUME_TEXT, segments, max_workers=workers, min_local_confidence=min_local_confidence,
+    ))
+    return events, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per fake LLM call")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument(
+        "--local-confidence", type=float, default=config.LOCAL_EXTRACTION_MIN_CONFIDENCE,
+        help="Minimum confidence for local extraction; above 1 always asks the LLM",
+    )
+    args = parser.parse_args()
+
+    llm_service.llm_memo = None
+    llm_service.call_scheduler = CallScheduler(rate_per_minute=1e9, burst=1e9)
+    llm = FakeChatModel(response=template_responder, latency=args.latency, connect_latency=0)
+
+    min_local_confidence = args.local_confidence if args.local_confidence <= 1 else None
+    events, parallel_seconds = run(llm, args.workers, min_local_confidence)
+    calls = llm.calls
+    result = events[-1][1]
+
+    llm_calls = llm.calls
+    run(llm, args.workers)
+    llm_calls = llm.calls - llm_calls
+
+    print(f"{'stage':<24} {'after':<22} {'start s':>8} {'seconds':>8}")
+    for timing in sorted(result["stages"], key=lambda timing: timing["started"]):
+        after = ",".join(DEPENDENCIES[timing["stage"]]) or "-"
+        print(f"{timing['stage']:<24} {after:<22} {timing['started']:>8.3f} {timing['seconds']:>8.3f}")
+
+    _, sequential_seconds = run(llm, 1, min_local_confidence)
+    print(f"\n{calls} LLM calls ({llm_calls} without local extraction), overallScore {result['overallScore']}")
+    print(f"wall time: {parallel_seconds:.2f}s with {args.workers} workers, {sequential_seconds:.2f}s one stage at a time")
+
+
+if __name__ == "__main__":
+    main()
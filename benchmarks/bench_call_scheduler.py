@@ -0,0 +1,102 @@
+"""Section success rate and latency with and without the LLM call scheduler.
+
+Usage:
+    python benchmarks/bench_call_scheduler.py [--resumes 10] [--error-rate 0.2] [--tail-rate 0.1] [--hedge-after 0.3]
+
+Runs `analyze_resume` from server/resume_service.py in concurrent mode
+against FakeChatModel, which fails `error-rate` of calls with a 429 and
+makes `tail-rate` of calls slow. Three configurations are compared:
+
+- no retries: the scheduler's retries disabled, as before it existed;
+- retries: exponential backoff with jitter on 429/5xx;
+- retries + hedging: slow section calls are raced against a second request.
+
+For each, reports the fraction of sections that failed, the mean
+overallScore (failed sections are excluded from it) and wall time per resume.
+"""
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import resume_service  # noqa: E402
+from shared.call_scheduler import CallScheduler  # noqa: E402
+from fake_chat_model import FakeChatModel  # noqa: E402
+from synthetic_pdf import make_resume  # noqa: E402
+
+# Valid for both the overview and the section prompts
+RESPONSE = json.dumps({
+    "overview": "Experienced engineer with a steady record of shipping backend services.",
+    "strengths": ["a", "b", "c"], "weaknesses": ["d", "e", "f"],
+    "score": 80, "content": "Solid section with clear structure and quantified results throughout.",
+    "suggestions": ["Quantify results"],
+})
+
+
+def run(config: str, pdfs, args) -> dict:
+    model = FakeChatModel(
+        response=RESPONSE, latency=args.latency, connect_latency=0, error_rate=args.error_rate,
+        tail_rate=args.tail_rate, tail_latency=args.tail_latency, seed=1
+    )
+    resume_service.models = dict.fromkeys(resume_service.models, model)
+    resume_service.call_scheduler = CallScheduler(
+        rate_per_minute=60000, burst=100, max_retries=0 if config == "no retries" else 4,
+        base_delay=args.backoff, max_delay=2.0
+    )
+    resume_service.HEDGE_AFTER = args.hedge_after if config == "retries + hedging" else None
+
+    failed, total, scores, timings = 0, 0, [], []
+    for pdf in pdfs:
+        start = time.perf_counter()
+        with contextlib.redirect_stderr(io.StringIO()):
+            try:
+                results = resume_service.analyze_resume(pdf, "bench.pdf", mode="concurrent", use_cache=False)
+            except Exception:
+                # The overview call failed outright
+                failed, total = failed + len(resume_service.SECTIONS), total + len(resume_service.SECTIONS)
+                timings.append(time.perf_counter() - start)
+                continue
+        timings.append(time.perf_counter() - start)
+        failed += sum(resume_service.section_failed(section) for section in results["sections"])
+        total += len(results["sections"])
+        scores.append(results["overallScore"])
+    return {
+        "failed": failed / total,
+        "score": statistics.mean(scores) if scores else 0,
+        "wall_median_s": statistics.median(timings),
+        "wall_max_s": max(timings),
+        **resume_service.call_scheduler.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--tail-rate", type=float, default=0.1)
+    parser.add_argument("--tail-latency", type=float, default=1.5)
+    parser.add_argument("--hedge-after", type=float, default=0.3)
+    parser.add_argument("--backoff", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # Every call must reach the fake model
+    resume_service.section_memo = None
+    pdfs = [make_resume(pages=1, seed=seed) for seed in range(args.resumes)]
+
+    print(f"{'config':<18} {'failed':>7} {'score':>6} {'median s':>9} {'max s':>7} {'retries':>8} {'hedges':>7} {'wins':>5}")
+    for config in ("no retries", "retries", "retries + hedging"):
+        r = run(config, pdfs, args)
+        print(f"{config:<18} {r['failed']:7.1%} {r['score']:6.1f} {r['wall_median_s']:9.2f} {r['wall_max_s']:7.2f} "
+              f"{r['retries']:8d} {r['hedges']:7d} {r['hedge_wins']:5d}")
+
+
+if __name__ == "__main__":
+    main()
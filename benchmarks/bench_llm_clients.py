@@ -0,0 +1,88 @@
+"""Per-request latency of fresh LLM clients vs. the shared client registry.
+
+Usage:
+    python benchmarks/bench_llm_clients.py [--requests 50] [--concurrency 4] [--latency 0.05] [--connect-latency 0.15]
+
+Two measurements:
+
+1. Construction: time to build a ChatOpenAI client with `instantiate_llm`
+   (no network) vs. fetching it from `LLMClientRegistry`.
+2. Requests: `invoke_llm` against FakeChatModel, which charges
+   `connect-latency` whenever a call has no kept-alive connection. "fresh"
+   builds a client per request as analyze_resume used to; "registry"
+   reuses one client from the registry.
+
+The LLM memo is disabled so every request reaches the model.
+"""
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import config  # noqa: E402
+
+config.OPENAI_API_KEY = config.OPENAI_API_KEY or "sk-benchmark"
+
+from services import llm_service  # noqa: E402
+from fake_chat_model import fake_factory  # noqa: E402
+
+RESUME_TEXT = "Jane Smith\nSoftware Engineer\n\nExperience\nBuilt data pipelines in Python.\n" * 20
+
+
+def time_construction(count: int) -> dict:
+    registry = llm_service.LLMClientRegistry()
+    results = {}
+    for name, build in (
+        ("instantiate_llm", lambda: llm_service.instantiate_llm("OpenAI", model_name="gpt-3.5-turbo")),
+        ("registry.get", lambda: registry.get("OpenAI", model_name="gpt-3.5-turbo")),
+    ):
+        start = time.perf_counter()
+        for _ in range(count):
+            build()
+        results[name] = (time.perf_counter() - start) / count
+    return results
+
+
+def time_requests(requests: int, concurrency: int, reuse: bool, **model_kwargs) -> list:
+    factory = fake_factory(**model_kwargs)
+    registry = llm_service.LLMClientRegistry(factory=factory)
+
+    def request(index):
+        llm = registry.get("Fake", model_name="fake-chat") if reuse else factory("Fake", model_name="fake-chat")
+        start = time.perf_counter()
+        llm_service.invoke_llm(llm, f"{RESUME_TEXT}\nRequest {index}", "CV__summary")
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(request, range(requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--connect-latency", type=float, default=0.15)
+    args = parser.parse_args()
+
+    llm_service.llm_memo = None
+
+    for name, seconds in time_construction(args.requests).items():
+        print(f"construct {name:<16} {seconds * 1000:8.3f} ms/client")
+
+    model_kwargs = dict(latency=args.latency, connect_latency=args.connect_latency)
+    baseline = None
+    for name, reuse in (("fresh", False), ("registry", True)):
+        latencies = time_requests(args.requests, args.concurrency, reuse, **model_kwargs)
+        median = statistics.median(latencies)
+        baseline = baseline or median
+        print(f"request   {name:<16} {median * 1000:8.1f} ms median, "
+              f"{max(latencies) * 1000:8.1f} ms max, saved {(baseline - median) * 1000:6.1f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Throughput of PDF text extraction from temp files vs. in memory.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py [--count 200] [--concurrency 8] [--pages 1]
+
+Extracts `count` synthetic PDFs on a thread pool two ways: the previous
+write-to-TMP_DIR-then-extract-by-path approach, and `extract_text_from_pdf`
+reading the bytes in place.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+
+import resume_service  # noqa: E402
+from synthetic_pdf import make_resume  # noqa: E402
+
+
+def extract_via_temp_file(file_bytes: bytes) -> str:
+    # Unique name so the baseline is not penalised by collisions
+    path = resume_service.TMP_DIR / f"bench-{uuid.uuid4().hex}.pdf"
+    with open(path, "wb") as f:
+        f.write(file_bytes)
+    try:
+        return resume_service.extract_text_from_pdf(str(path))
+    finally:
+        os.remove(path)
+
+
+def extract_in_memory(file_bytes: bytes) -> str:
+    return resume_service.extract_text_from_pdf(file_bytes)
+
+
+def measure(extract, pdfs, concurrency: int) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stderr(io.StringIO()), ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(extract, pdfs))
+    return len(pdfs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=1)
+    args = parser.parse_args()
+
+    pdfs = [make_resume(pages=args.pages, seed=seed) for seed in range(args.count)]
+    for name, extract in (("temp file", extract_via_temp_file), ("in memory", extract_in_memory)):
+        print(f"{name:<10} {measure(extract, pdfs, args.concurrency):8.1f} PDFs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Cost and recovery rate of LLM response parsing and validation.
+
+Usage:
+    python benchmarks/bench_response_parsing.py [--cases 2000] [--repeat 5]
+
+Over the response_corpus.py corpus, reports:
+
+1. Extraction: the previous `extract_json_response` (json.loads, else the
+   text between the first "{" and last "}") vs. `response_parsing.extract_json`,
+   as microseconds per response and the fraction recovered correctly.
+2. Validation of the backend ResumeAnalysisResponse cases: the cached
+   `validator_for` TypeAdapter vs. building a TypeAdapter per call.
+3. Streaming: microseconds per chunk to `feed` a response and take
+   `partial()` after every 16-character chunk, as resume_service does
+   while an overview streams.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "backend"))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from models.resume_analysis import ResumeAnalysisResponse  # noqa: E402
+from response_corpus import iter_cases  # noqa: E402
+from shared.response_parsing import JSONStreamParser, extract_json, validate  # noqa: E402
+
+
+def legacy_extract_json(text):
+    """extract_json_response from server/resume_service.py before response_parsing"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        start = text.find("{")
+        end = text.rfind("}") + 1
+        if start >= 0 and end > start:
+            return json.loads(text[start:end])
+        raise ValueError("No valid JSON found in response")
+
+
+def best_of(repeat, fn, items):
+    """Best mean microseconds per item over `repeat` passes"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            fn(item)
+        timings.append((time.perf_counter() - started) / len(items) * 1e6)
+    return min(timings)
+
+
+def recovered(extract, case):
+    try:
+        return extract(case["text"]) == case["expected"]
+    except ValueError:
+        return case["expected"] is None
+
+
+def quietly(extract):
+    def run(case):
+        try:
+            extract(case["text"])
+        except ValueError:
+            pass
+    return run
+
+
+def stream(text):
+    parser = JSONStreamParser()
+    for pos in range(0, len(text), 16):
+        parser.feed(text[pos:pos + 16])
+        parser.partial()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = list(iter_cases(args.cases))
+    clean = [case for case in cases if not case["mutations"]]
+    print(f"{len(cases)} responses ({len(clean)} clean), mean {statistics.mean(len(c['text']) for c in cases):.0f} chars")
+
+    print("\nextraction         us/response (all)   us/response (clean)   recovered (all)   recovered (clean)")
+    for name, extract in (("legacy", legacy_extract_json), ("response_parsing", extract_json)):
+        per_call = best_of(args.repeat, quietly(extract), cases)
+        clean_per_call = best_of(args.repeat, quietly(extract), clean)
+        rate = sum(recovered(extract, case) for case in cases) / len(cases)
+        clean_rate = sum(recovered(extract, case) for case in clean) / max(1, len(clean))
+        print(f"{name:<18} {per_call:>17.1f}   {clean_per_call:>19.1f}   {rate:>15.1%}   {clean_rate:>17.1%}")
+
+    documents = [case["expected"] for case in cases if case["shape"] == "backend" and case["expected"] is not None]
+    print(f"\nvalidation ({len(documents)} ResumeAnalysisResponse documents)   us/document")
+    for name, check in (
+        ("validator_for (cached)", lambda data: validate(data, ResumeAnalysisResponse)),
+        ("TypeAdapter per call", lambda data: TypeAdapter(ResumeAnalysisResponse).validate_python(data)),
+    ):
+        print(f"{name:<48} {best_of(args.repeat, check, documents):>9.1f}")
+
+    texts = [case["text"] for case in cases]
+    chunk_count = sum(-(-len(text) // 16) for text in texts)
+    per_response = best_of(args.repeat, stream, texts)
+    print(f"\nstreaming: {per_response:.1f} us/response, {per_response * len(texts) / chunk_count:.1f} us/chunk (feed + partial)")
+
+
+if __name__ == "__main__":
+    main()
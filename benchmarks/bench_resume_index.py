@@ -0,0 +1,104 @@
+"""Query latency of the FAISS resume index at 100k+ vectors.
+
+Usage:
+    python benchmarks/bench_resume_index.py [--vectors 100000] [--dim 384] [--queries 200] [--k 10]
+
+Fills a ResumeIndex in a temporary directory with random unit vectors
+(documents grouped 4 per resume, as a resume plus three sections), then
+reports, for the in-memory delta and for the compacted memory-mapped base:
+single-query latency percentiles of `search_vectors` (FAISS search plus the
+SQLite metadata lookup). Also reports batched HashingEmbedder throughput,
+the cost of embedding a query.
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+
+from resume_index import HashingEmbedder, ResumeIndex  # noqa: E402
+from synthetic_pdf import make_resume_text  # noqa: E402
+
+
+class RandomEmbedder:
+    """Random unit vectors; keeps the benchmark about search, not embedding"""
+
+    def __init__(self, dim: int, seed: int = 0):
+        self.dim = dim
+        self.name = f"random-{dim}"
+        self.rng = np.random.default_rng(seed)
+
+    def embed(self, texts, query=False):
+        vectors = self.rng.standard_normal((len(texts), self.dim)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def percentiles(samples) -> str:
+    samples = sorted(samples)
+    p = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return f"p50 {p(0.5):7.2f} ms  p95 {p(0.95):7.2f} ms  p99 {p(0.99):7.2f} ms"
+
+
+def time_queries(index: ResumeIndex, queries: np.ndarray, k: int) -> list:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search_vectors(query.reshape(1, -1), k)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=10_000, help="Documents per add_documents call")
+    args = parser.parse_args()
+
+    embedder = RandomEmbedder(args.dim)
+    queries = RandomEmbedder(args.dim, seed=1).embed([""] * args.queries)
+    with tempfile.TemporaryDirectory() as directory:
+        index = ResumeIndex(Path(directory), embedder=embedder)
+        start = time.perf_counter()
+        for offset in range(0, args.vectors, args.batch):
+            count = min(args.batch, args.vectors - offset)
+            index.add_documents([
+                {"analysis_id": f"resume-{(offset + i) // 4}", "kind": "resume" if (offset + i) % 4 == 0 else "section",
+                 "filename": f"resume-{(offset + i) // 4}.pdf", "text": ""}
+                for i in range(count)
+            ])
+        print(f"add       {args.vectors} vectors in {time.perf_counter() - start:6.2f} s (incremental, in-memory delta)")
+        print(f"delta     {percentiles(time_queries(index, queries, args.k))}")
+
+        start = time.perf_counter()
+        index.compact()
+        print(f"compact   {time.perf_counter() - start:6.2f} s")
+        start = time.perf_counter()
+        reopened = ResumeIndex(Path(directory), embedder=embedder)
+        print(f"mmap open {(time.perf_counter() - start) * 1000:6.1f} ms")
+        print(f"mmap base {percentiles(time_queries(reopened, queries, args.k))}")
+
+    texts = [make_resume_text(seed) for seed in range(200)]
+    hashing = HashingEmbedder(args.dim)
+    start = time.perf_counter()
+    hashing.embed(texts)
+    elapsed = time.perf_counter() - start
+    print(f"embed     {len(texts) / elapsed:8.1f} resumes/s (HashingEmbedder, one batch), "
+          f"query embed {statistics.mean(timeit(hashing, 'python developer') for _ in range(20)) * 1000:.2f} ms")
+
+
+def timeit(embedder, text: str) -> float:
+    start = time.perf_counter()
+    embedder.embed([text], query=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""Offline benchmark suite: PDF extraction, response parsing, resume analysis and the API, against a fake LLM.
+
+Usage:
+    python benchmarks/bench_suite.py [--resumes 20] [--max-pages 20] [--scenarios pdf_extraction,api]
+        [--latency 0.2] [--tokens-per-second 100] [--error-rate 0.02] [--concurrency 4]
+        [--output results.json] [--baseline previous.json] [--tolerance 0.15]
+
+Generates a synthetic corpus of resume PDFs (1 to --max-pages pages, cycling
+through the synthetic_pdf LAYOUTS) and runs each scenario in a fresh process
+with its own working directory, so caches start cold and peak RSS is per
+scenario:
+
+- pdf_extraction: server `extract_text_from_pdf` on each PDF.
+- response_parsing: `response_parsing.extract_json` (which replaced
+  `extract_json_response`) on the response_corpus.py responses.
+- analyze_resume: server `analyze_resume` on each PDF, with the Gemini model
+  replaced by FakeChatModel; results cache, memo and near-duplicate reuse off.
+- api: the backend FastAPI app through TestClient: upload, queue the
+  analysis job, poll it and fetch the results, with the LLM clients replaced
+  by FakeChatModel.
+
+The fake model takes --latency per call plus its response length at
+--tokens-per-second, and fails --error-rate of calls with a retryable 503,
+which the call scheduler retries as in production (with short backoff).
+
+Reports p50/p95/p99 latency, throughput, peak RSS and, for the LLM
+scenarios, tokens sent per resume, and writes them as JSON to --output
+(default benchmarks/results/suite-<timestamp>.json). With --baseline, each
+metric worse than the baseline run by more than --tolerance is flagged and
+the exit status is 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCHMARKS = ROOT / "benchmarks"
+SCENARIOS = ("pdf_extraction", "response_parsing", "analyze_resume", "api")
+
+# Compared metric -> whether higher is better
+METRICS = {
+    "p50_s": False,
+    "p95_s": False,
+    "p99_s": False,
+    "throughput_per_s": True,
+    "peak_rss_mb": False,
+    "tokens_per_resume": False,
+}
+
+
+def percentile(values, q):
+    """q-quantile with linear interpolation between the closest ranks"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low, high = math.floor(position), math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def summarize(latencies, wall_seconds, errors, **extra):
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "p50_s": percentile(latencies, 0.50),
+        "p95_s": percentile(latencies, 0.95),
+        "p99_s": percentile(latencies, 0.99),
+        "mean_s": sum(latencies) / len(latencies) if latencies else None,
+        "wall_s": wall_seconds,
+        "throughput_per_s": len(latencies) / wall_seconds if wall_seconds else None,
+        "peak_rss_mb": peak_rss_mb(),
+        **extra,
+    }
+
+
+def timed_map(fn, items, concurrency):
+    """Run fn over items on `concurrency` threads: (per-item seconds, error count, wall seconds)"""
+    def timed(item):
+        started = time.perf_counter()
+        try:
+            fn(item)
+            failed = False
+        except Exception as e:
+            print(f"  error: {type(e).__name__}: {e}", file=sys.stderr)
+            failed = True
+        return time.perf_counter() - started, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        outcomes = list(executor.map(timed, items))
+    wall = time.perf_counter() - started
+    return [seconds for seconds, _ in outcomes], sum(failed for _, failed in outcomes), wall
+
+
+def corpus(config):
+    """(name, pages, PDF bytes) of each synthetic resume, pages spread evenly over 1..max_pages"""
+    from synthetic_pdf import LAYOUTS, make_layout_resume
+
+    layouts = list(LAYOUTS)
+    count, max_pages = config["resumes"], config["max_pages"]
+    documents = []
+    for index in range(count):
+        pages = 1 + round(index * (max_pages - 1) / max(1, count - 1))
+        layout = layouts[index % len(layouts)]
+        seed = config["seed"] + index
+        documents.append((f"resume-{index}-{layout}-{pages}p.pdf", pages, make_layout_resume(pages, seed, layout)))
+    return documents
+
+
+def fake_model_kwargs(config):
+    return {
+        "latency": config["latency"],
+        "connect_latency": 0,
+        "tokens_per_second": config["tokens_per_second"],
+        "error_rate": config["error_rate"],
+        "error_status": 503,
+        "seed": config["seed"],
+    }
+
+
+def prepare(config, package):
+    """Point the scenario process at server/ or backend/ with production-like, cold settings"""
+    os.environ.update({
+        "ANALYSIS_CACHE": "0",
+        "LLM_MEMO_BACKEND": "off",
+        "NEAR_DUPLICATE_THRESHOLD": "0",
+        "LLM_RATE_LIMIT_RPM": "1000000",
+        "LLM_RATE_LIMIT_BURST": "1000000",
+        "LLM_BACKOFF_BASE": "0.05",
+        "LLM_BACKOFF_MAX": "0.5",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "sk-benchmark",
+        "ANALYSIS_JOBS_DB": str(Path(config["workdir"]) / "analysis_jobs.sqlite"),
+        "ANALYSIS_JOB_WORKERS": str(config["concurrency"]),
+        "ANALYSIS_MODE": config["mode"],
+    })
+    sys.path.insert(0, str(BENCHMARKS))
+    sys.path.insert(0, str(ROOT))
+    sys.path.insert(0, str(ROOT / package))
+    os.chdir(config["workdir"])
+
+
+def scenario_pdf_extraction(config):
+    prepare(config, "server")
+    import resume_service
+
+    documents = corpus(config)
+    with contextlib.redirect_stderr(io.StringIO()):
+        latencies, errors, wall = timed_map(
+            lambda document: resume_service.extract_text_from_pdf(document[2]), documents, 1
+        )
+    pages = sum(document[1] for document in documents)
+    return summarize(latencies, wall, errors, pages_per_s=pages / wall)
+
+
+def scenario_response_parsing(config):
+    prepare(config, "server")
+    from response_corpus import iter_cases
+    from shared.response_parsing import extract_json
+
+    cases = list(iter_cases(config["responses"], config["seed"]))
+    latencies = []
+    unrecovered = 0
+    started = time.perf_counter()
+    for case in cases:
+        begin = time.perf_counter()
+        try:
+            recovered = extract_json(case["text"]) == case["expected"]
+        except ValueError:
+            recovered = case["expected"] is None
+        latencies.append(time.perf_counter() - begin)
+        unrecovered += not recovered
+    return summarize(latencies, time.perf_counter() - started, unrecovered)
+
+
+def gemini_responder(sections):
+    """Well-formed answers to the server's section, overview and batched prompts"""
+    section = {
+        "score": 78,
+        "content": "Clear structure with quantified achievements; some bullets lack context on scope and impact.",
+        "suggestions": ["Quantify the impact of each role", "Lead with the most relevant experience"],
+    }
+    overview = {
+        "overview": "Experienced engineer with a consistent record of delivery across backend and data platforms.",
+        "strengths": ["Quantified impact", "Modern stack", "Steady progression"],
+        "weaknesses": ["Generic summary", "Dense formatting", "Few leadership examples"],
+    }
+
+    def respond(prompt):
+        if "each of these sections" in prompt:
+            return json.dumps({**overview, "sections": {name: section for name in sections}})
+        if prompt.startswith("Analyze this resume"):
+            return json.dumps(overview)
+        return "```json\n" + json.dumps(section) + "\n```"
+    return respond
+
+
+def scenario_analyze_resume(config):
+    prepare(config, "server")
+    import resume_service
+    from fake_chat_model import FakeChatModel
+
+    model = FakeChatModel(response=gemini_responder(resume_service.SECTIONS), **fake_model_kwargs(config))
+    resume_service.models = dict.fromkeys(resume_service.models, model)
+    documents = corpus(config)
+    failed_sections = 0
+
+    def analyze(document):
+        nonlocal failed_sections
+        results = resume_service.analyze_resume(document[2], document[0], mode=config["mode"])
+        failed_sections += sum(resume_service.section_failed(section) for section in results["sections"])
+
+    with contextlib.redirect_stderr(io.StringIO()):
+        latencies, errors, wall = timed_map(analyze, documents, config["concurrency"])
+    return summarize(
+        latencies, wall, errors,
+        tokens_per_resume=model.prompt_tokens / len(documents),
+        response_tokens_per_resume=model.response_tokens / len(documents),
+        llm_calls_per_resume=model.calls / len(documents),
+        llm_errors=model.errors,
+        failed_sections=failed_sections,
+        escalations=sum(tier["escalated"] for tier in resume_service.model_cascade.stats()["tiers"].values()),
+    )
+
+
+def scenario_api(config):
+    prepare(config, "backend")
+    from fastapi.testclient import TestClient
+    from bench_analysis_pipeline import template_responder
+    from fake_chat_model import fake_factory
+    from services import llm_service
+
+    models = []
+    factory = fake_factory(response=template_responder, **fake_model_kwargs(config))
+
+    def tracking_factory(*args, **kwargs):
+        models.append(factory(*args, **kwargs))
+        return models[-1]
+
+    llm_service.llm_clients = llm_service.LLMClientRegistry(factory=tracking_factory)
+    import app as backend_app
+
+    documents = corpus(config)
+    with TestClient(backend_app.app) as client:
+        def analyze(document):
+            name, _, data = document
+            response = client.post("/upload_resume", files={"file": (name, data, "application/pdf")})
+            response.raise_for_status()
+            document_id = response.json()["document_id"]
+            response = client.post("/analyze_resume", params={"document_id": document_id})
+            response.raise_for_status()
+            job_id = response.json()["job_id"]
+            while True:
+                job = client.get(f"/analysis_jobs/{job_id}").json()
+                if job["status"] == "failed":
+                    raise RuntimeError(f"Analysis job failed: {job.get('error')}")
+                if job["status"] == "done":
+                    break
+                time.sleep(0.01)
+            client.get("/get_analysis_results", params={"document_id": document_id}).raise_for_status()
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            latencies, errors, wall = timed_map(analyze, documents, config["concurrency"])
+    return summarize(
+        latencies, wall, errors,
+        tokens_per_resume=sum(model.prompt_tokens for model in models) / len(documents),
+        response_tokens_per_resume=sum(model.response_tokens for model in models) / len(documents),
+        llm_calls_per_resume=sum(model.calls for model in models) / len(documents),
+        llm_errors=sum(model.errors for model in models),
+    )
+
+
+def run_scenario(name, config):
+    """Entry point of the scenario process"""
+    return globals()[f"scenario_{name}"](config)
+
+
+def compare(current, baseline, tolerance):
+    """Lines describing every metric that got worse than `baseline` by more than `tolerance`"""
+    regressions = []
+    for scenario, metrics in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if previous is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            new, old = metrics.get(metric), previous.get(metric)
+            if new is None or not old:
+                continue
+            change = (new - old) / old
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f"{scenario}.{metric}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(scenarios):
+    print(f"\n{'scenario':<18}{'n':>5}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'per s':>9}{'RSS MB':>9}{'tok/resume':>12}")
+    for name, row in scenarios.items():
+        tokens = row.get("tokens_per_resume")
+        print(f"{name:<18}{row['count']:>5}{row['errors']:>5}{row['p50_s'] * 1e3:>10.2f}{row['p95_s'] * 1e3:>10.2f}"
+              f"{row['p99_s'] * 1e3:>10.2f}{row['throughput_per_s']:>9.2f}{row['peak_rss_mb']:>9.1f}"
+              f"{f'{tokens:.0f}' if tokens is not None else '-':>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--max-pages", type=int, default=20)
+    parser.add_argument("--responses", type=int, default=2000, help="Responses for response_parsing")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per fake LLM call")
+    parser.add_argument("--tokens-per-second", type=float, default=100, help="Fake LLM output rate; 0 for instant")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of fake LLM calls failing with 503")
+    parser.add_argument("--concurrency", type=int, default=4, help="Resumes analyzed at once")
+    parser.add_argument("--mode", default="concurrent", help="Server analysis mode for analyze_resume")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression per metric")
+    args = parser.parse_args()
+
+    names = args.scenarios.split(",")
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    config = {
+        "resumes": args.resumes,
+        "max_pages": args.max_pages,
+        "responses": args.responses,
+        "latency": args.latency,
+        "tokens_per_second": args.tokens_per_second or None,
+        "error_rate": args.error_rate,
+        "concurrency": args.concurrency,
+        "mode": args.mode,
+        "seed": args.seed,
+    }
+
+    scenarios = {}
+    for name in names:
+        print(f"running {name}...", file=sys.stderr)
+        workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+        try:
+            # A fresh interpreter per scenario: cold caches and a per-scenario peak RSS
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                scenarios[name] = pool.submit(run_scenario, name, {**config, "workdir": workdir}).result()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": config,
+        "scenarios": scenarios,
+    }
+    print_table(scenarios)
+
+    output = args.output or BENCHMARKS / "results" / f"suite-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nresults written to {output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("config") != config:
+            print("note: baseline was run with a different configuration")
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Local stand-in for the LLM clients used by backend/services/llm_service and server/resume_service.
+
+FakeChatModel answers `invoke`/`ainvoke` (langchain chat models) and
+`generate_content` (Gemini, including `stream=True`, which yields the
+response in `stream_chunk`-character chunks) after a simulated network delay.
+Each instance models one client with its own connection pool: its first
+`pool_size` concurrent calls also pay `connect_latency` (TCP + TLS setup),
+later calls reuse a kept-alive connection.
+
+`response` is a string or a function of the prompt returning one.
+Faults are injected at random (seeded): `error_rate` of calls raise
+FakeAPIError with `error_status` (429 by default), and `tail_rate` of calls
+take `tail_latency` instead of `latency`. With `tokens_per_second`, each call
+also takes as long as generating its response at that rate. `prompt_tokens`
+and `response_tokens` total the (estimated, 4 characters per token) tokens
+sent and received.
+"""
+import asyncio
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+
+class FakeAPIError(Exception):
+    """SDK-style error carrying an HTTP status"""
+
+    def __init__(self, status_code):
+        super().__init__(f"Fake provider error {status_code}")
+        self.status_code = status_code
+
+
+class FakeChatModel:
+    def __init__(
+        self,
+        model_name="fake-chat",
+        temperature=0.5,
+        top_p=0.95,
+        latency=0.05,
+        connect_latency=0.15,
+        pool_size=8,
+        response="Fake analysis.",
+        error_rate=0.0,
+        error_status=429,
+        tail_rate=0.0,
+        tail_latency=1.0,
+        seed=0,
+        stream_chunk=16,
+        tokens_per_second=None
+    ):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.top_p = top_p
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.response = response
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.stream_chunk = stream_chunk
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.connects = 0
+        self.errors = 0
+        self._idle_connections = 0
+        self._pool_size = pool_size
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_tokens(text):
+        return max(1, len(text) // 4)
+
+    def _checkout(self, prompt, content):
+        """Delay for this call (opening a connection unless one is idle) and whether it fails"""
+        response_tokens = self.estimate_tokens(content)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += self.estimate_tokens(prompt)
+            self.response_tokens += response_tokens
+            delay = self.tail_latency if self._random.random() < self.tail_rate else self.latency
+            if self.tokens_per_second:
+                delay += response_tokens / self.tokens_per_second
+            failed = self._random.random() < self.error_rate
+            self.errors += failed
+            if self._idle_connections:
+                self._idle_connections -= 1
+            else:
+                self.connects += 1
+                delay += self.connect_latency
+            return delay, failed
+
+    def _checkin(self, failed):
+        with self._lock:
+            self._idle_connections = min(self._pool_size, self._idle_connections + 1)
+        if failed:
+            raise FakeAPIError(self.error_status)
+
+    def _content(self, prompt):
+        return self.response(prompt) if callable(self.response) else self.response
+
+    def invoke(self, prompt):
+        content = self._content(prompt)
+        delay, failed = self._checkout(prompt, content)
+        time.sleep(delay)
+        self._checkin(failed)
+        return SimpleNamespace(content=content)
+
+    async def ainvoke(self, prompt):
+        content = self._content(prompt)
+        delay, failed = self._checkout(prompt, content)
+        await asyncio.sleep(delay)
+        self._checkin(failed)
+        return SimpleNamespace(content=content)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        text = self.invoke(prompt).content
+        if stream:
+            return FakeStream(text, self.stream_chunk)
+        return SimpleNamespace(text=text, usage_metadata=None)
+
+
+class FakeStream:
+    """Streamed Gemini response: iterate for chunks, then read `text`"""
+
+    def __init__(self, text, chunk_size):
+        self.text = text
+        self.usage_metadata = None
+        self._chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield SimpleNamespace(text=chunk)
+
+
+def fake_factory(**model_kwargs):
+    """instantiate_llm-compatible factory building FakeChatModel clients"""
+    def factory(provider, temperature=0.5, top_p=0.95, model_name=None):
+        return FakeChatModel(model_name=model_name or "fake-chat", temperature=temperature, top_p=top_p, **model_kwargs)
+    return factory
@@ -0,0 +1,206 @@
+"""Fuzz-style corpus of malformed LLM responses for response_parsing.
+
+Usage:
+    python benchmarks/response_corpus.py [--cases 2000] [--seed 0]
+
+Each case is a well-formed answer (a section analysis, an overview, a
+batched analysis or a backend ResumeAnalysisResponse) serialized the way
+models actually return it: wrapped in prose or ```json fences, with trailing
+commas, Python literals, raw newlines inside strings, braces inside strings,
+or followed by a second object. Running this module checks every case
+against shared/response_parsing.py:
+
+- `extract_json` recovers exactly the original object;
+- `JSONStreamParser` fed the same text in random-sized chunks completes the
+  same object, and `partial()` never raises and only returns objects;
+- truncated responses are rejected by `extract_json` but still give a
+  partial object while streaming.
+
+Exits non-zero if any case fails. bench_response_parsing.py times the same corpus.
+"""
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.response_parsing import JSONStreamParser, extract_json  # noqa: E402
+
+WORDS = (
+    "led migration of billing service to Kubernetes, cutting deploy time by 40% "
+    "add metrics to achievements quantify impact use action verbs mention Python Go SQL "
+    "strong leadership clear summary missing dates inconsistent formatting"
+).split()
+SECTIONS = ["Contact Information", "Professional Summary", "Work Experience", "Education", "Skills"]
+PREFIXES = ["", "Here is the analysis:\n", "Sure! Below is the JSON you asked for.\n\n", "Analysis {draft}:\n"]
+SUFFIXES = ["", "\n", "\nLet me know if you need anything else.", "\n\nNote: scores are out of 100."]
+
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, words))).capitalize() + "."
+
+
+def section_result(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "score": rng.randint(0, 100),
+        "content": sentence(rng, 30) + "\n" + sentence(rng),
+        "suggestions": [sentence(rng) for _ in range(rng.randint(0, 4))],
+    }
+
+
+def overview_result(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "overview": sentence(rng, 40) + "\n\n" + sentence(rng),
+        "strengths": [sentence(rng) for _ in range(rng.randint(1, 4))],
+        "weaknesses": [sentence(rng) for _ in range(rng.randint(1, 4))],
+    }
+
+
+def batch_result(rng: random.Random) -> Dict[str, Any]:
+    return {**overview_result(rng), "sections": {name: section_result(rng) for name in SECTIONS}}
+
+
+def backend_result(rng: random.Random) -> Dict[str, Any]:
+    """Shaped like backend/models/resume_analysis.ResumeAnalysisResponse"""
+    return {
+        "contact_info": {
+            "candidate_name": "Jane Smith",
+            "candidate_email": "jane@example.com",
+            "candidate_social_media": ["https://github.com/jane"],
+            "evaluation_ContactInfo": sentence(rng),
+            "score_ContactInfo": rng.randint(0, 100),
+        },
+        "summary": {"CV_summary": sentence(rng, 30), "evaluation_summary": sentence(rng), "score_summary": rng.randint(0, 100)},
+        "work_experience": [
+            {"job_title": "Engineer", "company": "Acme", "responsibilities": [sentence(rng)], "score": rng.randint(0, 100)}
+            for _ in range(rng.randint(1, 3))
+        ],
+        "projects": [{"project_title": "Search", "project_description": sentence(rng), "score_project": rng.randint(0, 100)}],
+        "skills": {"candidate_skills": ["Python", "SQL", "Go"], "evaluation_skills": sentence(rng), "score_skills": rng.randint(0, 100)},
+    }
+
+
+SHAPES = {"section": section_result, "overview": overview_result, "batch": batch_result, "backend": backend_result}
+
+
+def dump(value: Any, rng: random.Random, mutations: List[str]) -> str:
+    """Serialize like an LLM: JSON, optionally with trailing commas, Python literals or raw newlines"""
+    if isinstance(value, dict):
+        items = [f"{json.dumps(key)}: {dump(item, rng, mutations)}" for key, item in value.items()]
+        trailing = "," if "trailing_commas" in mutations and items and rng.random() < 0.5 else ""
+        return "{" + ", ".join(items) + trailing + "}"
+    if isinstance(value, list):
+        items = [dump(item, rng, mutations) for item in value]
+        trailing = "," if "trailing_commas" in mutations and items and rng.random() < 0.5 else ""
+        return "[" + ", ".join(items) + trailing + "]"
+    if isinstance(value, str) and "raw_newlines" in mutations:
+        return json.dumps(value).replace("\\n", "\n")
+    return json.dumps(value)
+
+
+def mutate(value: Dict[str, Any], rng: random.Random) -> Tuple[str, Dict[str, Any], List[str]]:
+    """A response text for `value`, the object extract_json should return (None if truncated)
+    and the mutations applied"""
+    mutations = [name for name in ("trailing_commas", "raw_newlines", "fence", "prose", "braces_in_strings",
+                                   "second_object", "python_literals", "indent") if rng.random() < 0.3]
+    expected = value
+    if "braces_in_strings" in mutations:
+        expected = {**value, "note": 'Use {"metric": value} pairs, e.g. [1] {x}'}
+    if "python_literals" in mutations:
+        expected = {**expected, "verified": True, "reviewer": None}
+    if "indent" in mutations and not {"trailing_commas", "raw_newlines"} & set(mutations):
+        text = json.dumps(expected, indent=2)
+    else:
+        text = dump(expected, rng, mutations)
+    if "python_literals" in mutations:
+        text = text.replace('"verified": true', '"verified": True').replace('"reviewer": null', '"reviewer": None')
+    if rng.random() < 0.1:
+        # Response cut off mid-stream, e.g. by max_tokens
+        text = text[:rng.randint(1, len(text) - 1)]
+        expected = None
+        mutations = [name for name in mutations if name != "second_object"] + ["truncated"]
+    if "second_object" in mutations:
+        text += "\n" + json.dumps({"confidence": rng.random()})
+    if "fence" in mutations:
+        text = f"```json\n{text}\n```"
+    if "prose" in mutations:
+        text = rng.choice(PREFIXES) + text + rng.choice(SUFFIXES)
+    return text, expected, mutations
+
+
+def iter_cases(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """`count` cases: dicts with shape, text, expected (None if truncated) and mutations"""
+    rng = random.Random(seed)
+    shapes = list(SHAPES)
+    for _ in range(count):
+        shape = rng.choice(shapes)
+        text, expected, mutations = mutate(SHAPES[shape](rng), rng)
+        yield {"shape": shape, "text": text, "expected": expected, "mutations": mutations}
+
+
+def chunks(text: str, rng: random.Random) -> Iterator[str]:
+    pos = 0
+    while pos < len(text):
+        size = rng.randint(1, 24)
+        yield text[pos:pos + size]
+        pos += size
+
+
+def check_case(case: Dict[str, Any], rng: random.Random) -> List[str]:
+    """Problems found with one case (empty if it passes)"""
+    problems = []
+    try:
+        parsed = extract_json(case["text"])
+    except ValueError:
+        parsed = None
+    if parsed != case["expected"]:
+        problems.append("extract_json mismatch")
+
+    parser = JSONStreamParser()
+    partials = 0
+    for chunk in chunks(case["text"], rng):
+        parser.feed(chunk)
+        try:
+            partial = parser.partial()
+        except Exception as e:
+            problems.append(f"partial() raised {e!r}")
+            break
+        if partial is not None:
+            partials += 1
+            if not isinstance(partial, (dict, list)):
+                problems.append(f"partial() returned {type(partial).__name__}")
+                break
+    objects = [value for value in parser.values if isinstance(value, dict)]
+    if case["expected"] is not None and (not objects or objects[0] != case["expected"]):
+        problems.append("stream mismatch")
+    if case["expected"] is None and (objects or parser.partial() is None):
+        problems.append("truncated response not left partial")
+    if partials == 0 and len(case["text"]) > 40:
+        problems.append("no partial results while streaming")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    for number, case in enumerate(iter_cases(args.cases, args.seed)):
+        problems = check_case(case, rng)
+        if problems:
+            failures += 1
+            if failures <= 5:
+                print(f"case {number} ({case['shape']}, {', '.join(case['mutations']) or 'clean'}): {'; '.join(problems)}")
+                print(f"  {case['text'][:200]!r}")
+    print(f"{args.cases - failures}/{args.cases} cases passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Dependency-free generator for small text PDFs used by the benchmarks."""
+import random
+from typing import List
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def make_pdf(pages: List[List[str]], font_size: int = 11, columns: int = 1) -> bytes:
+    """Render each page as a list of text lines in Helvetica, flowing down `columns` columns"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        stream = []
+        per_column = -(-len(lines) // columns) if lines else 0
+        for column in range(columns):
+            x = 50 + column * 512 // columns
+            stream += ["BT", f"/F1 {font_size} Tf", f"{font_size + 3} TL", f"{x} 790 Td"]
+            for line in lines[column * per_column:(column + 1) * per_column]:
+                # Lines starting with "#" are rendered as bold, larger headings
+                if line.startswith("#"):
+                    stream += [f"/F2 {font_size + 3} Tf", f"({_escape(line.lstrip('# '))}) Tj T*", f"/F1 {font_size} Tf"]
+                else:
+                    stream.append(f"({_escape(line)}) Tj T*")
+            stream.append("ET")
+        content = "\n".join(stream).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(out)
+
+SECTION_HEADINGS = ["Summary", "Experience", "Skills", "Education", "Projects", "Languages", "Certifications"]
+_WORDS = (
+    "led designed built migrated scaled optimized delivered python react sql kubernetes team "
+    "platform latency revenue customers pipeline analytics cloud services reduced improved by"
+).split()
+
+def make_resume_lines(pages: int = 1, seed: int = 0, lines_per_page: int = 48, max_words: int = 14) -> List[str]:
+    """Lines of a synthetic resume: contact header, "#" section headings and filler bullet lines"""
+    rng = random.Random(seed)
+    lines = [f"# Candidate {seed}", f"candidate{seed}@example.com | +44 7700 900{seed % 1000:03d}", ""]
+    while len(lines) < pages * lines_per_page:
+        lines.append(f"# {rng.choice(SECTION_HEADINGS)}")
+        for _ in range(rng.randint(3, 8)):
+            lines.append("- " + " ".join(rng.choice(_WORDS) for _ in range(rng.randint(min(6, max_words), max_words))))
+        lines.append("")
+    return lines[:pages * lines_per_page]
+
+def make_resume_text(seed: int = 0, pages: int = 1) -> str:
+    """Plain text of make_resume(pages, seed), without the heading markers"""
+    return "\n".join(line.lstrip("# ") for line in make_resume_lines(pages, seed))
+
+def make_resume(pages: int = 1, seed: int = 0, lines_per_page: int = 48) -> bytes:
+    """A synthetic resume PDF: contact header, bold section headings and filler bullet lines"""
+    lines = make_resume_lines(pages, seed, lines_per_page)
+    return make_pdf([lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)])
+
+# layout -> (font size, lines per page per column, columns, words per bullet at most)
+LAYOUTS = {
+    "classic": (11, 48, 1, 14),
+    "compact": (9, 64, 1, 18),
+    "two_column": (9, 64, 2, 6),
+}
+
+def make_layout_resume(pages: int = 1, seed: int = 0, layout: str = "classic") -> bytes:
+    """A synthetic resume PDF in one of LAYOUTS: denser text, or two text columns per page"""
+    font_size, lines_per_page, columns, max_words = LAYOUTS[layout]
+    page_lines = lines_per_page * columns
+    lines = make_resume_lines(pages, seed, page_lines, max_words)
+    return make_pdf([lines[i:i + page_lines] for i in range(0, len(lines), page_lines)], font_size, columns)
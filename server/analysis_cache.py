@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+class AnalysisCache:
+    """Two-tier cache of analysis results keyed by content hash.
+
+    A bounded in-memory LRU sits in front of a SQLite file. Entries expire
+    after `ttl_seconds`, and the SQLite tier evicts least recently used rows
+    once the stored payloads exceed `max_disk_bytes`.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        memory_entries: int = 256,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_disk_bytes: int = 256 * 1024 * 1024
+    ):
+        self.db_path = Path(db_path)
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self.stats_counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(file_bytes: bytes, model_name: str, prompt_version: str) -> str:
+        """Content address for a PDF analyzed with a given model and prompt set"""
+        digest = hashlib.sha256(file_bytes).hexdigest()
+        return hashlib.sha256(f"{digest}:{model_name}:{prompt_version}".encode()).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections cannot be shared across fork(), so reopen in each worker process
+        if self._conn is None or self._conn_pid != os.getpid():
+            os.makedirs(self.db_path.parent, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of the cached results, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                payload, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats_counters["memory_hits"] += 1
+                    return json.loads(payload)
+                del self._memory[key]
+
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT payload, created_at FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                    conn.commit()
+                self.stats_counters["misses"] += 1
+                return None
+
+            conn.execute("UPDATE analysis_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self._remember(key, row[0], row[1])
+            self.stats_counters["disk_hits"] += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, results: Dict[str, Any]):
+        """Store results in both tiers"""
+        payload = json.dumps(results)
+        now = time.time()
+        with self._lock:
+            self._remember(key, payload, now)
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, payload, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now)
+            )
+            self._evict(conn, now)
+            conn.commit()
+            self.stats_counters["stores"] += 1
+
+    def _remember(self, key: str, payload: str, created_at: float):
+        self._memory[key] = (payload, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        expired = conn.execute(
+            "DELETE FROM analysis_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM analysis_cache").fetchone()[0]
+        evicted = 0
+        if total > self.max_disk_bytes:
+            for key, size in conn.execute(
+                "SELECT key, size FROM analysis_cache ORDER BY accessed_at ASC"
+            ).fetchall():
+                if total <= self.max_disk_bytes:
+                    break
+                conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        self.stats_counters["evictions"] += expired + evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus the current size of each tier"""
+        with self._lock:
+            conn = self._connection()
+            disk_entries, disk_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis_cache"
+            ).fetchone()
+            lookups = self.stats_counters["memory_hits"] + self.stats_counters["disk_hits"] + self.stats_counters["misses"]
+            hits = lookups - self.stats_counters["misses"]
+            return {
+                **self.stats_counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+            }
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            conn.execute("DELETE FROM analysis_cache")
+            conn.commit()
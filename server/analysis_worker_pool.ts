@@ -0,0 +1,143 @@
+import { spawn, type ChildProcessWithoutNullStreams } from "child_process";
+import { randomUUID } from "crypto";
+
+// Pool of long-lived `resume_service.py --worker` processes. Each worker
+// keeps its imports and Gemini client warm and handles one request at a time.
+
+// Incremental events streamed by the worker before the final result:
+// { type: "progress", message, stage, elapsed, ... }, { type: "overview", overview, strengths, weaknesses }
+// and { type: "section", index, section, overallScore }. Progress events carry
+// machine-readable fields (stage, section, completed/total, score) next to the message.
+export type AnalysisEvent = { type: string; [key: string]: any };
+
+interface AnalysisJob {
+  id: string;
+  fileBuffer: Buffer;
+  filename: string;
+  onEvent: (event: AnalysisEvent) => void;
+  resolve: (results: any) => void;
+  reject: (error: Error) => void;
+}
+
+interface Worker {
+  process: ChildProcessWithoutNullStreams;
+  job: AnalysisJob | null;
+  buffer: string;
+}
+
+export class AnalysisWorkerPool {
+  private workers: Worker[] = [];
+  private queue: AnalysisJob[] = [];
+  private closed = false;
+
+  constructor(private size: number) {
+    for (let i = 0; i < size; i++) {
+      this.workers.push(this.spawnWorker());
+    }
+  }
+
+  analyze(
+    fileBuffer: Buffer,
+    filename: string,
+    onEvent: (event: AnalysisEvent) => void
+  ): Promise<any> {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ id: randomUUID(), fileBuffer, filename, onEvent, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  close() {
+    this.closed = true;
+    for (const worker of this.workers) {
+      worker.process.stdin.end();
+    }
+  }
+
+  private spawnWorker(): Worker {
+    const worker: Worker = {
+      process: spawn("python", ["server/resume_service.py", "--worker"]),
+      job: null,
+      buffer: "",
+    };
+
+    worker.process.stdout.on("data", (data) => {
+      worker.buffer += data.toString();
+      let newline;
+      while ((newline = worker.buffer.indexOf("\n")) >= 0) {
+        const line = worker.buffer.slice(0, newline);
+        worker.buffer = worker.buffer.slice(newline + 1);
+        if (line.trim()) {
+          this.handleEvent(worker, line);
+        }
+      }
+    });
+
+    // Progress arrives as structured events on stdout; stderr is diagnostics only
+    worker.process.stderr.on("data", () => {});
+
+    worker.process.on("close", (code) => {
+      if (worker.job) {
+        worker.job.reject(new Error(`Analysis worker exited with code ${code}`));
+        worker.job = null;
+      }
+      const index = this.workers.indexOf(worker);
+      if (index >= 0) {
+        this.workers.splice(index, 1);
+      }
+      if (!this.closed) {
+        console.error(`Analysis worker exited with code ${code}, restarting`);
+        this.workers.push(this.spawnWorker());
+        this.dispatch();
+      }
+    });
+
+    return worker;
+  }
+
+  private handleEvent(worker: Worker, line: string) {
+    const job = worker.job;
+    let event: any;
+    try {
+      event = JSON.parse(line);
+    } catch (err) {
+      console.error("Error parsing worker output:", line);
+      return;
+    }
+    if (!job || event.id !== job.id) {
+      return;
+    }
+
+    if (event.type === "result" || event.type === "error") {
+      worker.job = null;
+      if (event.type === "result") {
+        job.resolve(event.results);
+      } else {
+        job.reject(new Error(event.error));
+      }
+      this.dispatch();
+    } else {
+      job.onEvent(event);
+    }
+  }
+
+  private dispatch() {
+    for (const worker of this.workers) {
+      if (this.queue.length === 0) {
+        return;
+      }
+      if (worker.job) {
+        continue;
+      }
+      const job = this.queue.shift()!;
+      worker.job = job;
+      // Frame: JSON header line followed by the raw PDF bytes
+      worker.process.stdin.write(JSON.stringify({
+        id: job.id,
+        filename: job.filename,
+        size: job.fileBuffer.length
+      }) + "\n");
+      worker.process.stdin.write(job.fileBuffer);
+    }
+  }
+}
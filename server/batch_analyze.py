@@ -0,0 +1,256 @@
+"""Bulk analysis of a folder or manifest of resume PDFs.
+
+Usage:
+    python server/batch_analyze.py resumes/ --output results.jsonl [--concurrency 4] [--mode batched]
+    python server/batch_analyze.py manifest.txt --output results.jsonl --parquet results.parquet
+
+The input is a directory (searched recursively for *.pdf) or a manifest
+file with one PDF path per line, or JSON lines with a "path" key. Relative
+manifest paths are resolved against the manifest's directory.
+
+Each resume goes through `resume_service.analyze_resume` (or, with
+--extract-only, `resume_service.extract_text_from_pdf`), with at most
+--concurrency resumes in flight. One JSON record per resume is appended to
+--output as soon as it finishes, so rerunning the same command after a
+crash skips every file already recorded with status "ok". --parquet
+additionally converts the JSONL output to Parquet at the end (needs
+pyarrow). --persist also writes each analysis to the resume_analyses and
+resume_scores tables in batches (see results_writer.py), and --index adds
+each resume and its sections to a semantic search index (see
+resume_index.py), checkpointed at every progress report.
+
+Progress is reported on stderr as one JSON object per line: a "start"
+event with the resume counts, a "progress" event with the throughput every
+--report-every seconds, "done" with the final totals and, with --persist,
+"persisted" with the results writer's counters.
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import resume_service
+from results_writer import ResultsWriter, create_results_writer
+
+def report_event(stream, event_type: str, **fields):
+    """Write one machine-readable batch event as a JSON line"""
+    print(json.dumps({"type": event_type, **fields}), file=stream, flush=True)
+
+def iter_input_paths(source: Path) -> Iterator[Path]:
+    """PDF paths from a directory tree or a manifest file"""
+    if source.is_dir():
+        yield from sorted(path for path in source.rglob("*") if path.suffix.lower() == ".pdf")
+        return
+    with open(source) as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = Path(json.loads(line)["path"] if line.startswith("{") else line)
+            yield path if path.is_absolute() else source.parent / path
+
+def load_finished(output: Path) -> Set[str]:
+    """Paths already recorded as "ok" in the output, after dropping a torn last line"""
+    if not output.exists():
+        return set()
+    with open(output, "rb+") as f:
+        data = f.read()
+        # A crash mid-write leaves a partial record; cut it so appends start on a fresh line
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    finished = set()
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("status") == "ok":
+            finished.add(record["path"])
+    return finished
+
+class ThroughputMeter:
+    """Resumes and LLM tokens per minute since the batch started"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self.start_tokens = self._tokens()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _tokens() -> int:
+        totals = resume_service.token_ledger.summary()
+        return totals.get("prompt_tokens", 0) + totals.get("response_tokens", 0)
+
+    def record(self, ok: bool):
+        with self._lock:
+            self.done += 1
+            self.errors += not ok
+
+    def report(self) -> Dict[str, Any]:
+        minutes = max(time.perf_counter() - self.started, 1e-9) / 60
+        return {
+            "done": self.done,
+            "total": self.total,
+            "errors": self.errors,
+            "resumes_per_min": round(self.done / minutes, 1),
+            "tokens_per_min": round((self._tokens() - self.start_tokens) / minutes),
+        }
+
+def process(
+    path: Path,
+    mode: Optional[str],
+    extract_only: bool,
+    keep_layout: bool = False
+) -> Tuple[Dict[str, Any], Optional[resume_service.PageLayout]]:
+    """Analyze (or only extract) one resume, returning its output record and, if
+    extracted or `keep_layout` is set, its text layout"""
+    record: Dict[str, Any] = {"path": str(path), "filename": path.name}
+    layout = None
+    started = time.perf_counter()
+    try:
+        file_bytes = path.read_bytes()
+        # Content-derived, so re-persisting the same resume after a crash is idempotent
+        record["analysis_id"] = hashlib.sha256(file_bytes).hexdigest()[:32]
+        if extract_only or keep_layout:
+            layout = resume_service.extract_layout_from_pdf(file_bytes)
+        if extract_only:
+            record["text"] = layout.text
+        else:
+            results = resume_service.analyze_resume(file_bytes, path.name, mode=mode, layout=layout)
+            record["results"] = results
+            record["overallScore"] = results["overallScore"]
+            record["failed_sections"] = sum(resume_service.section_failed(section) for section in results["sections"])
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record, layout
+
+def write_parquet(output: Path, parquet_path: Path):
+    """Convert the JSONL output to Parquet, keeping the latest record per path"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("--parquet needs pyarrow: pip install pyarrow")
+
+    records: Dict[str, Dict[str, Any]] = {}
+    with open(output) as f:
+        for line in f:
+            record = json.loads(line)
+            # Nested results vary by section set; store them as a JSON column
+            if "results" in record:
+                record["results"] = json.dumps(record["results"])
+            records[record["path"]] = record
+    # Error and extract-only records lack some fields; every row needs every column
+    columns = list(dict.fromkeys(key for record in records.values() for key in record))
+    rows = [{column: record.get(column) for column in columns} for record in records.values()]
+    pq.write_table(pa.Table.from_pylist(rows), parquet_path)
+
+def run_batch(
+    paths: List[Path],
+    output: Path,
+    concurrency: int,
+    mode: Optional[str] = None,
+    extract_only: bool = False,
+    report_every: float = 10.0,
+    report_stream=sys.stderr,
+    writer: Optional[ResultsWriter] = None,
+    index=None
+) -> Dict[str, Any]:
+    """Process `paths` not yet finished in `output`, appending a record per resume.
+
+    Successful analyses are also buffered into `writer` and added to the
+    resume_index.ResumeIndex `index`, if given.
+    """
+    finished = load_finished(output)
+    pending = [path for path in paths if str(path) not in finished]
+    meter = ThroughputMeter(len(pending))
+    report_event(report_stream, "start", resumes=len(paths), already_done=len(paths) - len(pending), pending=len(pending))
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    last_report = time.perf_counter()
+    with open(output, "a") as out, ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        queue = iter(pending)
+        in_flight = set()
+        while True:
+            # Keep at most `concurrency` resumes (and their PDF bytes) in memory
+            for path in queue:
+                in_flight.add(executor.submit(process, path, mode, extract_only, index is not None))
+                if len(in_flight) >= concurrency:
+                    break
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                record, layout = future.result()
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                meter.record(record["status"] == "ok")
+                if writer is not None and "results" in record:
+                    writer.add_analysis(record["analysis_id"], record["filename"], record["results"])
+                if index is not None and layout is not None and record["status"] == "ok":
+                    index.add_resume(record["analysis_id"], record["filename"], layout.text, layout.lines, record.get("results"))
+            if time.perf_counter() - last_report >= report_every:
+                if index is not None:
+                    index.save()
+                report_event(report_stream, "progress", **meter.report())
+                last_report = time.perf_counter()
+
+    if index is not None:
+        index.save()
+
+    summary = meter.report()
+    report_event(report_stream, "done", **summary)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", type=Path, help="Directory of PDFs or manifest file")
+    parser.add_argument("--output", type=Path, required=True, help="JSONL file results are appended to")
+    parser.add_argument("--parquet", type=Path, help="Also write the results as Parquet when done")
+    parser.add_argument("--concurrency", type=int, default=4, help="Resumes analyzed at once")
+    parser.add_argument("--mode", choices=resume_service.ANALYSIS_MODES, help="Analysis mode (default: ANALYSIS_MODE)")
+    parser.add_argument("--extract-only", action="store_true", help="Only extract text, no LLM calls")
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between throughput reports")
+    parser.add_argument("--quiet", action="store_true", help="Hide per-resume service logs")
+    parser.add_argument("--persist", metavar="TARGET",
+                        help='Also write results to "bigquery", "bigquery-load" or "sqlite:<path>"')
+    parser.add_argument("--index", type=Path, metavar="DIR", help="Also add resumes to the semantic search index in DIR")
+    args = parser.parse_args()
+
+    paths = list(iter_input_paths(args.input))
+    report_stream = sys.stderr
+    writer = create_results_writer(args.persist) if args.persist else None
+    index = None
+    if args.index:
+        # Imported here so batches without --index do not need faiss
+        from resume_index import ResumeIndex
+
+        index = ResumeIndex(args.index)
+    with contextlib.redirect_stderr(open(os.devnull, "w")) if args.quiet else contextlib.nullcontext():
+        run_batch(
+            paths, args.output, args.concurrency, args.mode, args.extract_only, args.report_every, report_stream,
+            writer, index
+        )
+    if writer is not None:
+        writer.close()
+        report_event(report_stream, "persisted", **writer.stats())
+    if args.parquet:
+        write_parquet(args.output, args.parquet)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import shared_path  # noqa: F401  (makes the shared/ package importable)
+from shared.llm_memo import normalize_text
+
+# Universal hashing modulo a Mersenne prime; a * h stays below 2**62, so uint64 never overflows
+_PRIME = np.uint64((1 << 31) - 1)
+
+class NearDuplicate(NamedTuple):
+    key: str
+    similarity: float  # estimated Jaccard similarity of the shingle sets
+    section_digests: Dict[str, str]
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """crc32 of every `size`-word shingle of the normalized, lower-cased text"""
+    words = normalize_text(text).lower().split()
+    if len(words) < size:
+        words = words + [""] * (size - len(words))
+    hashes = {zlib.crc32(" ".join(words[i:i + size]).encode()) for i in range(len(words) - size + 1)}
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) splitting the signature so the LSH S-curve's midpoint,
+    (1/bands) ** (1/rows), is closest to `threshold`"""
+    candidates = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+def section_digest(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()[:16]
+
+class NearDuplicateIndex:
+    """MinHash signatures of resume texts in a banded LSH index on SQLite.
+
+    Signatures are `num_perm` uint32 values stored as one blob (512 bytes
+    at the default 128), documents are referenced by integer rowid, and each
+    band is a single 64-bit bucket key, so each document costs roughly
+    num_perm * 4 + bands * 16 bytes. Candidates sharing any band bucket are
+    verified against the full signatures before being reported.
+
+    Each document also stores the `version` of the analysis it was indexed
+    with (prompt and model tiers); queries only match documents of the same
+    version, since an analysis from other prompts or models cannot be reused.
+    """
+
+    def __init__(self, db_path: Path, threshold: float = 0.9, num_perm: int = 128, shingle_size: int = 5):
+        self.db_path = Path(db_path)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        # Fixed seed: signatures must be comparable across processes and restarts
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections cannot be shared across fork(), so reopen in each worker process
+        if self._conn is None or self._conn_pid != os.getpid():
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, signature BLOB NOT NULL, sections TEXT NOT NULL, "
+                "version TEXT NOT NULL DEFAULT '')"
+            )
+            # Indexes created before documents were versioned; their entries never match a versioned query
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+            if "version" not in columns:
+                self._conn.execute("ALTER TABLE documents ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "bucket INTEGER NOT NULL, doc INTEGER NOT NULL, PRIMARY KEY (bucket, doc)) WITHOUT ROWID"
+            )
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingle_hashes(text, self.shingle_size) % _PRIME
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_buckets(self, signature: np.ndarray) -> List[int]:
+        buckets = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(band.to_bytes(2, "little") + rows, digest_size=8).digest()
+            buckets.append(int.from_bytes(digest, "little", signed=True))
+        return buckets
+
+    def query(self, signature: np.ndarray, exclude: Optional[str] = None, version: str = "") -> List[NearDuplicate]:
+        """Indexed documents of `version` with estimated Jaccard similarity >= threshold, most similar first"""
+        buckets = self._band_buckets(signature)
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key, signature, sections FROM documents WHERE version = ? AND id IN ("
+                f"SELECT doc FROM buckets WHERE bucket IN ({','.join('?' for _ in buckets)}))",
+                [version, *buckets]
+            ).fetchall()
+        matches = []
+        for key, blob, sections in rows:
+            if key == exclude:
+                continue
+            similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+            if similarity >= self.threshold:
+                digests = dict(line.split("\t", 1) for line in sections.splitlines() if "\t" in line)
+                matches.append(NearDuplicate(key, similarity, digests))
+        return sorted(matches, key=lambda match: -match.similarity)
+
+    def add(
+        self,
+        key: str,
+        signature: np.ndarray,
+        section_digests: Optional[Dict[str, str]] = None,
+        version: str = ""
+    ):
+        """Index a document analyzed with `version`; re-adding a key replaces its entry"""
+        sections = "\n".join(f"{name}\t{digest}" for name, digest in (section_digests or {}).items())
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT id FROM documents WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM buckets WHERE doc = ?", (row[0],))
+                conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+            doc = conn.execute(
+                "INSERT INTO documents (key, signature, sections, version) VALUES (?, ?, ?, ?)",
+                (key, signature.astype(np.uint32).tobytes(), sections, version)
+            ).lastrowid
+            conn.executemany(
+                "INSERT OR IGNORE INTO buckets (bucket, doc) VALUES (?, ?)",
+                [(bucket, doc) for bucket in self._band_buckets(signature)]
+            )
+            conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
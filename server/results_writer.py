@@ -0,0 +1,231 @@
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Dataset and tables used by storage.ts; column names match its queries
+DATASET = "gigflick"
+ANALYSES_TABLE = "resume_analyses"
+SCORES_TABLE = "resume_scores"
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def analysis_rows(
+    analysis_id: str,
+    file_name: str,
+    results: Dict[str, Any],
+    status: str = "completed",
+    uploaded_at: Optional[str] = None
+) -> tuple:
+    """The resume_analyses row and resume_scores rows for one analysis.
+
+    Score row ids are derived from the analysis id, so writing the same
+    analysis twice produces identical rows. Failed sections are not scored.
+    """
+    timestamp = utc_now()
+    analysis = {
+        "id": analysis_id,
+        "fileName": file_name,
+        "resumeUploadedAt": uploaded_at or timestamp,
+        "status": status,
+        "results": json.dumps(results),
+    }
+    scores = [
+        {
+            "id": f"{analysis_id}:{index}",
+            "analysisId": analysis_id,
+            "sectionName": section["name"],
+            "score": int(section["score"]),
+            "feedback": section.get("content", ""),
+            "suggestions": json.dumps(section.get("suggestions", [])),
+            "timestamp": timestamp,
+        }
+        for index, section in enumerate(results.get("sections", []))
+        if not section.get("failed")
+    ]
+    return analysis, scores
+
+class SQLiteResultsBackend:
+    """Offline stand-in for BigQuery with the same tables and columns.
+
+    Rows are upserted by id, so replayed batches are idempotent. The SQL
+    sticks to what both SQLite and DuckDB accept.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {ANALYSES_TABLE} ("
+            "id TEXT PRIMARY KEY, fileName TEXT, resumeUploadedAt TEXT, status TEXT, results TEXT)"
+        )
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {SCORES_TABLE} ("
+            "id TEXT PRIMARY KEY, analysisId TEXT, sectionName TEXT, score INTEGER, "
+            "feedback TEXT, suggestions TEXT, timestamp TEXT)"
+        )
+        self._conn.commit()
+
+    def write(self, table: str, rows: List[Dict[str, Any]]):
+        columns = list(rows[0])
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            [tuple(row[column] for column in columns) for row in rows]
+        )
+        self._conn.commit()
+
+class BigQueryResultsBackend:
+    """Writes batches to BigQuery with streaming inserts or load jobs.
+
+    Streaming inserts pass each row id as the insertId, so BigQuery drops
+    duplicates of a retried batch. Load jobs use a job id derived from the
+    row ids; a retried batch reuses it and is rejected as already done.
+    """
+
+    def __init__(self, project: Optional[str] = None, dataset: str = DATASET, method: str = "stream"):
+        from google.cloud import bigquery
+
+        if method not in ("stream", "load"):
+            raise ValueError(f"Unknown BigQuery write method: {method}")
+        self.bigquery = bigquery
+        credentials = None
+        # Same service account setting as the Node server (server/db.ts)
+        if os.getenv("BIGQUERY_CREDENTIALS"):
+            from google.oauth2 import service_account
+
+            info = json.loads(os.environ["BIGQUERY_CREDENTIALS"])
+            credentials = service_account.Credentials.from_service_account_info(info)
+            project = project or info.get("project_id")
+        self.client = bigquery.Client(project=project, credentials=credentials)
+        self.dataset = dataset
+        self.method = method
+
+    def write(self, table: str, rows: List[Dict[str, Any]]):
+        table_id = f"{self.client.project}.{self.dataset}.{table}"
+        if self.method == "stream":
+            errors = self.client.insert_rows_json(table_id, rows, row_ids=[row["id"] for row in rows])
+            if errors:
+                raise RuntimeError(f"BigQuery insert into {table} failed: {errors[:3]}")
+            return
+
+        from google.api_core.exceptions import Conflict
+
+        digest = hashlib.sha256("\0".join(row["id"] for row in rows).encode()).hexdigest()[:32]
+        job_config = self.bigquery.LoadJobConfig(write_disposition=self.bigquery.WriteDisposition.WRITE_APPEND)
+        try:
+            self.client.load_table_from_json(rows, table_id, job_config=job_config, job_id=f"{table}_{digest}").result()
+        except Conflict:
+            # This batch was already loaded by an earlier attempt
+            pass
+
+class ResultsWriter:
+    """Buffers analysis and score rows and writes them to the backend in bulk.
+
+    A flush happens once `max_rows` rows are buffered, every
+    `flush_interval` seconds from a background thread, and at exit. Rows
+    from a failed flush stay buffered and go out with the next one; retries
+    are idempotent because rows are keyed by the analysis id.
+    """
+
+    def __init__(self, backend, max_rows: int = 500, flush_interval: float = 5.0):
+        self.backend = backend
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {ANALYSES_TABLE: [], SCORES_TABLE: []}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.stats_counters = {"rows_written": 0, "flushes": 0, "flush_errors": 0}
+        self._thread = threading.Thread(target=self._flush_periodically, name="results-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add_analysis(
+        self,
+        analysis_id: str,
+        file_name: str,
+        results: Dict[str, Any],
+        status: str = "completed",
+        uploaded_at: Optional[str] = None
+    ):
+        """Buffer an analysis and its section scores"""
+        analysis, scores = analysis_rows(analysis_id, file_name, results, status, uploaded_at)
+        with self._lock:
+            self._buffers[ANALYSES_TABLE].append(analysis)
+            self._buffers[SCORES_TABLE].extend(scores)
+            full = self.pending() >= self.max_rows
+        if full:
+            self._wake.set()
+
+    def pending(self) -> int:
+        return sum(len(rows) for rows in self._buffers.values())
+
+    def flush(self):
+        """Write every buffered row; on failure the rows are kept for the next flush"""
+        with self._flush_lock:
+            with self._lock:
+                batches = {table: rows for table, rows in self._buffers.items() if rows}
+                self._buffers = {ANALYSES_TABLE: [], SCORES_TABLE: []}
+            if not batches:
+                return
+            # Analyses first, so a score row never lands without its analysis
+            for table in (ANALYSES_TABLE, SCORES_TABLE):
+                rows = batches.pop(table, None)
+                if not rows:
+                    continue
+                try:
+                    self.backend.write(table, rows)
+                except Exception as e:
+                    print(f"Error: flushing {len(rows)} rows to {table} failed, will retry: {e}", file=sys.stderr)
+                    with self._lock:
+                        self.stats_counters["flush_errors"] += 1
+                        for pending_table, pending_rows in [(table, rows), *batches.items()]:
+                            self._buffers[pending_table][:0] = pending_rows
+                    return
+                with self._lock:
+                    self.stats_counters["rows_written"] += len(rows)
+            with self._lock:
+                self.stats_counters["flushes"] += 1
+
+    def _flush_periodically(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self.pending():
+                self.flush()
+
+    def close(self):
+        """Stop the background thread and flush what is left"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats_counters, "pending_rows": self.pending()}
+
+def create_results_writer(target: str, max_rows: int = 500, flush_interval: float = 5.0) -> ResultsWriter:
+    """Writer for "bigquery", "bigquery-load" or "sqlite:<path>" """
+    if target in ("bigquery", "bigquery-load"):
+        backend = BigQueryResultsBackend(
+            project=os.getenv("GOOGLE_CLOUD_PROJECT"),
+            method="load" if target == "bigquery-load" else "stream"
+        )
+    elif target.startswith("sqlite:"):
+        backend = SQLiteResultsBackend(Path(target[len("sqlite:"):]))
+    else:
+        raise ValueError(f"Unknown results target: {target}")
+    return ResultsWriter(backend, max_rows=max_rows, flush_interval=flush_interval)
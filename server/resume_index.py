@@ -0,0 +1,369 @@
+"""Semantic search over analyzed resumes with FAISS.
+
+Usage:
+    python server/resume_index.py search --index tmp/resume_index "Senior Python engineer, data pipelines" [--k 10]
+    python server/resume_index.py similar --index tmp/resume_index <analysis_id> [--k 10]
+    python server/resume_index.py compact --index tmp/resume_index
+
+Resumes are ingested with `batch_analyze.py --index DIR`, or with
+ResumeIndex.add_resume. Each resume contributes one vector for its full
+text and one per detected section span.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import faiss
+import numpy as np
+
+import shared_path  # noqa: F401  (makes the shared/ package importable)
+from shared.llm_memo import normalize_text
+from shared.section_segmenter import segment_document
+
+EMBED_BATCH_SIZE = int(os.getenv("RESUME_INDEX_BATCH_SIZE", "64"))
+# Characters of each document kept in the metadata store for display
+PREVIEW_CHARS = 300
+
+class HashingEmbedder:
+    """Local, dependency-free embeddings: signed feature hashing of word unigrams and bigrams.
+
+    Deterministic across processes (crc32, not hash()), so stored vectors
+    stay valid. Captures vocabulary overlap, not paraphrase.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: Sequence[str], query: bool = False) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = normalize_text(text).lower().split()
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                bucket = zlib.crc32(feature.encode())
+                vectors[row, bucket % self.dim] += 1.0 if bucket & 0x80000000 else -1.0
+        # Sublinear term frequency, then unit length for inner-product search
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+class GeminiEmbedder:
+    """Gemini text embeddings, requested in batches"""
+
+    MAX_BATCH = 100
+
+    def __init__(self, model: str = "models/text-embedding-004", dim: int = 768):
+        import google.generativeai as genai
+
+        self.genai = genai
+        self.model = model
+        self.dim = dim
+        self.name = model
+
+    def embed(self, texts: Sequence[str], query: bool = False) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.MAX_BATCH):
+            response = self.genai.embed_content(
+                model=self.model,
+                content=list(texts[start:start + self.MAX_BATCH]),
+                task_type="retrieval_query" if query else "retrieval_document"
+            )
+            vectors.extend(response["embedding"])
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(texts), self.dim)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+class CachedEmbedder:
+    """Wraps an embedder with a SQLite cache of document vectors keyed on normalized text"""
+
+    def __init__(self, embedder, db_path: Path, batch_size: int = EMBED_BATCH_SIZE):
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.name = embedder.name
+        self.batch_size = batch_size
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=10)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._lock = threading.Lock()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.name}\0{normalize_text(text)}".encode()).hexdigest()
+
+    def embed(self, texts: Sequence[str], query: bool = False) -> np.ndarray:
+        if query:
+            # Query vectors may differ from document vectors and are rarely repeated
+            return self.embedder.embed(texts, query=True)
+        keys = [self._key(text) for text in texts]
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        with self._lock:
+            cached = {}
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                cached.update(self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' for _ in chunk)})", chunk
+                ).fetchall())
+        missing = [row for row, key in enumerate(keys) if key not in cached]
+        for row, key in enumerate(keys):
+            if key in cached:
+                vectors[row] = np.frombuffer(cached[key], dtype=np.float32)
+        for start in range(0, len(missing), self.batch_size):
+            rows = missing[start:start + self.batch_size]
+            vectors[rows] = self.embedder.embed([texts[row] for row in rows])
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(keys[row], vectors[row].tobytes()) for row in rows]
+                )
+                self._conn.commit()
+        return vectors
+
+def create_embedder(kind: Optional[str] = None, cache_path: Optional[Path] = None):
+    """Embedder named by `kind` or RESUME_INDEX_EMBEDDER: "hashing" (default, local) or "gemini" """
+    kind = kind or os.getenv("RESUME_INDEX_EMBEDDER", "hashing")
+    if kind == "hashing":
+        return HashingEmbedder()
+    if kind == "gemini":
+        embedder = GeminiEmbedder()
+        return CachedEmbedder(embedder, cache_path) if cache_path else embedder
+    raise ValueError(f"Unknown embedder: {kind}")
+
+def new_flat_index(dim: int) -> faiss.Index:
+    return faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+
+class ResumeIndex:
+    """Persistent FAISS index of resumes and their sections, with a SQLite metadata store.
+
+    The compacted base index is memory-mapped read-only. New vectors go to
+    an in-memory delta index, saved to its own small file by `save()` and
+    merged into the base by `compact()`. Re-added or removed documents are
+    tombstoned in the metadata store and skipped at query time until the
+    next compaction.
+    """
+
+    def __init__(self, directory: Path, embedder=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.embedder = embedder or create_embedder(cache_path=self.directory / "embeddings.sqlite")
+        self.dim = self.embedder.dim
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.directory / "documents.sqlite"), check_same_thread=False, timeout=10)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, analysis_id TEXT NOT NULL, kind TEXT NOT NULL, "
+            "section TEXT, filename TEXT, preview TEXT, meta TEXT, deleted INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_analysis ON documents (analysis_id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+        self._check_embedder()
+        self._conn.commit()
+        self._load()
+
+    @property
+    def base_path(self) -> Path:
+        return self.directory / "index.faiss"
+
+    @property
+    def delta_path(self) -> Path:
+        return self.directory / "delta.faiss"
+
+    def _check_embedder(self):
+        row = self._conn.execute("SELECT value FROM settings WHERE key = 'embedder'").fetchone()
+        if row is None:
+            self._conn.execute("INSERT INTO settings (key, value) VALUES ('embedder', ?)", (self.embedder.name,))
+        elif row[0] != self.embedder.name:
+            raise ValueError(f"Index was built with embedder {row[0]}, not {self.embedder.name}")
+
+    def _load(self):
+        self.base = None
+        if self.base_path.exists():
+            self.base = faiss.read_index(str(self.base_path), getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP))
+        self.delta = faiss.read_index(str(self.delta_path)) if self.delta_path.exists() else new_flat_index(self.dim)
+
+    def __len__(self) -> int:
+        return (self.base.ntotal if self.base is not None else 0) + self.delta.ntotal
+
+    def add_documents(self, documents: List[Dict[str, Any]]) -> List[int]:
+        """Embed and index documents with "text", "analysis_id", "kind" and optional
+        "section", "filename" and "meta" keys; returns their ids"""
+        if not documents:
+            return []
+        vectors = self.embedder.embed([document["text"] for document in documents])
+        with self._lock:
+            ids = []
+            for document in documents:
+                cursor = self._conn.execute(
+                    "INSERT INTO documents (analysis_id, kind, section, filename, preview, meta) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        document["analysis_id"], document["kind"], document.get("section"), document.get("filename"),
+                        document["text"][:PREVIEW_CHARS], json.dumps(document.get("meta", {}))
+                    )
+                )
+                ids.append(cursor.lastrowid)
+            self._conn.commit()
+            self.delta.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+        return ids
+
+    def remove(self, analysis_id: str):
+        with self._lock:
+            self._conn.execute("UPDATE documents SET deleted = 1 WHERE analysis_id = ?", (analysis_id,))
+            self._conn.commit()
+
+    def add_resume(
+        self,
+        analysis_id: str,
+        filename: str,
+        text: str,
+        line_styles: Optional[Sequence] = None,
+        results: Optional[Dict[str, Any]] = None
+    ) -> List[int]:
+        """Index a resume's full text and each detected section, replacing earlier entries for it"""
+        meta = {"overallScore": results["overallScore"]} if results else {}
+        documents = [{"analysis_id": analysis_id, "kind": "resume", "filename": filename, "text": text, "meta": meta}]
+        segments = segment_document(text, line_styles)
+        for section in segments.spans:
+            documents.append({
+                "analysis_id": analysis_id, "kind": "section", "section": section, "filename": filename,
+                "text": segments.span_text(section), "meta": meta
+            })
+        self.remove(analysis_id)
+        return self.add_documents(documents)
+
+    def search_vectors(self, vectors: np.ndarray, k: int = 10, kind: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """Top `k` live documents per query vector, best first"""
+        with self._lock:
+            # Over-fetch so tombstoned and other-kind hits can be dropped
+            fetch = k * 4 + 16
+            scores, ids = self.delta.search(vectors, min(fetch, max(self.delta.ntotal, 1)))
+            if self.base is not None and self.base.ntotal:
+                base_scores, base_ids = self.base.search(vectors, min(fetch, self.base.ntotal))
+                scores, ids = np.hstack([scores, base_scores]), np.hstack([ids, base_ids])
+
+            results = []
+            for row_scores, row_ids in zip(scores, ids):
+                order = np.argsort(-row_scores)
+                # dict.fromkeys: a crash mid-compaction can leave an id in both base and delta
+                candidates = list(dict.fromkeys(
+                    (int(row_ids[i]), float(row_scores[i])) for i in order if row_ids[i] >= 0
+                ))
+                documents = self._documents([doc_id for doc_id, _ in candidates])
+                hits = []
+                for doc_id, score in candidates:
+                    document = documents.get(doc_id)
+                    if document is None or (kind and document["kind"] != kind):
+                        continue
+                    hits.append({**document, "score": score})
+                    if len(hits) == k:
+                        break
+                results.append(hits)
+            return results
+
+    def _documents(self, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        ids = list(ids)
+        if not ids:
+            return {}
+        rows = self._conn.execute(
+            "SELECT id, analysis_id, kind, section, filename, preview, meta FROM documents "
+            f"WHERE deleted = 0 AND id IN ({','.join('?' for _ in ids)})", ids
+        ).fetchall()
+        return {
+            row[0]: {
+                "id": row[0], "analysis_id": row[1], "kind": row[2], "section": row[3],
+                "filename": row[4], "preview": row[5], **json.loads(row[6] or "{}")
+            }
+            for row in rows
+        }
+
+    def search(self, query: str, k: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.search_vectors(self.embedder.embed([query], query=True), k, kind)[0]
+
+    def _rank_candidates(self, hits: List[Dict[str, Any]], k: int, exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        candidates: Dict[str, Dict[str, Any]] = {}
+        for hit in hits:
+            if hit["analysis_id"] == exclude or hit["analysis_id"] in candidates:
+                continue
+            candidates[hit["analysis_id"]] = {
+                "analysis_id": hit["analysis_id"],
+                "filename": hit["filename"],
+                "score": hit["score"],
+                "matched": hit["section"] or "resume",
+                "overallScore": hit.get("overallScore"),
+            }
+        return list(candidates.values())[:k]
+
+    def find_candidates(self, job_description: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Resumes whose full text or best-matching section is closest to a job description"""
+        return self._rank_candidates(self.search(job_description, k * 5), k)
+
+    def similar_to_resume(self, analysis_id: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Other resumes closest to an indexed one"""
+        row = self._conn.execute(
+            "SELECT id FROM documents WHERE analysis_id = ? AND kind = 'resume' AND deleted = 0 ORDER BY id DESC LIMIT 1",
+            (analysis_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Resume {analysis_id} is not indexed")
+        with self._lock:
+            try:
+                vector = self.delta.reconstruct(row[0])
+            except RuntimeError:
+                vector = self.base.reconstruct(row[0])
+        hits = self.search_vectors(vector.reshape(1, -1), (k + 1) * 5)[0]
+        return self._rank_candidates(hits, k, exclude=analysis_id)
+
+    def save(self):
+        """Persist vectors added since the last save (the delta file); cheap"""
+        with self._lock:
+            temporary = self.delta_path.with_suffix(".tmp")
+            faiss.write_index(self.delta, str(temporary))
+            os.replace(temporary, self.delta_path)
+
+    def compact(self):
+        """Merge the delta into the base index, dropping tombstoned documents, and re-map it"""
+        with self._lock:
+            live = {row[0] for row in self._conn.execute("SELECT id FROM documents WHERE deleted = 0")}
+            merged = new_flat_index(self.dim)
+            for index in (self.base, self.delta):
+                if index is None or not index.ntotal:
+                    continue
+                ids = faiss.vector_to_array(index.id_map)
+                vectors = index.index.reconstruct_n(0, index.ntotal)
+                keep = np.fromiter((doc_id in live for doc_id in ids), dtype=bool, count=len(ids))
+                merged.add_with_ids(vectors[keep], ids[keep])
+            temporary = self.base_path.with_suffix(".tmp")
+            faiss.write_index(merged, str(temporary))
+            os.replace(temporary, self.base_path)
+            if self.delta_path.exists():
+                self.delta_path.unlink()
+            self._conn.execute("DELETE FROM documents WHERE deleted = 1")
+            self._conn.commit()
+            self._load()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["search", "similar", "compact"])
+    parser.add_argument("query", nargs="?", help="Job description / resume text, or an analysis id for 'similar'")
+    parser.add_argument("--index", type=Path, default=Path("./tmp/resume_index"))
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_intermixed_args()
+
+    index = ResumeIndex(args.index)
+    if args.command == "compact":
+        index.compact()
+        print(json.dumps({"vectors": len(index)}))
+        return
+    if not args.query:
+        parser.error(f"{args.command} needs a query")
+    if args.command == "search":
+        results = index.find_candidates(args.query, args.k)
+    else:
+        results = index.similar_to_resume(args.query, args.k)
+    for result in results:
+        print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,32 @@
 import google.generativeai as genai
-from pdfminer.high_level import extract_text
 import os
 import json
 import base64
+import hashlib
+import io
+import tempfile
 from pathlib import Path
 import sys
+import signal
+import socket
+import threading
 import traceback
-from typing import Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple, Union
+
+import shared_path  # noqa: F401  (makes the shared/ package importable)
+from analysis_cache import AnalysisCache
+from near_duplicates import NearDuplicateIndex, section_digest
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from shared.call_scheduler import CallScheduler
+from shared.llm_memo import create_memo
+from shared.model_cascade import ModelCascade, ModelTier, parse_tiers
+from shared.pdf_extraction import PageLayout, iter_file_page_layouts, iter_page_layouts, join_pages
+from shared.response_parsing import JSONStreamParser, extract_json, validate
+from shared.section_segmenter import DocumentSegments, segment_document
+from shared.telemetry import TOKEN_BUCKETS, SlowRequestProfiler, current_trace, propagate_context, telemetry
+from shared.token_budget import TokenLedger, compact_text, count_tokens
 
 def log_error(error_msg: str, include_trace: bool = True):
     """Helper function to log errors with optional stack trace"""
@@ -19,32 +39,80 @@ def log_info(msg: str):
     """Helper function for logging informational messages"""
     print(msg, file=sys.stderr)
 
-def log_progress(msg: str):
-    """Helper function for logging progress messages"""
-    print(f"PROGRESS: {msg}", file=sys.stderr)
+# Set by the worker loop to stream progress messages back to the caller
+progress_listener = None
+
+def log_progress(msg: str, **fields):
+    """Report progress as a JSON "progress" event line on stderr and to progress_listener.
+
+    `fields` carry the machine-readable details (stage, section, counts,
+    score); `elapsed` is the time since the request's trace started.
+    """
+    event = {"type": "progress", "message": msg, **fields}
+    trace = current_trace()
+    if trace is not None:
+        event["elapsed"] = round(trace.elapsed(), 3)
+    print(json.dumps(event), file=sys.stderr, flush=True)
+    if progress_listener is not None:
+        progress_listener(event)
+
+# Gemini model tiers, cheapest first, as "model:input_cost:output_cost" (USD per
+# million tokens). Section and overview calls start on the first tier and are
+# re-run on the next one when the result is invalid or suspiciously short.
+MODEL_TIERS = parse_tiers(os.getenv(
+    "ANALYSIS_MODEL_TIERS", "gemini-1.5-flash-8b:0.0375:0.15,gemini-1.5-flash:0.075:0.30"
+))
+# Model of the first tier, also used for the single batched call
+MODEL_NAME = MODEL_TIERS[0].model
 
 # Initialize Gemini
 genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-model = genai.GenerativeModel('gemini-1.5-flash')
+models = {tier.model: genai.GenerativeModel(tier.model) for tier in MODEL_TIERS}
 
 TMP_DIR = Path("./tmp")
 os.makedirs(TMP_DIR, exist_ok=True)
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract text from PDF"""
-    try:
-        text = extract_text(pdf_path)
-        log_info(f"Extracted text from PDF: {len(text)} characters") #Added logging for extracted text length.
-        return text
-    except Exception as e:
-        log_error(f"PDF extraction error: {str(e)}")
-        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+# Maximum prompt tokens per LLM call; longer resume text is compacted to fit
+CALL_TOKEN_BUDGET = int(os.getenv("ANALYSIS_CALL_TOKEN_BUDGET", "8000"))
+
+# PDFs larger than this are spilled to an anonymous temp file before extraction
+PDF_SPILL_BYTES = int(os.getenv("PDF_SPILL_BYTES", str(32 * 1024 * 1024)))
+# pdfminer layout analysis preset: "fast", "default" or "accurate"
+PDF_LAYOUT_PRESET = os.getenv("PDF_LAYOUT_PRESET", "default")
+# The overview starts as soon as this many pages are parsed, on those pages
+# only, while later pages are still being extracted. Longer resumes trade
+# overview context for an earlier start; 0 waits for the whole document.
+OVERVIEW_EARLY_PAGES = int(os.getenv("OVERVIEW_EARLY_PAGES", "2"))
+
+# Execution mode for the overview + section calls, one of ANALYSIS_MODES
+ANALYSIS_MODES = ("sequential", "concurrent", "batched")
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "sequential")
+MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "8"))
+CALL_TIMEOUT = float(os.getenv("ANALYSIS_CALL_TIMEOUT", "60"))
 
-def analyze_resume_section(text: str, section_name: str) -> dict:
-    """Analyze a specific section of the resume using Gemini."""
-    log_progress(f"Analyzing {section_name}...")
+# Shared rate limit / retry policy for Gemini calls. Section calls still
+# running after ANALYSIS_HEDGE_AFTER seconds are hedged with a second request.
+call_scheduler = CallScheduler(
+    rate_per_minute=float(os.getenv("LLM_RATE_LIMIT_RPM", "300")),
+    burst=float(os.getenv("LLM_RATE_LIMIT_BURST", "10")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+    base_delay=float(os.getenv("LLM_BACKOFF_BASE", "1.0")),
+    max_delay=float(os.getenv("LLM_BACKOFF_MAX", "30"))
+)
+HEDGE_AFTER = float(os.getenv("ANALYSIS_HEDGE_AFTER", "0")) or None
 
-    prompt = f"""Analyze the following resume section: {section_name}
+# Sections analyzed for every resume, in output order
+SECTIONS = [
+    "Professional Summary",
+    "Work Experience",
+    "Skills",
+    "Education",
+    "Projects",
+    "Languages",
+    "Certifications"
+]
+
+SECTION_PROMPT = """Analyze the following resume section: {section_name}
 
     Text to analyze:
     {text}
@@ -56,132 +124,977 @@ def analyze_resume_section(text: str, section_name: str) -> dict:
         "suggestions": [<array of string suggestions>]
     }}"""
 
+OVERVIEW_PROMPT = """Analyze this resume and provide a comprehensive evaluation.
+        Focus on specific, actionable insights. Output a JSON with:
+        {
+            "overview": <2-3 sentence professional overview>,
+            "strengths": [<3 specific resume strengths>],
+            "weaknesses": [<3 specific areas for improvement>]
+        }"""
+
+BATCH_PROMPT = """Analyze this resume and provide a comprehensive evaluation of the overall
+    profile and of each of these sections: {section_names}.
+    Focus on specific, actionable insights.
+
+    Important: Respond with ONLY a JSON object that has exactly these keys:
+    {{
+        "overview": <2-3 sentence professional overview>,
+        "strengths": [<3 specific resume strengths>],
+        "weaknesses": [<3 specific areas for improvement>],
+        "sections": {{
+            "<section name>": {{
+                "score": <number 0-100>,
+                "content": <string evaluation>,
+                "suggestions": [<array of string suggestions>]
+            }}
+        }}
+    }}
+    "sections" must contain one entry per section listed above, keyed by the exact section name.
+
+    Resume text:
+    {text}"""
+
+# Changes whenever a prompt or the section list changes, invalidating cached results
+PROMPT_VERSION = hashlib.sha256(
+    "\0".join([SECTION_PROMPT, OVERVIEW_PROMPT, BATCH_PROMPT, *SECTIONS]).encode()
+).hexdigest()[:16]
+
+# Whole-document results cache, keyed by PDF hash + model + prompt version
+CACHE_ENABLED = os.getenv("ANALYSIS_CACHE", "1") != "0"
+analysis_cache = AnalysisCache(
+    TMP_DIR / "analysis_cache.sqlite",
+    memory_entries=int(os.getenv("ANALYSIS_CACHE_MEMORY_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600))),
+    max_disk_bytes=int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+)
+
+# Per-call memo of section results on (template, normalized text, model, temperature)
+section_memo = create_memo(
+    os.getenv("LLM_MEMO_BACKEND", "memory"),
+    TMP_DIR / "llm_memo",
+    max_entries=int(os.getenv("LLM_MEMO_MAX_ENTRIES", "4096"))
+)
+
+# Prompt/response token counts of every Gemini call made by this process
+token_ledger = TokenLedger()
+
+# MinHash/LSH index of analyzed resume texts. Uploads at or above the
+# Jaccard threshold are reported as near-duplicates and, with
+# NEAR_DUPLICATE_REUSE, reuse the earlier cached analysis for every section
+# whose text is unchanged. A threshold of 0 disables the check.
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+NEAR_DUPLICATE_REUSE = os.getenv("NEAR_DUPLICATE_REUSE", "1") != "0"
+near_duplicate_index = (
+    NearDuplicateIndex(TMP_DIR / "near_duplicates.sqlite", threshold=NEAR_DUPLICATE_THRESHOLD)
+    if NEAR_DUPLICATE_THRESHOLD > 0 else None
+)
+
+# Analyses taking at least PROFILE_SLOW_SECONDS get a sampled stack profile in TMP_DIR/profiles; 0 disables
+slow_request_profiler = SlowRequestProfiler(float(os.getenv("PROFILE_SLOW_SECONDS", "0")), TMP_DIR / "profiles")
+
+# Section and overview results with fewer words than this are escalated to the next model tier
+CASCADE_MIN_WORDS = int(os.getenv("CASCADE_MIN_WORDS", "8"))
+
+def log_escalation(tier: ModelTier, reason: str):
+    telemetry.count("model_escalations", help="LLM calls re-run on a stronger model", tier=tier.model, reason=reason)
+    log_info(f"Escalating a {tier.model} result to the next model tier: {reason}")
+
+model_cascade = ModelCascade(MODEL_TIERS, on_escalate=log_escalation)
+telemetry.metrics.add_collector("model_cascade", model_cascade.stats)
+
+def fit_prompt(
+    build: Callable[[str], str],
+    text: str,
+    segments: Optional[DocumentSegments] = None
+) -> Tuple[str, int]:
+    """Build a prompt around `text`, compacting the text to fit CALL_TOKEN_BUDGET.
+
+    Returns the prompt and the token count it would have had uncompacted.
+    """
+    prompt = build(text)
+    original_tokens = count_tokens(prompt)
+    if original_tokens <= CALL_TOKEN_BUDGET:
+        return prompt, original_tokens
+    text_budget = max(0, CALL_TOKEN_BUDGET - count_tokens(build("")))
+    prompt = build(compact_text(text, text_budget, segments))
+    return prompt, original_tokens
+
+def stream_response(response, on_partial: Callable[[Any], None]):
+    """Consume a streamed Gemini response, passing on_partial each new best-effort parse of its JSON"""
+    parser = JSONStreamParser()
+    last = None
+    for chunk in response:
+        parser.feed(chunk.text)
+        value = parser.values[0] if parser.values else parser.partial()
+        if value is not None and value != last:
+            on_partial(value)
+            last = value
+    return response
+
+def generate(
+    prompt: str,
+    timeout: Optional[float] = None,
+    label: str = "llm",
+    original_tokens: Optional[int] = None,
+    hedge_after: Optional[float] = None,
+    on_partial: Optional[Callable[[Any], None]] = None,
+    model_name: Optional[str] = None
+):
+    """Call Gemini through `call_scheduler`, applying a per-call timeout when one is given, and record its token usage.
+
+    With `on_partial`, the response is streamed and partially parsed as it arrives.
+    `model_name` picks a model tier, MODEL_NAME by default. The call is recorded
+    as an "llm_call" span with its token counts and retries, and its cost is
+    added to the tier's in `model_cascade`.
+    """
+    model_name = model_name or MODEL_NAME
+    model = models[model_name]
+    options = {"request_options": {"timeout": timeout}} if timeout else {}
+    if on_partial is not None:
+        # Not hedged: two racing streams would interleave their partial results
+        request = lambda: stream_response(model.generate_content(prompt, stream=True, **options), on_partial)
+        hedge_after = None
+    else:
+        request = lambda: model.generate_content(prompt, **options)
+
+    with telemetry.span("llm_call", label=label, model=model_name) as span:
+        def on_retry(attempt: int, error: Exception):
+            span.set(retries=attempt, last_error=type(error).__name__)
+            telemetry.count("llm_retries", help="Retried LLM call attempts", label=label)
+
+        response = call_scheduler.call("gemini", request, hedge_after=hedge_after, on_retry=on_retry)
+
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or count_tokens(prompt)
+        response_tokens = getattr(usage, "candidates_token_count", None) or count_tokens(response.text)
+        span.set(prompt_tokens=prompt_tokens, response_tokens=response_tokens)
+    token_ledger.record(label, prompt_tokens, response_tokens, original_tokens)
+    model_cascade.record_tokens(model_name, prompt_tokens, response_tokens)
+    telemetry.observe("llm_prompt_tokens", prompt_tokens, TOKEN_BUCKETS, "Prompt tokens per LLM call", label=label)
+    telemetry.observe("llm_response_tokens", response_tokens, TOKEN_BUCKETS, "Response tokens per LLM call", label=label)
+    log_info(f"LLM call {label} on {model_name}: {prompt_tokens} prompt tokens, {response_tokens} response tokens")
+    return response
+
+def parse_result(text: str, validator: Callable[[Any], Dict[str, Any]], kind: str) -> Dict[str, Any]:
+    """Extract and validate the JSON of a response, timed as a "response_parse" span"""
+    with telemetry.span("response_parse", kind=kind):
+        return validator(extract_json(text))
+
+class MemoryViewReader(io.RawIOBase):
+    """Seekable read-only file over a memoryview, without copying the buffer up front"""
+
+    def __init__(self, view: memoryview):
+        self._view = view.cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(len(self._view), self._pos + size)
+        data = self._view[self._pos:end].tobytes()
+        self._pos = max(self._pos, end)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+@contextmanager
+def open_pdf(source: Union[str, Path, bytes, bytearray, memoryview]):
+    """Yield a binary file object over a PDF path or in-memory PDF bytes.
+
+    In-memory PDFs are read in place; only those above PDF_SPILL_BYTES are
+    written to an anonymous (and therefore collision-free) temp file.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as pdf_file:
+            yield pdf_file
+    elif len(source) > PDF_SPILL_BYTES:
+        with tempfile.TemporaryFile(dir=TMP_DIR, prefix="resume-", suffix=".pdf") as pdf_file:
+            pdf_file.write(source)
+            pdf_file.seek(0)
+            yield pdf_file
+    elif isinstance(source, memoryview):
+        yield MemoryViewReader(source)
+    else:
+        # BytesIO shares the bytes object's buffer until it is written to
+        yield io.BytesIO(source)
+
+def iter_pdf_pages(
+    source: Union[str, Path, bytes, bytearray, memoryview],
+    preset: Optional[str] = None
+) -> Iterator[PageLayout]:
+    """Yield the text and line styles of each page of a PDF, in order, as pages are parsed.
+
+    In-memory PDFs are split across the pdf_extraction process pool so that
+    callers can start on early pages before the last one is parsed.
+    """
+    preset = preset or PDF_LAYOUT_PRESET
+    if isinstance(source, (bytes, bytearray)) and len(source) <= PDF_SPILL_BYTES:
+        yield from iter_page_layouts(bytes(source), preset)
+        return
+    with open_pdf(source) as pdf_file:
+        yield from iter_file_page_layouts(pdf_file, preset)
+
+def extract_layout_from_pdf(
+    source: Union[str, Path, bytes, bytearray, memoryview],
+    preset: Optional[str] = None,
+    on_pages: Optional[Callable[[List[PageLayout]], None]] = None
+) -> PageLayout:
+    """Extract text and line styles from a PDF path or in-memory PDF bytes.
+
+    `on_pages` is called with the pages parsed so far after each page, so
+    callers can start on the first pages before the last one is parsed.
+    """
+    try:
+        with telemetry.span("pdf_extraction", preset=preset or PDF_LAYOUT_PRESET) as span:
+            pages: List[PageLayout] = []
+            for page in iter_pdf_pages(source, preset):
+                pages.append(page)
+                if on_pages is not None:
+                    on_pages(pages)
+            layout = join_pages(pages)
+            span.set(characters=len(layout.text))
+        log_info(f"Extracted text from PDF: {len(layout.text)} characters") #Added logging for extracted text length.
+        return layout
+    except Exception as e:
+        log_error(f"PDF extraction error: {str(e)}")
+        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+def extract_text_from_pdf(
+    source: Union[str, Path, bytes, bytearray, memoryview],
+    preset: Optional[str] = None
+) -> str:
+    """Extract text from a PDF path or in-memory PDF bytes"""
+    return extract_layout_from_pdf(source, preset).text
+
+def too_short(text: str) -> bool:
+    return len(text.split()) < CASCADE_MIN_WORDS
+
+def section_issue(result: Dict[str, Any]) -> Optional[str]:
+    """Why a valid section result should be re-run on a stronger model, or None to keep it"""
+    if too_short(result["content"]):
+        return "short_content"
+    if not result["suggestions"]:
+        return "no_suggestions"
+    return None
+
+def overview_issue(result: Dict[str, Any]) -> Optional[str]:
+    """Why a valid overview should be re-run on a stronger model, or None to keep it"""
+    if too_short(result["overview"]):
+        return "short_content"
+    if not result["strengths"] or not result["weaknesses"]:
+        return "missing_lists"
+    return None
+
+def analyze_resume_section(text: str, section_name: str, timeout: Optional[float] = None) -> dict:
+    """Analyze a specific section of the resume using Gemini.
+
+    The section goes through `model_cascade`: invalid responses (bad JSON,
+    scores outside 0..100) and short ones are re-run on the next model tier.
+    """
+    log_progress(f"Analyzing {section_name}...", stage="section_started", section=section_name)
+
+    def request_section() -> dict:
+        prompt, original_tokens = fit_prompt(
+            lambda section_text: SECTION_PROMPT.format(section_name=section_name, text=section_text), text
+        )
+
+        def request(tier: ModelTier) -> dict:
+            response = generate(
+                prompt, timeout, label=section_name, original_tokens=original_tokens, hedge_after=HEDGE_AFTER,
+                model_name=tier.model
+            )
+            return parse_result(response.text, validate_section_result, "section")
+
+        return model_cascade.run(request, section_issue)
+
     try:
-        response = model.generate_content(prompt)
-        result = extract_json_response(response.text)
-        validate_section_result(result)
+        if section_memo is not None:
+            result = section_memo.get_or_call(
+                SECTION_PROMPT, text, model_cascade.key, None, request_section, section_name=section_name
+            )
+        else:
+            result = request_section()
         log_info(f"Analysis of {section_name} complete. Score: {result['score']}, Content: {result['content'][:100]}...") #Added logging for section analysis results
         return result
     except Exception as e:
         log_error(f"Error analyzing section {section_name}: {str(e)}")
+        # Flagged as failed so it is left out of the overall score
         return {
             "score": 0,
             "content": f"Analysis failed: {str(e)}",
-            "suggestions": ["Error during analysis"]
+            "suggestions": ["Error during analysis"],
+            "failed": True
+        }
+
+def analyze_overview(
+    full_text: str,
+    timeout: Optional[float] = None,
+    segments: Optional[DocumentSegments] = None,
+    on_event: Optional["EventCallback"] = None
+) -> Dict[str, Any]:
+    """Analyze the overall profile of the resume.
+
+    With `on_event`, the response is streamed and "overview_partial" events
+    carry the fields parsed so far. Like sections, the overview goes through
+    `model_cascade`; an escalated overview is streamed again.
+    """
+    prompt, original_tokens = fit_prompt(lambda text: f"{OVERVIEW_PROMPT}\n\nResume text:\n{text}", full_text, segments)
+    on_partial = None
+    if on_event is not None:
+        on_partial = lambda partial: (
+            emit_event(on_event, "overview_partial", **overview_fields(partial)) if isinstance(partial, dict) else None
+        )
+
+    def request_overview(tier: ModelTier) -> Dict[str, Any]:
+        response = generate(
+            prompt, timeout, label="overview", original_tokens=original_tokens, on_partial=on_partial, model_name=tier.model
+        )
+        return parse_result(response.text, validate_overview_result, "overview")
+
+    overview_analysis = model_cascade.run(request_overview, overview_issue)
+    log_info(f"Overall profile analysis complete. Overview: {overview_analysis.get('overview', '')[:100]}...") #Added logging for overall analysis
+    return overview_analysis
+
+# Receives incremental "overview_partial", "overview" and "section" events while an analysis runs
+EventCallback = Callable[[Dict[str, Any]], None]
+
+def emit_event(on_event: Optional[EventCallback], event_type: str, **payload):
+    """Deliver an incremental result event, if anyone is listening"""
+    if on_event is not None:
+        on_event({"type": event_type, **payload})
+
+def overview_fields(overview_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "overview": overview_analysis.get("overview", ""),
+        "strengths": overview_analysis.get("strengths", []),
+        "weaknesses": overview_analysis.get("weaknesses", [])
+    }
+
+def analyze_sections_sequentially(
+    segments: DocumentSegments,
+    timeout: Optional[float] = CALL_TIMEOUT,
+    on_event: Optional[EventCallback] = None,
+    overview_future: Optional[Future] = None
+) -> tuple:
+    """Run the overview and then each section request one after another.
+
+    An `overview_future` already started on the first pages (see
+    OVERVIEW_EARLY_PAGES) is awaited instead of requesting the overview.
+    """
+    if overview_future is None:
+        log_progress("Starting overall profile analysis...", stage="overview")
+        overview_analysis = analyze_overview(segments.text, timeout, segments, on_event)
+    else:
+        overview_analysis = overview_future.result()
+    emit_event(on_event, "overview", **overview_fields(overview_analysis))
+
+    log_progress("Starting section-by-section analysis...", stage="sections", total=len(SECTIONS))
+    section_results = []
+    total_sections = len(SECTIONS)
+    for index, section in enumerate(SECTIONS, 1):
+        log_progress(f"Analyzing section {index}/{total_sections}: {section}", stage="section_queued", section=section, index=index, total=total_sections)
+        section_analysis = analyze_resume_section(segments.section_text(section), section, timeout)
+        section_results.append({
+            "name": section,
+            **section_analysis
+        })
+        log_progress(f"Completed {section} analysis with score: {section_analysis['score']}",
+                     stage="section_done", section=section, score=section_analysis["score"], completed=index, total=total_sections)
+        emit_event(on_event, "section", index=index - 1, section=section_results[-1])
+
+    return overview_analysis, section_results
+
+def analyze_sections_concurrently(
+    segments: DocumentSegments,
+    max_concurrency: int = MAX_CONCURRENCY,
+    timeout: Optional[float] = CALL_TIMEOUT,
+    on_event: Optional[EventCallback] = None,
+    overview_future: Optional[Future] = None
+) -> tuple:
+    """Run the overview and every section request on a bounded thread pool.
+
+    Sections are reported as they complete but returned in SECTIONS order.
+    An `overview_future` already started on the first pages replaces the
+    overview request.
+    """
+    log_progress(f"Starting concurrent analysis of overview and {len(SECTIONS)} sections...", stage="sections", total=len(SECTIONS))
+    section_results: List[Optional[dict]] = [None] * len(SECTIONS)
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        # Spans recorded on the pool threads belong to this request's trace
+        if overview_future is None:
+            overview_future = executor.submit(propagate_context(analyze_overview), segments.text, timeout, segments, on_event)
+        analyze_section = propagate_context(analyze_resume_section)
+        futures = {
+            executor.submit(analyze_section, segments.section_text(section), section, timeout): index
+            for index, section in enumerate(SECTIONS)
+        }
+        completed = 0
+        for future in as_completed([overview_future, *futures]):
+            if future is overview_future:
+                overview_analysis = future.result()
+                emit_event(on_event, "overview", **overview_fields(overview_analysis))
+                continue
+            index = futures[future]
+            completed += 1
+            section_results[index] = {"name": SECTIONS[index], **future.result()}
+            log_progress(f"Completed {SECTIONS[index]} analysis with score: {section_results[index]['score']} ({completed}/{len(SECTIONS)})",
+                         stage="section_done", section=SECTIONS[index], score=section_results[index]["score"], completed=completed, total=len(SECTIONS))
+            emit_event(on_event, "section", index=index, section=section_results[index])
+
+    return overview_analysis, section_results
+
+def analyze_sections_batched(
+    segments: DocumentSegments,
+    timeout: Optional[float] = CALL_TIMEOUT,
+    on_event: Optional[EventCallback] = None
+) -> tuple:
+    """Analyze the overview and all sections with a single structured prompt.
+
+    Each section of the batched response is validated on its own; only the
+    sections that fail validation or look low-confidence (`section_issue`)
+    are re-requested individually, through the model cascade.
+    """
+    log_progress(f"Starting batched analysis of overview and {len(SECTIONS)} sections...", stage="sections", total=len(SECTIONS))
+    try:
+        prompt, original_tokens = fit_prompt(
+            lambda text: BATCH_PROMPT.format(section_names=", ".join(SECTIONS), text=text), segments.text, segments
+        )
+        response = generate(prompt, timeout, label="batch", original_tokens=original_tokens)
+        with telemetry.span("response_parse", kind="batch"):
+            document = extract_json(response.text)
+    except Exception as e:
+        log_error(f"Batched analysis failed, falling back to individual requests: {str(e)}")
+        document = {}
+
+    try:
+        if "overview" not in document:
+            raise ValueError("Overview missing from batched response")
+        overview_analysis = validate_overview_result(document)
+    except ValueError:
+        log_progress("Re-requesting overall profile analysis...", stage="retry", section="overview")
+        overview_analysis = analyze_overview(segments.text, timeout, segments, on_event)
+    emit_event(on_event, "overview", **overview_fields(overview_analysis))
+
+    batch_sections = document.get("sections")
+    if not isinstance(batch_sections, dict):
+        batch_sections = {}
+
+    section_results = []
+    for index, section in enumerate(SECTIONS):
+        section_analysis = batch_sections.get(section)
+        try:
+            if not isinstance(section_analysis, dict):
+                raise ValueError("Section missing from batched response")
+            section_analysis = validate_section_result(section_analysis)
+            issue = section_issue(section_analysis)
+            if issue is not None:
+                raise ValueError(f"Low-confidence section in batched response: {issue}")
+        except ValueError as e:
+            log_progress(f"Re-requesting {section} analysis ({str(e)})", stage="retry", section=section, reason=str(e))
+            section_analysis = analyze_resume_section(segments.section_text(section), section, timeout)
+        section_results.append({
+            "name": section,
+            **section_analysis
+        })
+        log_progress(f"Completed {section} analysis with score: {section_analysis['score']}",
+                     stage="section_done", section=section, score=section_analysis["score"], completed=index + 1, total=len(SECTIONS))
+        emit_event(on_event, "section", index=index, section=section_results[-1])
+
+    return overview_analysis, section_results
+
+def section_failed(section: Dict[str, Any]) -> bool:
+    """True if the section fell back to the "Analysis failed" placeholder"""
+    return section.get("failed", False) or section["content"].startswith("Analysis failed:")
+
+def analyze_changed_sections(
+    segments: DocumentSegments,
+    prior_results: Dict[str, Any],
+    changed: List[str],
+    max_concurrency: int = 1,
+    timeout: Optional[float] = None,
+    on_event: Optional[EventCallback] = None,
+    overview_future: Optional[Future] = None
+) -> tuple:
+    """Reuse a near-duplicate's unchanged sections; analyze only the `changed` sections.
+
+    The overview describes the whole resume, so it is re-analyzed whenever
+    any section changed and only reused when none did; an `overview_future`
+    already started on the first pages replaces the overview request.
+    """
+    log_progress(f"Reusing earlier analysis, re-analyzing {len(changed)} changed sections...", stage="sections", total=len(changed), reused=len(SECTIONS) - len(changed))
+    if not changed:
+        overview_analysis = overview_fields(prior_results)
+        emit_event(on_event, "overview", **overview_analysis)
+
+    prior_sections = {section["name"]: section for section in prior_results["sections"]}
+    section_results: List[Optional[dict]] = [None] * len(SECTIONS)
+    for index, section in enumerate(SECTIONS):
+        if section not in changed:
+            section_results[index] = prior_sections[section]
+            emit_event(on_event, "section", index=index, section=section_results[index])
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        if not changed:
+            overview_future = None
+        elif overview_future is None:
+            overview_future = executor.submit(propagate_context(analyze_overview), segments.text, timeout, segments, on_event)
+        analyze_section = propagate_context(analyze_resume_section)
+        futures = {
+            executor.submit(analyze_section, segments.section_text(section), section, timeout): SECTIONS.index(section)
+            for section in changed
         }
+        for future in as_completed([future for future in (overview_future, *futures) if future is not None]):
+            if future is overview_future:
+                overview_analysis = future.result()
+                emit_event(on_event, "overview", **overview_fields(overview_analysis))
+                continue
+            index = futures[future]
+            section_results[index] = {"name": SECTIONS[index], **future.result()}
+            log_progress(f"Completed {SECTIONS[index]} analysis with score: {section_results[index]['score']}",
+                         stage="section_done", section=SECTIONS[index], score=section_results[index]["score"])
+            emit_event(on_event, "section", index=index, section=section_results[index])
+
+    return overview_analysis, section_results
+
+class RunningScore:
+    """Overall score maintained incrementally as section scores arrive.
+
+    Failed sections are skipped rather than counted as 0.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self, section: Dict[str, Any]) -> int:
+        with self._lock:
+            if not section_failed(section):
+                self.total += section["score"]
+                self.count += 1
+            return self.value
+
+    @property
+    def value(self) -> int:
+        return round(self.total / self.count) if self.count else 0
+
+def build_results(overview_analysis: Dict[str, Any], section_results: List[dict]) -> Dict[str, Any]:
+    """Assemble the final results dict returned to the caller"""
+    # Calculate overall score
+    overall_score = RunningScore()
+    for section in section_results:
+        overall_score.add(section)
+
+    return {
+        **overview_fields(overview_analysis),
+        "sections": section_results,
+        "overallScore": overall_score.value
+    }
+
+def has_failed_sections(results: Dict[str, Any]) -> bool:
+    return any(section_failed(section) for section in results["sections"])
+
+def analyze_resume(
+    file_bytes: Union[bytes, memoryview],
+    filename: str,
+    mode: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    use_cache: Optional[bool] = None,
+    on_event: Optional[EventCallback] = None,
+    layout: Optional[PageLayout] = None
+) -> Dict[str, Any]:
+    """Process and analyze a resume with improved error handling.
+
+    `mode` selects how the LLM calls are executed ("sequential",
+    "concurrent" or "batched"); it defaults to the ANALYSIS_MODE environment
+    setting. Results for a previously analyzed PDF are served from
+    `analysis_cache` unless `use_cache` is False.
+
+    `on_event` receives an "overview" event and one "section" event per
+    section as soon as each is available; section events carry the running
+    `overallScore` of the sections completed so far.
+
+    A new PDF whose text is a near-duplicate of a cached analysis reuses that
+    analysis for its unchanged sections (see `near_duplicate_index`); the
+    overview is analyzed again unless no section changed.
+
+    Callers that already extracted the PDF pass its `layout` so that it is
+    not parsed a second time.
+
+    The whole analysis is recorded as an "analysis" span; analyses slower than
+    PROFILE_SLOW_SECONDS leave a sampled stack profile (`slow_request_profiler`).
+    """
+    mode = mode or ANALYSIS_MODE
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unsupported analysis mode: {mode}")
+    profile: Dict[str, Any] = {}
+    try:
+        with slow_request_profiler.profile(f"analysis-{filename}") as profile, telemetry.span("analysis", mode=mode):
+            return run_analysis(file_bytes, filename, mode, max_concurrency, timeout, use_cache, on_event, layout)
+    finally:
+        if "path" in profile:
+            log_info(f"Slow analysis of {filename} ({profile['seconds']:.1f}s) profiled to {profile['path']}")
+
+def run_analysis(
+    file_bytes: Union[bytes, memoryview],
+    filename: str,
+    mode: str,
+    max_concurrency: Optional[int],
+    timeout: Optional[float],
+    use_cache: Optional[bool],
+    on_event: Optional[EventCallback],
+    layout: Optional[PageLayout] = None
+) -> Dict[str, Any]:
+    """The body of `analyze_resume`, for a validated `mode`"""
+    log_progress("Starting resume analysis...", stage="start", mode=mode)
+
+    use_cache = CACHE_ENABLED if use_cache is None else use_cache
+    cache_key = AnalysisCache.make_key(file_bytes, model_cascade.key, PROMPT_VERSION)
+    if use_cache:
+        cached_results = analysis_cache.get(cache_key)
+        if cached_results is not None:
+            log_progress("Analysis complete! (served from cache)", stage="complete", cached=True)
+            if on_event is not None:
+                emit_event(on_event, "overview", **overview_fields(cached_results))
+                running_score = RunningScore()
+                for index, section in enumerate(cached_results["sections"]):
+                    emit_event(on_event, "section", index=index, section=section, overallScore=running_score.add(section))
+            return cached_results
+
+    forward_event = None
+    if on_event is not None:
+        running_score = RunningScore()
+
+        def forward_event(event: Dict[str, Any]):
+            if event["type"] == "section":
+                event["overallScore"] = running_score.add(event["section"])
+            on_event(event)
 
-def analyze_resume(file_bytes: bytes, filename: str) -> Dict[str, Any]:
-    """Process and analyze a resume with improved error handling."""
-    log_progress("Starting resume analysis...")
+    # Overview started on the first OVERVIEW_EARLY_PAGES pages while the rest are extracted;
+    # the batched mode analyzes everything in one call and waits for the whole document
+    overview_future: Optional[Future] = None
+    overview_pool = ThreadPoolExecutor(max_workers=1)
 
-    temp_file_path = os.path.join(TMP_DIR, filename)
-    with open(temp_file_path, "wb") as temp_file:
-        temp_file.write(file_bytes)
+    def start_overview(pages: List[PageLayout]):
+        nonlocal overview_future
+        if len(pages) == OVERVIEW_EARLY_PAGES:
+            head = join_pages(pages)
+            log_progress(f"Starting overall profile analysis on the first {len(pages)} pages...", stage="overview")
+            overview_future = overview_pool.submit(
+                propagate_context(analyze_overview), head.text, timeout or CALL_TIMEOUT,
+                segment_document(head.text, head.lines), forward_event
+            )
 
     try:
         # Extract text from PDF
-        log_progress("Extracting content from PDF...")
-        full_text = extract_text_from_pdf(temp_file_path)
-        log_progress(f"Extracted {len(full_text)} characters from PDF")
+        if layout is None:
+            log_progress(f"Extracting content from {filename}...", stage="extraction")
+            early_overview = OVERVIEW_EARLY_PAGES > 0 and mode != "batched"
+            layout = extract_layout_from_pdf(file_bytes, on_pages=start_overview if early_overview else None)
+        log_progress(f"Extracted {len(layout.text)} characters from PDF", stage="extracted", characters=len(layout.text))
 
-        # Analyze overall profile
-        log_progress("Starting overall profile analysis...")
-        overview_prompt = """Analyze this resume and provide a comprehensive evaluation.
-        Focus on specific, actionable insights. Output a JSON with:
-        {
-            "overview": <2-3 sentence professional overview>,
-            "strengths": [<3 specific resume strengths>],
-            "weaknesses": [<3 specific areas for improvement>]
-        }"""
-        overview_response = model.generate_content(f"{overview_prompt}\n\nResume text:\n{full_text}")
-        overview_analysis = extract_json_response(overview_response.text)
-        log_info(f"Overall profile analysis complete. Overview: {overview_analysis.get('overview', '')[:100]}...") #Added logging for overall analysis
-
-
-        # Define sections to analyze
-        sections = [
-            "Professional Summary",
-            "Work Experience",
-            "Skills",
-            "Education",
-            "Projects",
-            "Languages",
-            "Certifications"
-        ]
-
-        # Analyze each section
-        log_progress("Starting section-by-section analysis...")
-        section_results = []
-        total_sections = len(sections)
-        for index, section in enumerate(sections, 1):
-            log_progress(f"Analyzing section {index}/{total_sections}: {section}")
-            section_analysis = analyze_resume_section(full_text, section)
-            section_results.append({
-                "name": section,
-                **section_analysis
-            })
-            log_progress(f"Completed {section} analysis with score: {section_analysis['score']}")
-
-        # Calculate overall score
-        overall_score = sum(section["score"] for section in section_results) / len(section_results) if section_results else 0
+        # Locate section headings once so each section prompt only gets its own span
+        segments = segment_document(layout.text, layout.lines)
+        log_info(f"Detected sections: {', '.join(segments.spans) or 'none'}")
+
+        near_duplicate = prior_results = None
+        if near_duplicate_index is not None:
+            signature = near_duplicate_index.signature(layout.text)
+            digests = {section: section_digest(segments.section_text(section)) for section in SECTIONS}
+            # Only analyses made with the same prompts and model tiers can be reused
+            analysis_version = f"{PROMPT_VERSION}:{model_cascade.key}"
+            matches = near_duplicate_index.query(signature, exclude=cache_key, version=analysis_version)
+            if matches:
+                near_duplicate = matches[0]
+                log_progress(f"Near-duplicate of an earlier resume (similarity {near_duplicate.similarity:.2f})",
+                             stage="near_duplicate", similarity=round(near_duplicate.similarity, 3))
+                if use_cache and NEAR_DUPLICATE_REUSE:
+                    prior_results = analysis_cache.get(near_duplicate.key)
+
+        if prior_results is not None:
+            prior_failed = {section["name"] for section in prior_results["sections"] if section_failed(section)}
+            changed = [
+                section for section in SECTIONS
+                if section in prior_failed or near_duplicate.section_digests.get(section) != digests[section]
+            ]
+            overview_analysis, section_results = analyze_changed_sections(
+                segments,
+                prior_results,
+                changed,
+                (max_concurrency or MAX_CONCURRENCY) if mode == "concurrent" else 1,
+                timeout or CALL_TIMEOUT,
+                forward_event,
+                overview_future
+            )
+        elif mode == "concurrent":
+            overview_analysis, section_results = analyze_sections_concurrently(
+                segments,
+                max_concurrency or MAX_CONCURRENCY,
+                timeout or CALL_TIMEOUT,
+                forward_event,
+                overview_future
+            )
+        elif mode == "batched":
+            overview_analysis, section_results = analyze_sections_batched(segments, timeout or CALL_TIMEOUT, forward_event)
+        else:
+            overview_analysis, section_results = analyze_sections_sequentially(
+                segments, timeout or CALL_TIMEOUT, forward_event, overview_future
+            )
 
         # Prepare final results
-        results = {
-            "overview": overview_analysis.get("overview", ""),
-            "strengths": overview_analysis.get("strengths", []),
-            "weaknesses": overview_analysis.get("weaknesses", []),
-            "sections": section_results,
-            "overallScore": round(overall_score)
-        }
+        results = build_results(overview_analysis, section_results)
+        if near_duplicate is not None:
+            results["nearDuplicate"] = {
+                "of": near_duplicate.key,
+                "similarity": round(near_duplicate.similarity, 3),
+                "reusedSections": [section for section in SECTIONS if prior_results is not None and section not in changed]
+            }
+        if use_cache and not has_failed_sections(results):
+            analysis_cache.put(cache_key, results)
+            if near_duplicate_index is not None:
+                near_duplicate_index.add(cache_key, signature, digests, version=analysis_version)
 
-        log_progress("Analysis complete!")
-        print(json.dumps(results))  # Print results to stdout
+        log_progress("Analysis complete!", stage="complete", cached=False)
         return results
 
     except Exception as e:
         log_error(f"Error during analysis: {str(e)}")
         raise
     finally:
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+        overview_pool.shutdown(wait=False)
+
+class SectionAnalysis(BaseModel):
+    score: int = Field(ge=0, le=100)
+    content: str
+    suggestions: List[str]
 
-def extract_json_response(text: str) -> Dict[str, Any]:
-    """Extract JSON from response text"""
+    @field_validator("score", mode="before")
+    @classmethod
+    def truncate_score(cls, score):
+        # Models sometimes answer 82.5; int("82") and 82 pass through unchanged
+        return int(score) if isinstance(score, float) else score
+
+class OverviewAnalysis(BaseModel):
+    overview: str = ""
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+
+def validated(data: Any, model: type) -> Dict[str, Any]:
+    """Validate parsed response data against a model, raising a one-line ValueError"""
     try:
-        return json.loads(text)
-    except:
-        # Try to find JSON in the text
-        start = text.find('{')
-        end = text.rfind('}') + 1
-        if start >= 0 and end > start:
-            return json.loads(text[start:end])
-        raise ValueError("No valid JSON found in response")
-
-def validate_section_result(result: Dict[str, Any]):
-    """Validate section analysis result"""
-    required_fields = ["score", "content", "suggestions"]
-    if not all(field in result for field in required_fields):
-        raise ValueError("Missing required fields in section response")
+        return validate(data, model).model_dump()
+    except ValidationError as e:
+        error = e.errors()[0]
+        location = ".".join(str(part) for part in error["loc"]) or "response"
+        raise ValueError(f"Invalid {location} in response: {error['msg']}")
+
+def validate_section_result(result: Any) -> Dict[str, Any]:
+    """Validate a section analysis, returning it with the score as an int in 0..100"""
+    return validated(result, SectionAnalysis)
+
+def validate_overview_result(result: Any) -> Dict[str, Any]:
+    """Validate an overview analysis, defaulting missing fields"""
+    return validated(result, OverviewAnalysis)
 
+def read_request(reader) -> Optional[Dict[str, Any]]:
+    """Read one framed request from a binary stream.
+
+    A frame is a JSON header line, optionally followed by `size` raw PDF
+    bytes. Headers may instead carry the PDF base64-encoded in `file_bytes`,
+    or name a `command` that takes no payload. Returns None at end of stream.
+    """
+    header_line = reader.readline()
+    while header_line and not header_line.strip():
+        header_line = reader.readline()
+    if not header_line:
+        return None
+    request = json.loads(header_line)
+    if "command" in request:
+        return request
+    if "size" in request:
+        file_bytes = reader.read(request["size"])
+        if len(file_bytes) != request["size"]:
+            raise ValueError("Truncated request: PDF payload shorter than declared size")
+        request["file_bytes"] = file_bytes
+    else:
+        request["file_bytes"] = base64.b64decode(request["file_bytes"])
+    return request
+
+def serve_requests(reader, writer):
+    """Serve framed analysis requests until the stream closes.
+
+    Every request produces a stream of newline-delimited JSON events tagged
+    with the request id: "progress" events (see `log_progress`) and incremental "overview_partial",
+    "overview" and "section" results, followed by one "result" or "error" event. The "result"
+    event also carries `timings`, the seconds spent per span (pdf_extraction, llm_call,
+    response_parse, analysis). The "cache_stats" command replies with a single "cache_stats"
+    event; the "metrics" command with a "metrics" event holding the Prometheus text exposition.
+    """
+    global progress_listener
+    write_lock = threading.Lock()
+
+    def send_event(event: Dict[str, Any]):
+        with write_lock:
+            writer.write(json.dumps(event).encode() + b"\n")
+            writer.flush()
+
+    while True:
+        try:
+            request = read_request(reader)
+        except Exception as e:
+            log_error(f"Invalid worker request: {str(e)}")
+            send_event({"id": None, "type": "error", "error": f"Invalid request: {str(e)}"})
+            return
+        if request is None:
+            return
+
+        request_id = request.get("id")
+        if request.get("command") == "cache_stats":
+            stats = analysis_cache.stats()
+            if section_memo is not None:
+                stats["section_memo"] = section_memo.stats()
+            stats["tokens"] = token_ledger.summary()
+            stats["calls"] = call_scheduler.stats()
+            stats["cascade"] = model_cascade.stats()
+            stats["telemetry"] = telemetry.metrics.snapshot()
+            send_event({"id": request_id, "type": "cache_stats", "stats": stats})
+            continue
+        if request.get("command") == "metrics":
+            send_event({"id": request_id, "type": "metrics", "text": telemetry.metrics.render()})
+            continue
+        if "command" in request:
+            send_event({"id": request_id, "type": "error", "error": f"Unknown command: {request['command']}"})
+            continue
+
+        progress_listener = lambda event: send_event({"id": request_id, **event})
+        try:
+            with telemetry.trace() as trace:
+                results = analyze_resume(
+                    request["file_bytes"],
+                    request["filename"],
+                    mode=request.get("mode"),
+                    max_concurrency=request.get("max_concurrency"),
+                    timeout=request.get("timeout"),
+                    use_cache=request.get("use_cache"),
+                    on_event=lambda event: send_event({"id": request_id, **event})
+                )
+            send_event({"id": request_id, "type": "result", "results": results, "timings": trace.totals()})
+        except Exception as e:
+            log_error(f"Error during analysis: {str(e)}")
+            send_event({"id": request_id, "type": "error", "error": str(e)})
+        finally:
+            progress_listener = None
+
+def serve_socket(socket_path: str, workers: int):
+    """Serve requests on a Unix socket from a pool of pre-forked workers.
+
+    Each worker process inherits the already-imported and configured module
+    and accepts connections one at a time.
+    """
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(max(16, workers * 4))
+    log_info(f"Analysis worker pool listening on {socket_path} with {workers} workers")
+
+    children = []
+    for _ in range(max(1, workers)):
+        pid = os.fork()
+        if pid == 0:
+            while True:
+                conn, _ = server.accept()
+                with conn, conn.makefile("rb") as reader, conn.makefile("wb") as writer:
+                    try:
+                        serve_requests(reader, writer)
+                    except (BrokenPipeError, ConnectionResetError):
+                        log_info("Worker client disconnected")
+        children.append(pid)
+
+    server.close()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     try:
-        score = int(result["score"])
-        if not 0 <= score <= 100:
-            raise ValueError(f"Score must be between 0 and 100, got {score}")
-        result["score"] = score
-    except (ValueError, TypeError):
-        raise ValueError(f"Invalid score value: {result.get('score')}")
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
 
-if __name__ == "__main__":
+def run_once():
+    """One-shot mode: read a single JSON request from stdin, print results to stdout.
+
+    With "stream": true, incremental events are printed as NDJSON lines and
+    the final line is a "result" event (with span `timings`) instead of the
+    bare results object. Progress events go to stderr as JSON lines.
+    """
     try:
         # Read input from Node.js
         input_data = json.loads(sys.stdin.read())
         file_bytes = base64.b64decode(input_data["file_bytes"])
         filename = input_data["filename"]
+        stream = bool(input_data.get("stream"))
+
+        def print_event(event: Dict[str, Any]):
+            print(json.dumps(event), flush=True)
 
         # Analyze the resume
-        analyze_resume(file_bytes, filename)
+        with telemetry.trace() as trace:
+            results = analyze_resume(
+                file_bytes,
+                filename,
+                mode=input_data.get("mode"),
+                max_concurrency=input_data.get("max_concurrency"),
+                timeout=input_data.get("timeout"),
+                use_cache=input_data.get("use_cache"),
+                on_event=print_event if stream else None
+            )
+        if stream:
+            print_event({"type": "result", "results": results, "timings": trace.totals()})
+        else:
+            print(json.dumps(results))  # Print results to stdout
         sys.exit(0)
     except Exception as e:
         log_error(f"Error during analysis: {str(e)}")
         print(json.dumps({"error": str(e)}))
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resume analysis service")
+    parser.add_argument("--worker", action="store_true",
+                        help="Stay alive and serve framed requests from stdin instead of a single request")
+    parser.add_argument("--socket", help="Serve framed requests on this Unix socket path")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ANALYSIS_WORKERS", "2")),
+                        help="Number of pre-forked worker processes for --socket")
+    args = parser.parse_args()
+
+    if args.socket:
+        serve_socket(args.socket, args.workers)
+    elif args.worker:
+        serve_requests(sys.stdin.buffer, sys.stdout.buffer)
+    else:
+        run_once()
@@ -7,6 +7,7 @@ import type { Request } from "express";
 import nodemailer from "nodemailer";
 import PDFDocument from "pdfkit";
 import { spawn } from "child_process";
+import { AnalysisWorkerPool, type AnalysisEvent } from "./analysis_worker_pool";
 
 const upload = multer({ 
   storage: multer.memoryStorage(),
@@ -82,7 +83,52 @@ async function generateAnalysisPDF(analysis: any): Promise<Buffer> {
   });
 }
 
+// Number of pre-warmed Python analysis workers; 0 spawns one process per upload
+const ANALYSIS_WORKERS = parseInt(process.env.ANALYSIS_WORKERS ?? "2", 10);
+let workerPool: AnalysisWorkerPool | null = null;
+
+async function reportProgress(analysisId: string, progressMessage: string, partialResults?: any) {
+  try {
+    await storage.updateAnalysis(analysisId, {
+      status: "processing",
+      results: partialResults ?? {
+        overview: progressMessage,
+        strengths: [],
+        weaknesses: [],
+        sections: [],
+        overallScore: 0
+      }
+    });
+  } catch (err) {
+    console.error("Error updating analysis status:", err);
+  }
+}
+
 async function analyzePDF(fileBuffer: Buffer, filename: string, analysisId: string): Promise<any> {
+  if (ANALYSIS_WORKERS > 0) {
+    workerPool ??= new AnalysisWorkerPool(ANALYSIS_WORKERS);
+
+    // Partial results are stored as sections finish, so polling clients see
+    // each section as soon as its LLM call completes
+    const sections: any[] = [];
+    const partial = { overview: "", strengths: [], weaknesses: [], sections: [] as any[], overallScore: 0 };
+    const onEvent = (event: AnalysisEvent) => {
+      if (event.type === "overview") {
+        Object.assign(partial, { overview: event.overview, strengths: event.strengths, weaknesses: event.weaknesses });
+      } else if (event.type === "section") {
+        sections[event.index] = event.section;
+        partial.sections = sections.filter(Boolean);
+        partial.overallScore = event.overallScore;
+      } else if (event.type === "progress" && !partial.overview) {
+        return reportProgress(analysisId, event.message);
+      } else {
+        return;
+      }
+      return reportProgress(analysisId, event.type, { ...partial });
+    };
+    return workerPool.analyze(fileBuffer, filename, onEvent);
+  }
+
   return new Promise((resolve, reject) => {
     const pythonProcess = spawn("python", ["server/resume_service.py"]);
     let resultData = "";
@@ -92,26 +138,25 @@ async function analyzePDF(fileBuffer: Buffer, filename: string, analysisId: stri
       resultData += data.toString();
     });
 
+    // stderr mixes log lines with JSON progress events; split it into lines
+    // first, since a chunk can end mid-line
+    let stderrLine = "";
     pythonProcess.stderr.on("data", async (data) => {
       const message = data.toString();
       errorData += message;
 
-      // Handle progress messages
-      if (message.includes("PROGRESS: ")) {
-        const progressMessage = message.split("PROGRESS: ")[1].trim();
+      const lines = (stderrLine + message).split("\n");
+      stderrLine = lines.pop() ?? "";
+      for (const line of lines) {
+        let event: AnalysisEvent | undefined;
         try {
-          await storage.updateAnalysis(analysisId, {
-            status: "processing",
-            results: {
-              overview: progressMessage,
-              strengths: [],
-              weaknesses: [],
-              sections: [],
-              overallScore: 0
-            }
-          });
-        } catch (err) {
-          console.error("Error updating analysis status:", err);
+          event = JSON.parse(line);
+        } catch {
+          // A log line rather than an event; it is still kept in errorData
+          continue;
+        }
+        if (event?.type === "progress") {
+          await reportProgress(analysisId, event.message);
         }
       }
     });
@@ -0,0 +1,7 @@
+"""Puts the repository root on sys.path so server modules can import the shared/ package"""
+import sys
+from pathlib import Path
+
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
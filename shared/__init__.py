@@ -0,0 +1 @@
+"""Python modules used by both server/ and backend/, imported as `shared.<module>`"""
@@ -0,0 +1,253 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# HTTP statuses worth retrying: request timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+# Exception class name fragments used by the OpenAI and Google SDKs for the same cases
+RETRYABLE_NAMES = (
+    "RateLimit", "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "APIConnectionError",
+)
+RATE_LIMIT_NAMES = ("RateLimit", "ResourceExhausted", "TooManyRequests")
+# Client-side timeouts. A timed-out attempt already used the whole call
+# timeout, so it is not retried: retries would stretch one slow call to
+# timeout x attempts.
+TIMEOUT_NAMES = ("DeadlineExceeded", "Timeout")
+
+def status_code_of(exc: BaseException) -> Optional[int]:
+    """HTTP status carried by an SDK exception (openai .status_code, google-api-core .code)"""
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    value = getattr(getattr(exc, "response", None), "status_code", None)
+    return value if isinstance(value, int) else None
+
+def is_rate_limited(exc: BaseException) -> bool:
+    return status_code_of(exc) == 429 or any(name in type(exc).__name__ for name in RATE_LIMIT_NAMES)
+
+def is_timeout(exc: BaseException) -> bool:
+    return isinstance(exc, TimeoutError) or any(name in type(exc).__name__ for name in TIMEOUT_NAMES)
+
+def is_retryable(exc: BaseException) -> bool:
+    if is_timeout(exc):
+        return False
+    if isinstance(exc, ConnectionError):
+        return True
+    return status_code_of(exc) in RETRYABLE_STATUS or any(name in type(exc).__name__ for name in RETRYABLE_NAMES)
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts to rate-limit responses.
+
+    A 429 halves the rate (down to 1/16 of the configured rate); every
+    success adds back 5% of the configured rate.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.max_rate = rate_per_second
+        self.rate = rate_per_second
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token if one is available; otherwise return the seconds to wait before retrying"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            delay = self.reserve()
+            if not delay:
+                return
+            time.sleep(delay)
+
+    async def aacquire(self):
+        while True:
+            delay = self.reserve()
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    def throttle(self):
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+
+    def recover(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+class CallScheduler:
+    """Shared gate for LLM calls: per-provider rate limiting, retries and hedging.
+
+    Every attempt takes a token from the provider's bucket. Retryable
+    failures (429, 5xx, connection errors) are retried up to `max_retries`
+    times with full-jitter exponential backoff; timeouts are not retried.
+    With `hedge_after`, an attempt still running after that many seconds is
+    raced against a second one and the first success wins.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = 300,
+        burst: float = 10,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        hedge_workers: int = 16
+    ):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_workers = hedge_workers
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "retries": 0, "rate_limited": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0, "failures": 0}
+
+    def bucket(self, provider: str) -> TokenBucket:
+        with self._lock:
+            if provider not in self._buckets:
+                self._buckets[provider] = TokenBucket(self.rate_per_minute / 60, self.burst)
+            return self._buckets[provider]
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _should_retry(self, provider: str, exc: Exception, attempt: int) -> bool:
+        if is_rate_limited(exc):
+            self._count("rate_limited")
+            self.bucket(provider).throttle()
+        if is_timeout(exc):
+            self._count("timeouts")
+        if attempt >= self.max_retries or not is_retryable(exc):
+            self._count("failures")
+            return False
+        self._count("retries")
+        return True
+
+    def call(
+        self,
+        provider: str,
+        fn: Callable[[], Any],
+        hedge_after: Optional[float] = None,
+        on_retry: Optional[Callable[[int, Exception], None]] = None
+    ) -> Any:
+        """Run `fn` under the provider's rate limit, retrying retryable failures.
+
+        `on_retry(attempt, error)` is called before each retry.
+        """
+        self._count("calls")
+        bucket = self.bucket(provider)
+        attempt = 0
+        while True:
+            try:
+                bucket.acquire()
+                result = self._hedged(bucket, fn, hedge_after) if hedge_after else fn()
+                bucket.recover()
+                return result
+            except Exception as e:
+                if not self._should_retry(provider, e, attempt):
+                    raise
+                if on_retry is not None:
+                    on_retry(attempt + 1, e)
+            time.sleep(self.backoff_delay(attempt))
+            attempt += 1
+
+    def _hedged(self, bucket: TokenBucket, fn: Callable[[], Any], hedge_after: float) -> Any:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.hedge_workers, thread_name_prefix="llm-hedge")
+            executor = self._executor
+        primary = executor.submit(fn)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self._count("hedges")
+        bucket.acquire()
+        pending = {primary, executor.submit(fn)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    # The losing request cannot be interrupted; its result is discarded
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    async def acall(
+        self,
+        provider: str,
+        fn: Callable[[], Awaitable[Any]],
+        hedge_after: Optional[float] = None,
+        on_retry: Optional[Callable[[int, Exception], None]] = None
+    ) -> Any:
+        """Async `call` for a coroutine function; a losing hedge is cancelled"""
+        self._count("calls")
+        bucket = self.bucket(provider)
+        attempt = 0
+        while True:
+            try:
+                await bucket.aacquire()
+                result = await (self._ahedged(bucket, fn, hedge_after) if hedge_after else fn())
+                bucket.recover()
+                return result
+            except Exception as e:
+                if not self._should_retry(provider, e, attempt):
+                    raise
+                if on_retry is not None:
+                    on_retry(attempt + 1, e)
+            await asyncio.sleep(self.backoff_delay(attempt))
+            attempt += 1
+
+    async def _ahedged(self, bucket: TokenBucket, fn: Callable[[], Awaitable[Any]], hedge_after: float) -> Any:
+        primary = asyncio.ensure_future(fn())
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self._count("hedges")
+        await bucket.aacquire()
+        pending = {primary, asyncio.ensure_future(fn())}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "rates_per_minute": {provider: round(bucket.rate * 60, 1) for provider, bucket in self._buckets.items()},
+            }
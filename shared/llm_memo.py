@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# pdfminer artifacts that carry no content: unmapped glyphs and page-number lines
+_CID_RE = re.compile(r"\(cid:\d+\)")
+_PAGE_NUMBER_RE = re.compile(r"^(page\s+)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_SPACES_RE = re.compile("[ \t\u00a0\u2000-\u200b\u202f\u205f\u3000]+")
+
+def normalize_text(text: str) -> str:
+    """Canonical form of extracted text, stable across trivial re-extractions.
+
+    Applies NFKC, drops form feeds, soft hyphens, (cid:N) glyphs and
+    page-number lines, collapses runs of spaces and blank lines.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\x0c", "\n").replace("\u00ad", "").replace("\r\n", "\n").replace("\r", "\n")
+    text = _CID_RE.sub("", text)
+    lines = []
+    for line in text.split("\n"):
+        line = _SPACES_RE.sub(" ", line).strip()
+        if _PAGE_NUMBER_RE.match(line):
+            continue
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+class MemoryMemoBackend:
+    """In-process LRU store; values are kept serialized so callers get copies"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return json.loads(self._entries[key])
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = json.dumps(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class FileMemoBackend:
+    """One JSON file per key, sharded by key prefix; shared across processes"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        os.makedirs(path.parent, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+class LLMMemo:
+    """Memoizes LLM results on (prompt template, normalized input, model, temperature)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(template: str, text: str, model: str, temperature: Optional[float], **variables) -> str:
+        parts = [template, normalize_text(text), str(model), repr(temperature), json.dumps(variables, sort_keys=True)]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get_or_call(
+        self,
+        template: str,
+        text: str,
+        model: str,
+        temperature: Optional[float],
+        call: Callable[[], Any],
+        **variables
+    ) -> Any:
+        """Return the memoized result, or run `call` and store what it returns.
+
+        Exceptions raised by `call` propagate and nothing is stored.
+        """
+        key = self.make_key(template, text, model, temperature, **variables)
+        value = self._lookup(key)
+        if value is None:
+            value = call()
+            self.backend.set(key, value)
+        return value
+
+    async def aget_or_call(
+        self,
+        template: str,
+        text: str,
+        model: str,
+        temperature: Optional[float],
+        call: Callable[[], Awaitable[Any]],
+        **variables
+    ) -> Any:
+        """get_or_call for a coroutine function `call`"""
+        key = self.make_key(template, text, model, temperature, **variables)
+        value = self._lookup(key)
+        if value is None:
+            value = await call()
+            self.backend.set(key, value)
+        return value
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+def create_memo(backend: str, directory: Path, max_entries: int = 4096) -> Optional[LLMMemo]:
+    """Build a memo for the named backend ("memory", "file" or "off")"""
+    if backend == "off":
+        return None
+    if backend == "file":
+        return LLMMemo(FileMemoBackend(directory))
+    if backend == "memory":
+        return LLMMemo(MemoryMemoBackend(max_entries))
+    raise ValueError(f"Unsupported memo backend: {backend}")
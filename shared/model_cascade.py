@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+class ModelTier(NamedTuple):
+    model: str
+    provider: Optional[str] = None
+    input_cost: float = 0.0  # USD per million prompt tokens
+    output_cost: float = 0.0  # USD per million response tokens
+
+def parse_tiers(spec: str, default_provider: Optional[str] = None) -> List[ModelTier]:
+    """Model tiers from a comma-separated "[provider/]model[:input_cost:output_cost]" list, cheapest first"""
+    tiers = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, *costs = entry.split(":")
+        provider, _, model = name.rpartition("/")
+        if len(costs) not in (0, 2):
+            raise ValueError(f"Model tier {entry!r} needs both an input and an output cost")
+        input_cost, output_cost = (float(cost) for cost in costs) if costs else (0.0, 0.0)
+        tiers.append(ModelTier(model, provider or default_provider, input_cost, output_cost))
+    if not tiers:
+        raise ValueError("At least one model tier is required")
+    return tiers
+
+class ModelCascade:
+    """Run each call on the cheapest model tier first, escalating rejected results.
+
+    `run(call, check)` calls `call(tier)` and hands the result to `check`,
+    which returns None to accept it or a short reason ("invalid", "short",
+    ...) to re-run the call on the next tier. Errors on a tier also
+    escalate. The last tier's result is returned unchecked and its errors
+    propagate.
+
+    Per-tier calls, outcomes, latency, tokens and cost are kept for
+    `stats`; callers report token usage with `record_tokens`.
+    """
+
+    def __init__(self, tiers: Sequence[ModelTier], on_escalate: Optional[Callable[[ModelTier, str], None]] = None):
+        if not tiers:
+            raise ValueError("At least one model tier is required")
+        self.tiers = list(tiers)
+        self.on_escalate = on_escalate
+        self._tiers = {tier.model: tier for tier in self.tiers}
+        self._lock = threading.Lock()
+        self._stats = {
+            tier.model: {
+                "calls": 0, "accepted": 0, "escalated": 0, "errors": 0, "seconds": 0.0,
+                "prompt_tokens": 0, "response_tokens": 0, "cost_usd": 0.0, "reasons": {},
+            }
+            for tier in self.tiers
+        }
+
+    @property
+    def key(self) -> str:
+        """The tier models, for cache keys of results produced through the cascade"""
+        return ">".join(tier.model for tier in self.tiers)
+
+    def run(self, call: Callable[[ModelTier], Any], check: Optional[Callable[[Any], Optional[str]]] = None) -> Any:
+        for index, tier in enumerate(self.tiers):
+            last = index == len(self.tiers) - 1
+            start = time.perf_counter()
+            try:
+                result = call(tier)
+            except Exception as e:
+                self._record(tier, start, "errors", type(e).__name__)
+                if last:
+                    raise
+                self._escalate(tier, type(e).__name__)
+                continue
+            reason = None if last or check is None else check(result)
+            if reason is None:
+                self._record(tier, start, "accepted")
+                return result
+            self._record(tier, start, "escalated", reason)
+            self._escalate(tier, reason)
+
+    def _escalate(self, tier: ModelTier, reason: str):
+        if self.on_escalate is not None:
+            self.on_escalate(tier, reason)
+
+    def _record(self, tier: ModelTier, start: float, outcome: str, reason: Optional[str] = None):
+        seconds = time.perf_counter() - start
+        with self._lock:
+            stats = self._stats[tier.model]
+            stats["calls"] += 1
+            stats[outcome] += 1
+            stats["seconds"] += seconds
+            if reason is not None:
+                stats["reasons"][reason] = stats["reasons"].get(reason, 0) + 1
+
+    def record_tokens(self, model: Optional[str], prompt_tokens: int, response_tokens: int):
+        """Add a call's token usage, and its cost, to the tier of `model` (other models are ignored)"""
+        tier = self._tiers.get(model)
+        if tier is None:
+            return
+        cost = (prompt_tokens * tier.input_cost + response_tokens * tier.output_cost) / 1_000_000
+        with self._lock:
+            stats = self._stats[tier.model]
+            stats["prompt_tokens"] += prompt_tokens
+            stats["response_tokens"] += response_tokens
+            stats["cost_usd"] += cost
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tier counts, mean latency, tokens and cost, plus the cost of all tiers"""
+        with self._lock:
+            tiers = {
+                model: {
+                    **{key: value for key, value in stats.items() if key != "reasons"},
+                    "seconds": round(stats["seconds"], 3),
+                    "mean_seconds": round(stats["seconds"] / stats["calls"], 3) if stats["calls"] else 0.0,
+                    "cost_usd": round(stats["cost_usd"], 6),
+                    "reasons": dict(stats["reasons"]),
+                }
+                for model, stats in self._stats.items()
+            }
+        return {"tiers": tiers, "cost_usd": round(sum(tier["cost_usd"] for tier in tiers.values()), 6)}
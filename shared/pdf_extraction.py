@@ -0,0 +1,164 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional, Set
+
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams, LTChar, LTContainer, LTImage, LTPage, LTText, LTTextBox, LTTextLine
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+
+# Layout analysis presets. "default" matches pdfminer's extract_text; "fast"
+# skips the boxes_flow ordering pass and vertical text detection.
+LAPARAMS_PRESETS = {
+    "fast": dict(line_margin=0.5, char_margin=2.0, word_margin=0.1, boxes_flow=None, detect_vertical=False),
+    "default": dict(),
+    "accurate": dict(line_margin=0.3, char_margin=1.5, word_margin=0.1, boxes_flow=0.5, detect_vertical=True, all_texts=True),
+}
+
+# Worker processes used for page-level extraction; 0 or 1 extracts in-process
+EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "2"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all extractions in this process, created on first use"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # forkserver: forking directly from a process running analysis threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver")
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+class LineStyle(NamedTuple):
+    """Typography of one text line; offsets index into the page (or document) text"""
+    start: int
+    end: int
+    size: float
+    bold: float  # fraction of characters set in a bold font
+
+class PageLayout(NamedTuple):
+    text: str
+    lines: List[LineStyle]
+
+BOLD_FONT_MARKERS = ("bold", "black", "heavy", "semibold", "demi")
+
+class LayoutTextConverter(TextConverter):
+    """TextConverter that also records the font size and weight of every line.
+
+    The text written is identical to TextConverter's output.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lines: List[LineStyle] = []
+
+    def receive_layout(self, ltpage: LTPage):
+        def render(item):
+            if isinstance(item, LTTextLine):
+                start = self.outfp.tell()
+                chars = [child for child in item if isinstance(child, LTChar)]
+                for child in item:
+                    render(child)
+                if chars:
+                    bold = sum(1 for char in chars if any(marker in char.fontname.lower() for marker in BOLD_FONT_MARKERS))
+                    self.lines.append(LineStyle(start, self.outfp.tell(), max(char.size for char in chars), bold / len(chars)))
+            elif isinstance(item, LTContainer):
+                for child in item:
+                    render(child)
+            elif isinstance(item, LTText):
+                self.write_text(item.get_text())
+            if isinstance(item, LTTextBox):
+                self.write_text("\n")
+            elif isinstance(item, LTImage) and self.imagewriter is not None:
+                self.imagewriter.export_image(item)
+
+        if self.showpageno:
+            self.write_text(f"Page {ltpage.pageid}\n")
+        render(ltpage)
+        self.write_text("\f")
+
+def make_laparams(preset: str) -> LAParams:
+    if preset not in LAPARAMS_PRESETS:
+        raise ValueError(f"Unknown layout preset: {preset}")
+    return LAParams(**LAPARAMS_PRESETS[preset])
+
+def count_pages(pdf_bytes: bytes) -> int:
+    """Page count from the document catalog, without parsing page contents"""
+    document = PDFDocument(PDFParser(io.BytesIO(pdf_bytes)))
+    count = resolve1(resolve1(document.catalog["Pages"]).get("Count"))
+    if isinstance(count, int):
+        return count
+    return sum(1 for _ in PDFPage.create_pages(document))
+
+def iter_file_page_layouts(pdf_file, preset: str = "default", pagenos: Optional[Set[int]] = None) -> Iterator[PageLayout]:
+    """Text and line styles of each page of an open PDF file, in-process.
+
+    Each page's text ends in a form feed, as with pdfminer's extract_text.
+    """
+    resource_manager = PDFResourceManager(caching=True)
+    laparams = make_laparams(preset)
+    for page in PDFPage.get_pages(pdf_file, pagenos=pagenos):
+        output = io.StringIO()
+        device = LayoutTextConverter(resource_manager, output, laparams=laparams)
+        PDFPageInterpreter(resource_manager, device).process_page(page)
+        device.close()
+        yield PageLayout(output.getvalue(), device.lines)
+
+def extract_page_range(pdf_bytes: bytes, start: int, stop: int, preset: str = "default") -> List[PageLayout]:
+    """Layouts of pages [start, stop); runs in the extraction pool workers"""
+    return list(iter_file_page_layouts(io.BytesIO(pdf_bytes), preset, set(range(start, stop))))
+
+def iter_page_layouts(
+    pdf_bytes: bytes,
+    preset: str = "default",
+    workers: Optional[int] = None,
+    pages_per_task: int = PAGES_PER_TASK
+) -> Iterator[PageLayout]:
+    """Yield the layout of each page, in order, as soon as it is available.
+
+    Pages are split into chunks of `pages_per_task` and extracted on the
+    shared process pool; documents that fit in a single chunk (or when
+    there is at most one worker) are extracted in-process to avoid the IPC
+    overhead.
+    """
+    workers = EXTRACTION_WORKERS if workers is None else workers
+    page_count = count_pages(pdf_bytes)
+    if workers <= 1 or page_count <= pages_per_task:
+        yield from iter_file_page_layouts(io.BytesIO(pdf_bytes), preset)
+        return
+
+    pool = get_extraction_pool()
+    futures = [
+        pool.submit(extract_page_range, pdf_bytes, start, min(start + pages_per_task, page_count), preset)
+        for start in range(0, page_count, pages_per_task)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+def join_pages(pages: Iterator[PageLayout]) -> PageLayout:
+    """Concatenate page layouts into one document, shifting line offsets"""
+    texts: List[str] = []
+    lines: List[LineStyle] = []
+    offset = 0
+    for page in pages:
+        texts.append(page.text)
+        lines.extend(line._replace(start=line.start + offset, end=line.end + offset) for line in page.lines)
+        offset += len(page.text)
+    return PageLayout("".join(texts), lines)
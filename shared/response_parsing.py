@@ -0,0 +1,186 @@
+import json
+import re
+from functools import lru_cache
+from typing import Any, Iterator, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_CLOSERS = {"{": "}", "[": "]"}
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+# Strings are matched whole so that nothing inside them is rewritten
+_REPAIR_RE = re.compile(r'"(?:[^"\\]|\\.)*"|,(?=\s*[}\]])|\b(?:True|False|None)\b')
+_OPEN_RE = re.compile(r"[{\[]")
+_STRUCTURAL_RE = re.compile(r'[{}\[\],:"]')
+_STRING_END_RE = re.compile(r'["\\]')
+_DECODER = json.JSONDecoder(strict=False)
+
+def _repair_token(match: re.Match) -> str:
+    token = match.group()
+    if token == ",":
+        return ""
+    return _PYTHON_LITERALS.get(token, token)
+
+def repair_json(text: str) -> str:
+    """Fix the common ways LLM output deviates from JSON, outside of strings:
+    trailing commas before a closing bracket and Python True/False/None."""
+    return _REPAIR_RE.sub(_repair_token, text)
+
+def loads_tolerant(text: str) -> Any:
+    """json.loads allowing raw control characters in strings, then again after repair_json"""
+    try:
+        return json.loads(text, strict=False)
+    except ValueError:
+        return json.loads(repair_json(text), strict=False)
+
+class JSONStreamParser:
+    """Incremental extractor of top-level JSON objects/arrays from LLM output.
+
+    Text around the values (prose, ```json fences) is skipped. `feed` returns
+    the values completed by each chunk; `partial` returns a best-effort parse
+    of the value still being streamed, with open strings and brackets closed,
+    so its fields can be used before the response finishes.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.values: List[Any] = []
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._escaped = False
+        self._last = ""
+        # (offset, open brackets) where the partial value can be cut and closed
+        self._cuts: List[Tuple[int, Tuple[str, ...]]] = []
+
+    def feed(self, chunk: str) -> List[Any]:
+        self.buffer += chunk
+        completed = []
+        buffer, pos, end = self.buffer, self._pos, len(self.buffer)
+        # Jump between the characters that can change state instead of visiting every one
+        while pos < end:
+            if self._start is None:
+                match = _OPEN_RE.search(buffer, pos)
+                if match is None:
+                    pos = end
+                    break
+                pos = match.start()
+                char = buffer[pos]
+                self._start, self._stack, self._last = pos, [char], char
+                self._cuts = [(pos + 1, (char,))]
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    pos += 1
+                    continue
+                match = _STRING_END_RE.search(buffer, pos)
+                if match is None:
+                    pos = end
+                    break
+                pos = match.start()
+                if buffer[pos] == "\\":
+                    self._escaped = True
+                else:
+                    self._in_string, self._last = False, '"'
+            else:
+                match = _STRUCTURAL_RE.search(buffer, pos)
+                if match is None:
+                    pos = end
+                    break
+                pos = match.start()
+                char = buffer[pos]
+                if char == '"':
+                    self._in_string = True
+                    self._string_is_key = self._stack[-1] == "{" and self._last in ("{", ",")
+                elif char in _CLOSERS:
+                    self._stack.append(char)
+                    self._cuts.append((pos + 1, tuple(self._stack)))
+                elif char in ("}", "]"):
+                    self._stack.pop()
+                    if not self._stack:
+                        value = self._complete(buffer[self._start:pos + 1])
+                        if value is not None:
+                            completed.append(value)
+                        self._start = None
+                elif char == ",":
+                    self._cuts.append((pos, tuple(self._stack)))
+                self._last = char
+            pos += 1
+        self._pos = pos
+        if self._start is None:
+            # Nothing in flight: drop consumed text so the buffer stays small
+            self.buffer, self._pos = "", 0
+        self.values.extend(completed)
+        return completed
+
+    @staticmethod
+    def _complete(text: str) -> Optional[Any]:
+        try:
+            return loads_tolerant(text)
+        except ValueError:
+            # Brackets inside prose, e.g. "[1]" in a sentence; not a value
+            return None
+
+    def partial(self) -> Optional[Any]:
+        """Best-effort value of the incomplete top-level object, or None"""
+        if self._start is None:
+            return None
+        text = self.buffer[self._start:self._pos]
+        if self._in_string and not self._string_is_key:
+            # Keep a string value that is still streaming
+            attempt = text[:-1] if self._escaped else text
+            closers = "".join(_CLOSERS[bracket] for bracket in reversed(self._stack))
+            try:
+                return loads_tolerant(attempt + '"' + closers)
+            except ValueError:
+                pass
+        for offset, stack in reversed(self._cuts):
+            try:
+                return loads_tolerant(text[:offset - self._start] + "".join(_CLOSERS[b] for b in reversed(stack)))
+            except ValueError:
+                continue
+        return None
+
+def iter_json_values(text: str) -> Iterator[Any]:
+    """Complete top-level JSON objects and arrays in text, in order"""
+    parser = JSONStreamParser()
+    yield from parser.feed(text)
+
+def extract_json(text: str) -> dict:
+    """The first JSON object in an LLM response.
+
+    Tolerates surrounding prose, code fences, trailing commas and Python
+    literals; raises ValueError if the response contains no object.
+    """
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("No valid JSON object found in response")
+    # Usually the first brace opens the answer; decode it directly and only
+    # fall back to the scanner for prose braces or several candidate objects
+    tail = text[start:]
+    for repair in (False, True):
+        try:
+            value, _ = _DECODER.raw_decode(repair_json(tail) if repair else tail)
+            return value
+        except ValueError:
+            continue
+    for value in iter_json_values(text):
+        if isinstance(value, dict):
+            return value
+    raise ValueError("No valid JSON object found in response")
+
+@lru_cache(maxsize=None)
+def validator_for(model: Type[ModelT]) -> TypeAdapter:
+    """pydantic validator for a model, built once per model class"""
+    return TypeAdapter(model)
+
+def validate(data: Any, model: Type[ModelT]) -> ModelT:
+    """Validate parsed data against a model; raises pydantic.ValidationError (a ValueError)"""
+    return validator_for(model).validate_python(data)
+
+def parse_response(text: str, model: Type[ModelT]) -> ModelT:
+    """Extract the first JSON object from an LLM response and validate it"""
+    return validate(extract_json(text), model)
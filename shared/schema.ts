@@ -15,8 +15,16 @@ export const resumeAnalysisSchema = z.object({
       name: z.string(),
       score: z.number(),
       content: z.string(),
-      suggestions: z.array(z.string())
-    }))
+      suggestions: z.array(z.string()),
+      // Set when the section could not be analyzed; excluded from overallScore
+      failed: z.boolean().optional()
+    })),
+    // Present when the resume is a near-duplicate of an earlier analysis
+    nearDuplicate: z.object({
+      of: z.string(),
+      similarity: z.number(),
+      reusedSections: z.array(z.string())
+    }).optional()
   }).optional()
 });
 
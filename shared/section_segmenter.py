@@ -0,0 +1,152 @@
+import re
+import statistics
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Heading wordings recognised for each resume section
+SECTION_KEYWORDS = {
+    "Contact Information": [
+        "contact", "contact information", "contact details", "personal details", "personal information",
+    ],
+    "Professional Summary": [
+        "summary", "professional summary", "profile", "professional profile", "career summary",
+        "objective", "career objective", "about me", "personal statement", "executive summary",
+    ],
+    "Work Experience": [
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "career history", "relevant experience", "professional background",
+    ],
+    "Skills": [
+        "skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+        "skills and expertise", "expertise", "technologies", "tools and technologies", "skill set",
+    ],
+    "Education": [
+        "education", "academic background", "qualifications", "academic qualifications",
+        "education and training", "academic history",
+    ],
+    "Projects": [
+        "projects", "personal projects", "side projects", "key projects", "selected projects",
+        "academic projects", "portfolio",
+    ],
+    "Languages": [
+        "languages", "language skills", "language proficiency", "spoken languages",
+    ],
+    "Certifications": [
+        "certifications", "certificates", "certification", "licenses and certifications",
+        "licenses", "courses", "training", "certifications and training",
+    ],
+}
+
+# Normalized heading text -> section name
+HEADING_INDEX = {keyword: section for section, keywords in SECTION_KEYWORDS.items() for keyword in keywords}
+
+_CONTACT_RE = re.compile(r"@|https?://|www\.|linkedin|github|\+?\d[\d\s().-]{6,}\d", re.IGNORECASE)
+_HEADING_PUNCT_RE = re.compile(r"[^\w&/ ]+")
+
+# Fewer distinct headings than this and the document is treated as unsegmented
+MIN_HEADINGS = 2
+# Spans shorter than this are considered a misdetection
+MIN_SPAN_CHARS = 20
+HEADER_MAX_CHARS = 200
+
+class Heading(NamedTuple):
+    section: str
+    start: int
+    confidence: float
+
+def normalize_heading(line: str) -> str:
+    line = line.lower().replace("&", " and ")
+    line = _HEADING_PUNCT_RE.sub(" ", line).replace("/", " and ")
+    return " ".join(line.split())
+
+def iter_lines(text: str) -> Iterable[Tuple[int, int]]:
+    """(start, end) offsets of each line of text, excluding the newline"""
+    start = 0
+    for match in re.finditer(r"[\n\f]", text):
+        yield start, match.start()
+        start = match.end()
+    yield start, len(text)
+
+class DocumentSegments:
+    """Offset index mapping section names to spans of the document text"""
+
+    def __init__(self, text: str, headings: List[Heading], header: str):
+        self.text = text
+        self.headings = headings
+        self.header = header
+        self.spans: Dict[str, List[Tuple[int, int]]] = {}
+        for heading, following in zip(headings, headings[1:] + [None]):
+            end = following.start if following else len(text)
+            if len(text[heading.start:end].strip()) >= MIN_SPAN_CHARS:
+                self.spans.setdefault(heading.section, []).append((heading.start, end))
+
+    @property
+    def segmented(self) -> bool:
+        return len(self.spans) >= MIN_HEADINGS
+
+    def span_text(self, section: str) -> Optional[str]:
+        """Text of the section's spans, or None if it was not confidently detected.
+
+        Without a contact heading, the text before the first heading (name,
+        title, contact lines) stands in for the contact section.
+        """
+        if not self.segmented:
+            return None
+        if section == "Contact Information" and section not in self.spans:
+            return self.text[:self.headings[0].start].strip() or None
+        if section not in self.spans:
+            return None
+        return "\n".join(self.text[start:end].strip() for start, end in self.spans[section])
+
+    def section_text(self, section: str) -> str:
+        """Prompt input for a section: shared header plus its span, else the full text"""
+        span = self.span_text(section)
+        if span is None:
+            return self.text
+        return f"{self.header}\n\n{span}" if self.header else span
+
+def segment_document(text: str, line_styles: Optional[Sequence] = None) -> DocumentSegments:
+    """Detect section headings once per document and index their spans.
+
+    Headings must match a known wording (an entire line, or the part of a
+    line before a colon). When `line_styles` from pdf_extraction are given,
+    a heading also needs a style signal: larger or bold type, ALL CAPS or a
+    colon. Without them any matching line is accepted.
+    """
+    styles = {style.start: style for style in line_styles or []}
+    body_size = statistics.median(style.size for style in styles.values()) if styles else None
+    # With typography available a heading must also look like one
+    min_confidence = 0.7 if body_size else 0.6
+
+    headings: List[Heading] = []
+    first_heading_start = len(text)
+    for start, end in iter_lines(text):
+        line = text[start:end].strip()
+        label, colon, _ = line.partition(":")
+        if not label or len(label) > 40:
+            continue
+        section = HEADING_INDEX.get(normalize_heading(label))
+        if section is None:
+            continue
+
+        confidence = 0.6
+        style = styles.get(start)
+        if style is not None and body_size:
+            confidence += 0.2 * (style.size >= body_size * 1.15) + 0.2 * (style.bold >= 0.6)
+        confidence += 0.1 * label.strip().isupper() + 0.1 * bool(colon)
+        if confidence < min_confidence:
+            continue
+        headings.append(Heading(section, start, min(confidence, 1.0)))
+        first_heading_start = min(first_heading_start, start)
+
+    header_lines = []
+    for start, end in iter_lines(text[:first_heading_start]):
+        line = text[start:end].strip()
+        # Contact details stay out of the shared header so edits to them only
+        # change the contact section's input
+        if line and not _CONTACT_RE.search(line):
+            header_lines.append(line)
+        if len(header_lines) == 3:
+            break
+    header = " | ".join(header_lines)[:HEADER_MAX_CHARS]
+
+    return DocumentSegments(text, headings, header)
@@ -0,0 +1,410 @@
+import contextvars
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Seconds; spans range from JSON parsing (ms) to whole analyses (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+logger = logging.getLogger(__name__)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def metric_name(name: str) -> str:
+    return _NAME_RE.sub("_", name)
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((metric_name(key), str(value)) for key, value in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}_total{_format_labels(key)} {_format_value(value)}" for key, value in values]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"labels": dict(key), "value": value} for key, value in sorted(self._values.items())]
+
+class Histogram:
+    """Observations bucketed by upper bound, with their count and sum, per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # label set -> [per-bucket counts (last is +Inf), count, sum]
+        self._values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            state[0][index] += 1
+            state[1] += 1
+            state[2] += value
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimate of the q-quantile, interpolated within its bucket as Prometheus does"""
+        with self._lock:
+            state = self._values.get(_label_key(labels))
+            if state is None or not state[1]:
+                return None
+            counts, count = list(state[0]), state[1]
+        return self._quantile(q, counts, count)
+
+    def _quantile(self, q: float, counts: List[int], count: int) -> float:
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        lines = []
+        for key, (counts, count, total) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            values = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        return [
+            {
+                "labels": dict(key),
+                "count": count,
+                "sum": round(total, 6),
+                "mean": round(total / count, 6),
+                "p50": round(self._quantile(0.5, counts, count), 6),
+                "p95": round(self._quantile(0.95, counts, count), 6),
+            }
+            for key, (counts, count, total) in values
+        ]
+
+class MetricsRegistry:
+    """Named counters and histograms, rendered in the Prometheus text format.
+
+    Collectors registered with `add_collector` are called at scrape time and
+    their (possibly nested) dicts of numbers exported as gauges, which lets
+    existing stats() methods show up without being rewritten as metrics.
+    """
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = metric_name(namespace)
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Tuple[str, Callable[[], Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+
+    def _name(self, name: str) -> str:
+        name = metric_name(name)
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def _get(self, cls, name: str, help: str, **kwargs):
+        full_name = self._name(name)
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise TypeError(f"Metric {full_name} is a {metric.kind}, not a {cls.kind}")
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help)
+
+    def histogram(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def add_collector(self, prefix: str, collect: Callable[[], Dict[str, Any]]):
+        with self._lock:
+            self._collectors.append((self._name(prefix), collect))
+
+    def _gauges(self) -> Iterator[Tuple[str, float]]:
+        def flatten(prefix: str, value: Any) -> Iterator[Tuple[str, float]]:
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    yield from flatten(f"{prefix}_{metric_name(str(key))}", item)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                yield prefix, value
+            elif isinstance(value, bool):
+                yield prefix, int(value)
+
+        with self._lock:
+            collectors = list(self._collectors)
+        for prefix, collect in collectors:
+            try:
+                yield from flatten(prefix, collect())
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", prefix, e)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.collect())
+        for name, value in self._gauges():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and histogram summaries (count, sum, mean, p50, p95) as JSON-serializable data"""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        return {name: metric.snapshot() for name, metric in metrics}
+
+class Span:
+    """A timed operation: its name, metric labels, free-form attributes and outcome"""
+
+    __slots__ = ("name", "labels", "attributes", "started", "seconds", "status")
+
+    def __init__(self, name: str, labels: Dict[str, Any], started: float):
+        self.name = name
+        self.labels = labels
+        self.attributes: Dict[str, Any] = {}
+        self.started = started
+        self.seconds = 0.0
+        self.status = "ok"
+
+    def set(self, **attributes):
+        """Attach attributes (sizes, token counts, ...) reported with the span but not used as labels"""
+        self.attributes.update(attributes)
+
+    def to_dict(self, origin: float = 0.0) -> Dict[str, Any]:
+        return {
+            "span": self.name,
+            **self.labels,
+            **self.attributes,
+            "status": self.status,
+            "started": round(self.started - origin, 4),
+            "seconds": round(self.seconds, 4),
+        }
+
+class Trace:
+    """Spans finished while handling one request, in completion order.
+
+    `on_span` is called with each finished span, e.g. to stream timings.
+    """
+
+    def __init__(self, on_span: Optional[Callable[[Span], None]] = None):
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self.on_span = on_span
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+        if self.on_span is not None:
+            self.on_span(span)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            spans = list(self.spans)
+        return [span.to_dict(self.started) for span in spans]
+
+    def totals(self) -> Dict[str, float]:
+        """Seconds spent per span name; concurrent spans each count in full"""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span.name] = round(totals.get(span.name, 0.0) + span.seconds, 4)
+        return totals
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+def propagate_context(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap `fn` to run in a copy of the caller's context, so spans recorded on
+    executor threads reach the caller's trace. Each call gets its own copy, so
+    the wrapper can be passed to `Executor.map` or submitted many times.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+class Telemetry:
+    """Spans and metrics for one process.
+
+    `span(name, **labels)` times a block into the `<name>_seconds` histogram,
+    labelled with `labels` and the outcome ("ok" or "error"), and adds it to
+    the current `trace` if one is active.
+    """
+
+    def __init__(self, namespace: str):
+        self.metrics = MetricsRegistry(namespace)
+
+    @contextmanager
+    def trace(self, on_span: Optional[Callable[[Span], None]] = None) -> Iterator[Trace]:
+        trace = Trace(on_span)
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **labels) -> Iterator[Span]:
+        span = Span(name, labels, time.perf_counter())
+        try:
+            yield span
+        except BaseException:
+            span.status = "error"
+            raise
+        finally:
+            span.seconds = time.perf_counter() - span.started
+            self.metrics.histogram(f"{name}_seconds", f"Duration of {name.replace('_', ' ')}").observe(
+                span.seconds, status=span.status, **labels
+            )
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.add(span)
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, help: str = "", **labels):
+        self.metrics.histogram(name, help, buckets).observe(value, **labels)
+
+    def count(self, name: str, amount: float = 1.0, help: str = "", **labels):
+        self.metrics.counter(name, help).inc(amount, **labels)
+
+class SlowRequestProfiler:
+    """Sampling profiler that keeps profiles of slow requests only.
+
+    While a `profile` block runs, a background thread samples the Python
+    stacks of every thread (idle executor workers excepted) each `interval`
+    seconds. If the block took at least `threshold` seconds, the samples are
+    written to `directory` as collapsed stacks ("thread;frame;frame count"
+    lines, readable by flamegraph.pl and speedscope); otherwise they are
+    discarded. A threshold of 0 disables profiling entirely.
+    """
+
+    SAMPLER_THREAD = "slow-request-profiler"
+
+    def __init__(self, threshold: float, directory: Path, interval: float = 0.01, max_samples: int = 50000):
+        self.threshold = threshold
+        self.directory = Path(directory)
+        self.interval = interval
+        self.max_samples = max_samples
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    @staticmethod
+    def _idle(frame) -> bool:
+        return frame.f_code.co_name == "_worker" and "concurrent" in frame.f_code.co_filename
+
+    def _sample(self, stacks: Dict[str, int], stop: threading.Event):
+        samples = 0
+        own = threading.get_ident()
+        while not stop.wait(self.interval) and samples < self.max_samples:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or names.get(ident, "").startswith(self.SAMPLER_THREAD) or self._idle(frame):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                key = ";".join([names.get(ident, str(ident))] + stack[::-1])
+                stacks[key] = stacks.get(key, 0) + 1
+            samples += 1
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Profile the block; the yielded dict gets a "path" entry if a profile was written.
+        """
+        outcome: Dict[str, Any] = {}
+        if not self.enabled:
+            yield outcome
+            return
+        stacks: Dict[str, int] = {}
+        stop = threading.Event()
+        sampler = threading.Thread(target=self._sample, args=(stacks, stop), name=self.SAMPLER_THREAD, daemon=True)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            yield outcome
+        finally:
+            stop.set()
+            sampler.join()
+            seconds = time.perf_counter() - started
+            if seconds >= self.threshold and stacks:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                path = self.directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{metric_name(name)[:64]}-{seconds:.1f}s.folded"
+                with open(path, "w") as file:
+                    for stack, count in sorted(stacks.items()):
+                        file.write(f"{stack} {count}\n")
+                outcome.update(path=str(path), seconds=seconds)
+
+# Process-wide telemetry, exported by /metrics (backend) or the "metrics" command (server)
+telemetry = Telemetry("resume")
@@ -0,0 +1,162 @@
+import logging
+import re
+import threading
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import tiktoken
+
+DEFAULT_ENCODING = "cl100k_base"
+
+logger = logging.getLogger(__name__)
+
+# Sections dropped first, in order, when a whole-resume prompt is over budget
+LOW_VALUE_SECTIONS = ["Languages", "Certifications", "Projects", "Education"]
+
+_PAGE_DIGITS_RE = re.compile(r"\d+")
+_SPACES_RE = re.compile("[ \t\u00a0]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# Loaded encodings by name, None for one that failed to load
+_encodings: Dict[str, Optional[tiktoken.Encoding]] = {}
+_encodings_lock = threading.Lock()
+
+def get_encoding(name: str = DEFAULT_ENCODING) -> Optional[tiktoken.Encoding]:
+    """Load a tiktoken encoding once per process.
+
+    Loading parses (and on first use downloads) the BPE ranks, so the result
+    is cached; concurrent first calls wait for a single load. Returns None
+    when the encoding cannot be loaded, in which case token counts fall
+    back to an estimate.
+    """
+    if name in _encodings:
+        return _encodings[name]
+    with _encodings_lock:
+        if name not in _encodings:
+            try:
+                _encodings[name] = tiktoken.get_encoding(name)
+            except Exception as e:
+                logger.warning("tiktoken encoding %s unavailable, estimating token counts: %s", name, e)
+                _encodings[name] = None
+        return _encodings[name]
+
+@lru_cache(maxsize=64)
+def encoding_name_for_model(model: Optional[str]) -> str:
+    """tiktoken encoding used by an OpenAI model; other providers use the default"""
+    try:
+        return tiktoken.encoding_name_for_model(model) if model else DEFAULT_ENCODING
+    except KeyError:
+        return DEFAULT_ENCODING
+
+def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING) -> int:
+    encoding = get_encoding(encoding_name)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding_name: str = DEFAULT_ENCODING) -> str:
+    """Keep the first `max_tokens` tokens of text"""
+    encoding = get_encoding(encoding_name)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+def collapse_whitespace(text: str) -> str:
+    lines = [_SPACES_RE.sub(" ", line).strip() for line in text.replace("\x0c", "\n").split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+def strip_repeated_page_lines(text: str, edge_lines: int = 3) -> str:
+    """Drop header/footer lines that pdfminer emits on every page.
+
+    A line near the top or bottom of a page (digits ignored, so "Page 2 of 3"
+    matches "Page 3 of 3") that recurs on at least half of the pages is kept
+    only on the first page.
+    """
+    pages = text.split("\x0c")
+    if len([page for page in pages if page.strip()]) < 2:
+        return text
+
+    def edge_keys(page: str) -> set:
+        lines = [line.strip() for line in page.split("\n") if line.strip()]
+        return {_PAGE_DIGITS_RE.sub("#", line) for line in lines[:edge_lines] + lines[-edge_lines:]}
+
+    counts = Counter(key for page in pages for key in edge_keys(page))
+    repeated = {key for key, count in counts.items() if count >= max(2, len(pages) // 2)}
+    if not repeated:
+        return text
+
+    kept_pages = [pages[0]]
+    for page in pages[1:]:
+        kept_pages.append("\n".join(
+            line for line in page.split("\n") if _PAGE_DIGITS_RE.sub("#", line.strip()) not in repeated
+        ))
+    return "\x0c".join(kept_pages)
+
+def compact_text(
+    text: str,
+    max_tokens: int,
+    segments=None,
+    encoding_name: str = DEFAULT_ENCODING
+) -> str:
+    """Shrink text to fit `max_tokens`, applying the cheapest step that suffices.
+
+    1. collapse whitespace and drop repeated page headers/footers;
+    2. if `segments` (a section_segmenter.DocumentSegments over this text)
+       is given, drop LOW_VALUE_SECTIONS one at a time;
+    3. truncate the tail, keeping the start of the resume.
+    """
+    if count_tokens(text, encoding_name) <= max_tokens:
+        return text
+    compacted = collapse_whitespace(strip_repeated_page_lines(text))
+    if count_tokens(compacted, encoding_name) <= max_tokens:
+        return compacted
+
+    if segments is not None and segments.text == text and segments.segmented:
+        dropped: List[tuple] = []
+        for section in LOW_VALUE_SECTIONS:
+            dropped.extend(segments.spans.get(section, []))
+            if not dropped:
+                continue
+            kept, position = [], 0
+            for start, end in sorted(dropped):
+                kept.append(text[position:start])
+                position = end
+            kept.append(text[position:])
+            compacted = collapse_whitespace(strip_repeated_page_lines("".join(kept)))
+            if count_tokens(compacted, encoding_name) <= max_tokens:
+                return compacted
+
+    return truncate_to_tokens(compacted, max_tokens, encoding_name) + "\n[truncated]"
+
+class TokenLedger:
+    """Thread-safe record of token counts per LLM call"""
+
+    def __init__(self, max_calls: int = 1000):
+        self.calls = deque(maxlen=max_calls)
+        self.totals: Dict[str, int] = Counter()
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        label: str,
+        prompt_tokens: int,
+        response_tokens: int = 0,
+        original_tokens: Optional[int] = None
+    ):
+        """Record one call; `original_tokens` is the prompt size before compaction"""
+        call = {
+            "label": label,
+            "prompt_tokens": prompt_tokens,
+            "response_tokens": response_tokens,
+            "saved_tokens": max(0, (original_tokens or prompt_tokens) - prompt_tokens),
+        }
+        with self._lock:
+            self.calls.append(call)
+            self.totals["calls"] += 1
+            for key in ("prompt_tokens", "response_tokens", "saved_tokens"):
+                self.totals[key] += call[key]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.totals)
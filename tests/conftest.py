@@ -0,0 +1,11 @@
+"""Makes the shared/ package, the backend modules and the benchmark fixtures importable from tests"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "backend", ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+# The Gemini worker's flat modules go last: backend's `services` package must win over server/services
+if str(ROOT / "server") not in sys.path:
+    sys.path.append(str(ROOT / "server"))
@@ -0,0 +1,133 @@
+"""backend/services/analysis_pipeline.py run against the fake LLM of benchmarks/bench_analysis_pipeline.py"""
+import json
+
+import pytest
+
+import config
+from bench_analysis_pipeline import DEPENDENCIES, RESPONSES, RESUME_TEXT, run, template_responder
+from fake_chat_model import FakeChatModel
+from services import llm_service
+from services.analysis_pipeline import StageGraph, response_issue, resume_stages
+from shared.call_scheduler import CallScheduler
+
+
+@pytest.fixture(autouse=True)
+def offline_llm_service(monkeypatch):
+    """No memo between runs and no rate limiting of the fake calls"""
+    monkeypatch.setattr(llm_service, "llm_memo", None)
+    monkeypatch.setattr(llm_service, "call_scheduler", CallScheduler(rate_per_minute=1e9, burst=1e9))
+
+
+@pytest.fixture
+def llm():
+    return FakeChatModel(response=template_responder, latency=0.01, connect_latency=0)
+
+
+def unfilled(value, path="results"):
+    """Paths of fields still at a model default ("unknown", -1, empty)"""
+    if isinstance(value, dict):
+        return [missing for key, item in value.items() for missing in unfilled(item, f"{path}.{key}")]
+    if isinstance(value, list):
+        if not value:
+            return [path]
+        return [missing for index, item in enumerate(value) for missing in unfilled(item, f"{path}[{index}]")]
+    if value in ("unknown", -1, None) or (isinstance(value, str) and value.startswith("No ")):
+        return [path]
+    return []
+
+
+def final_result(events):
+    kind, result = events[-1]
+    assert kind == "result"
+    return result
+
+
+def test_stage_graph_is_valid():
+    StageGraph(resume_stages(lambda key, **variables: "", RESUME_TEXT))
+
+
+@pytest.mark.parametrize("key", RESPONSES)
+def test_fake_response_is_not_escalated(key):
+    response = RESPONSES[key]
+    text = response if isinstance(response, str) else json.dumps(response)
+    assert response_issue(key, text, config.LLM_CASCADE_MIN_WORDS) is None
+
+
+def test_every_field_is_filled(llm):
+    events, _ = run(llm, 8, config.LOCAL_EXTRACTION_MIN_CONFIDENCE)
+    result = final_result(events)
+    assert unfilled(result["results"]) == []
+    assert [timing["stage"] for timing in result["stages"] if timing["status"] != "done"] == []
+
+
+def test_stages_start_after_their_dependencies(llm):
+    events, _ = run(llm, 8, config.LOCAL_EXTRACTION_MIN_CONFIDENCE)
+    timings = {timing["stage"]: timing for timing in final_result(events)["stages"]}
+    for stage, after in DEPENDENCIES.items():
+        for dependency in after:
+            finished = timings[dependency]["started"] + timings[dependency]["seconds"]
+            assert timings[stage]["started"] + 1e-3 >= finished, f"{stage} started before {dependency} finished"
+
+
+def test_runs_are_deterministic(llm):
+    first = final_result(run(llm, 8, config.LOCAL_EXTRACTION_MIN_CONFIDENCE)[0])
+    second = final_result(run(llm, 8, config.LOCAL_EXTRACTION_MIN_CONFIDENCE)[0])
+    assert second["results"] == first["results"]
+    assert second["overallScore"] == first["overallScore"]
+
+
+def test_local_extraction_matches_llm_extraction(llm):
+    local = final_result(run(llm, 8, config.LOCAL_EXTRACTION_MIN_CONFIDENCE)[0])
+    local_calls = llm.calls
+    llm_only = final_result(run(llm, 8)[0])
+    assert llm_only["results"] == local["results"]
+    assert local_calls < llm.calls - local_calls
+
+
+CONTACT_RESUME = """Jane Smith
+Data Engineer, Berlin
+jane.smith@example.com | +49 30 1234 5678 | linkedin.com/in/janesmith
+
+Work Experience
+Data Engineer, Acme 2019-2023
+"""
+
+
+def contact_info(llm_contact, min_local_confidence=0.8):
+    invoke = lambda template_key, **variables: json.dumps(llm_contact)
+    stages = {stage.name: stage for stage in resume_stages(invoke, CONTACT_RESUME, min_local_confidence=min_local_confidence)}
+    return stages["contact_info"].run({})
+
+
+def test_local_contact_keeps_the_llm_values_it_can_find():
+    contact = contact_info({
+        "candidate_name": "Jane Smith",
+        "candidate_email": "Jane.Smith@example.com",
+        "candidate_phone": "+49 (30) 1234-5678",
+        "candidate_social_media": ["https://www.linkedin.com/in/janesmith"],
+    })
+    assert contact.candidate_email == "Jane.Smith@example.com"
+    assert contact.candidate_phone == "+49 (30) 1234-5678"
+    assert contact.candidate_social_media == ["https://www.linkedin.com/in/janesmith"]
+
+
+def test_local_contact_fills_empty_and_made_up_llm_values():
+    contact = contact_info({
+        "candidate_name": "Jane Smith",
+        "candidate_email": "unknown",
+        "candidate_phone": "+1 555 867 5309",
+        "candidate_social_media": ["https://github.com/janesmith"],
+    })
+    assert contact.candidate_name == "Jane Smith"
+    assert contact.candidate_email == "jane.smith@example.com"
+    assert contact.candidate_phone == "+49 30 1234 5678"
+    assert contact.candidate_social_media == ["https://linkedin.com/in/janesmith"]
+
+
+def test_local_contact_respects_the_confidence_gate():
+    # The only email is outside the contact region, at half confidence
+    resume = CONTACT_RESUME.replace("jane.smith@example.com | ", "") + "Built pipelines.\n" * 8 + "References: hr@acme.example.com\n"
+    invoke = lambda template_key, **variables: json.dumps({"candidate_email": "unknown"})
+    for min_confidence, email in ((0.8, "unknown"), (0.5, "hr@acme.example.com")):
+        stages = {stage.name: stage for stage in resume_stages(invoke, resume, min_local_confidence=min_confidence)}
+        assert stages["contact_info"].run({}).candidate_email == email
@@ -0,0 +1,38 @@
+"""server/batch_analyze.py: progress reporting as JSON lines"""
+import importlib
+import io
+import json
+
+import pytest
+
+from synthetic_pdf import make_layout_resume
+
+
+@pytest.fixture
+def batch_analyze(tmp_path, monkeypatch):
+    # resume_service creates ./tmp on import
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("batch_analyze")
+
+
+def test_reports_progress_as_json_lines(batch_analyze, tmp_path):
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    for seed in range(3):
+        (resumes / f"resume-{seed}.pdf").write_bytes(make_layout_resume(1, seed))
+    paths = list(batch_analyze.iter_input_paths(resumes))
+    output = tmp_path / "results.jsonl"
+    stream = io.StringIO()
+
+    summary = batch_analyze.run_batch(paths, output, 2, extract_only=True, report_every=0, report_stream=stream)
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert events[0] == {"type": "start", "resumes": 3, "already_done": 0, "pending": 3}
+    assert {event["type"] for event in events[1:-1]} == {"progress"}
+    assert events[-1] == {"type": "done", **summary}
+    assert summary["done"] == 3 and summary["errors"] == 0
+
+    # A rerun skips the recorded resumes
+    stream = io.StringIO()
+    batch_analyze.run_batch(paths, output, 2, extract_only=True, report_stream=stream)
+    assert json.loads(stream.getvalue().splitlines()[0])["already_done"] == 3
@@ -0,0 +1,206 @@
+"""CallScheduler in shared/call_scheduler.py: retries, timeouts, hedging and 429 throttling"""
+import asyncio
+import importlib
+import threading
+import time
+
+import pytest
+
+from fake_chat_model import FakeAPIError, FakeChatModel
+from shared.call_scheduler import CallScheduler
+
+
+def make_scheduler(**kwargs):
+    options = {"rate_per_minute": 60000, "burst": 100, "max_retries": 3, "base_delay": 0.001, "max_delay": 0.01}
+    return CallScheduler(**{**options, **kwargs})
+
+
+def failing(*errors, result="ok"):
+    """fn raising `errors` on its first calls, then returning `result`; .calls counts the attempts"""
+    remaining = list(errors)
+
+    def fn():
+        fn.calls += 1
+        if remaining:
+            raise remaining.pop(0)
+        return result
+
+    fn.calls = 0
+    return fn
+
+
+@pytest.mark.parametrize("error", [FakeAPIError(429), FakeAPIError(503), ConnectionError("reset")])
+def test_retries_retryable_errors_with_backoff(error):
+    scheduler = make_scheduler()
+    retries = []
+    fn = failing(error, error)
+
+    assert scheduler.call("fake", fn, on_retry=lambda attempt, e: retries.append((attempt, e))) == "ok"
+    assert fn.calls == 3
+    assert retries == [(1, error), (2, error)]
+    assert scheduler.counters["retries"] == 2
+    assert scheduler.counters["failures"] == 0
+
+
+def test_backoff_grows_and_is_capped():
+    scheduler = make_scheduler(base_delay=1.0, max_delay=4.0)
+    for attempt in range(6):
+        assert 0 <= scheduler.backoff_delay(attempt) <= min(4.0, 2 ** attempt)
+
+
+def test_gives_up_after_max_retries():
+    scheduler = make_scheduler(max_retries=2)
+    fn = failing(*[FakeAPIError(503)] * 5)
+
+    with pytest.raises(FakeAPIError):
+        scheduler.call("fake", fn)
+    assert fn.calls == 3
+    assert scheduler.counters["failures"] == 1
+
+
+def test_non_retryable_error_is_raised_at_once():
+    scheduler = make_scheduler()
+    fn = failing(FakeAPIError(400))
+
+    with pytest.raises(FakeAPIError):
+        scheduler.call("fake", fn)
+    assert fn.calls == 1
+    assert scheduler.counters["retries"] == 0
+
+
+class DeadlineExceeded(Exception):
+    """Named like google-api-core's timeout error"""
+
+
+@pytest.mark.parametrize("error", [TimeoutError("read timed out"), DeadlineExceeded("504 Deadline Exceeded")])
+def test_timeouts_are_not_retried(error):
+    scheduler = make_scheduler()
+    fn = failing(error)
+
+    with pytest.raises(type(error)):
+        scheduler.call("fake", fn)
+    # One timed-out attempt: the wait is bounded by the call timeout, not timeout x attempts
+    assert fn.calls == 1
+    assert scheduler.counters["timeouts"] == 1
+    assert scheduler.counters["retries"] == 0
+
+
+def test_rate_limit_throttles_the_provider_bucket():
+    scheduler = make_scheduler(rate_per_minute=600)
+    model = FakeChatModel(latency=0, connect_latency=0, error_rate=1.0, error_status=429)
+
+    with pytest.raises(FakeAPIError):
+        scheduler.call("fake", lambda: model.invoke("prompt"))
+    bucket = scheduler.bucket("fake")
+    # Four 429s halve the rate four times, down to the 1/16 floor
+    assert bucket.rate == pytest.approx(bucket.max_rate / 16)
+    assert scheduler.counters["rate_limited"] == 4
+    # Other providers keep their own rate
+    assert scheduler.bucket("other").rate == scheduler.bucket("other").max_rate
+
+
+def test_successes_recover_the_throttled_rate():
+    scheduler = make_scheduler()
+    bucket = scheduler.bucket("fake")
+    bucket.throttle()
+    throttled = bucket.rate
+
+    scheduler.call("fake", lambda: "ok")
+    assert throttled < bucket.rate <= bucket.max_rate
+
+
+def test_hedge_wins_over_a_slow_first_attempt():
+    scheduler = make_scheduler()
+    attempts = []
+    lock = threading.Lock()
+
+    def fn():
+        with lock:
+            attempts.append(len(attempts))
+            first = len(attempts) == 1
+        time.sleep(0.5 if first else 0.01)
+        return "slow" if first else "hedge"
+
+    start = time.perf_counter()
+    assert scheduler.call("fake", fn, hedge_after=0.05) == "hedge"
+    assert time.perf_counter() - start < 0.4
+    assert len(attempts) == 2
+    assert scheduler.counters["hedges"] == 1
+    assert scheduler.counters["hedge_wins"] == 1
+
+
+def test_fast_attempt_is_not_hedged():
+    scheduler = make_scheduler()
+    model = FakeChatModel(latency=0.001, connect_latency=0)
+
+    scheduler.call("fake", lambda: model.invoke("prompt"), hedge_after=0.5)
+    assert model.calls == 1
+    assert scheduler.counters["hedges"] == 0
+
+
+def test_acall_retries_and_hedges():
+    scheduler = make_scheduler()
+    model = FakeChatModel(latency=0.001, connect_latency=0)
+    errors = [FakeAPIError(429)]
+
+    async def flaky():
+        if errors:
+            raise errors.pop()
+        return await model.ainvoke("prompt")
+
+    attempts = []
+
+    async def slow_first():
+        attempts.append(None)
+        await asyncio.sleep(0.5 if len(attempts) == 1 else 0.01)
+        return len(attempts)
+
+    assert asyncio.run(scheduler.acall("fake", flaky)).content == "Fake analysis."
+    assert scheduler.counters["retries"] == 1
+    assert scheduler.counters["rate_limited"] == 1
+    assert asyncio.run(scheduler.acall("fake", slow_first, hedge_after=0.05)) == 2
+    assert scheduler.counters["hedge_wins"] == 1
+
+
+def test_acall_does_not_retry_timeouts():
+    scheduler = make_scheduler()
+
+    async def timed_out():
+        raise asyncio.TimeoutError()
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scheduler.acall("fake", timed_out))
+    assert scheduler.counters["timeouts"] == 1
+    assert scheduler.counters["retries"] == 0
+
+
+@pytest.fixture
+def resume_service(tmp_path, monkeypatch):
+    """server/resume_service.py, with a scheduler that fails fast and no memo"""
+    # The module creates ./tmp on import
+    monkeypatch.chdir(tmp_path)
+    module = importlib.import_module("resume_service")
+    monkeypatch.setattr(module, "call_scheduler", make_scheduler())
+    monkeypatch.setattr(module, "section_memo", None)
+    return module
+
+
+def test_failed_sections_are_left_out_of_the_overall_score(resume_service, monkeypatch):
+    for tier in resume_service.MODEL_TIERS:
+        monkeypatch.setitem(
+            resume_service.models, tier.model,
+            FakeChatModel(model_name=tier.model, latency=0, connect_latency=0, error_rate=1.0, error_status=503)
+        )
+
+    failed = resume_service.analyze_resume_section("Built data pipelines.", "Work Experience")
+    assert failed["failed"] is True
+    assert failed["content"].startswith("Analysis failed:")
+
+    sections = [
+        {"name": "Professional Summary", "score": 80, "content": "Clear summary.", "suggestions": []},
+        {"name": "Work Experience", **failed},
+        {"name": "Skills", "score": 60, "content": "Broad skills.", "suggestions": []},
+    ]
+    results = resume_service.build_results({"overview": "Engineer.", "strengths": [], "weaknesses": []}, sections)
+    assert results["overallScore"] == 70
+    assert resume_service.has_failed_sections(results)
@@ -0,0 +1,125 @@
+"""backend/services/job_queue.py: deduplication, restart re-queueing, leases and failures"""
+import threading
+import time
+
+import pytest
+
+from services.job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobStore
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(tmp_path / "jobs.sqlite")
+
+
+@pytest.fixture
+def make_queue(store):
+    queues = []
+
+    def make(handler, **kwargs):
+        job_queue = JobQueue(store, handler, **kwargs)
+        queues.append(job_queue)
+        return job_queue
+
+    yield make
+    for job_queue in queues:
+        job_queue.stop(timeout=5)
+
+
+def test_documents_with_the_same_key_share_an_in_flight_job(store):
+    job_id, created = store.create_or_join("a.pdf", "hash")
+    joined_id, joined = store.create_or_join("b.pdf", "hash")
+    other_id, other = store.create_or_join("c.pdf", "other-hash")
+    assert created and not joined and other
+    assert joined_id == job_id != other_id
+    assert store.get_for_document("a.pdf")["job_id"] == store.get_for_document("b.pdf")["job_id"] == job_id
+
+
+def test_finished_jobs_are_not_joined(store):
+    job_id, _ = store.create_or_join("a.pdf", "hash")
+    store.mark_done(job_id, {"score": 1})
+    again_id, created = store.create_or_join("b.pdf", "hash")
+    assert created and again_id != job_id
+    assert store.get_for_document("a.pdf")["result"] == {"score": 1}
+
+
+def test_queue_deduplicates_submissions(make_queue):
+    release = threading.Event()
+    calls = []
+
+    def handler(document_id):
+        calls.append(document_id)
+        release.wait(5)
+        return {"document": document_id}
+
+    job_queue = make_queue(handler, workers=2)
+    job_id, deduplicated = job_queue.submit("a.pdf", "hash")
+    joined_id, joined = job_queue.submit("b.pdf", "hash")
+    release.set()
+    wait_for(lambda: job_queue.store.get(job_id)["status"] == DONE)
+    assert (deduplicated, joined, joined_id) == (False, True, job_id)
+    assert calls == ["a.pdf"]
+    assert job_queue.metrics()["deduplicated"] == 1
+
+
+def test_start_requeues_jobs_left_by_a_dead_process(store, make_queue):
+    queued_id, _ = store.create_or_join("queued.pdf", "queued")
+    running_id, _ = store.create_or_join("running.pdf", "running")
+    # Claimed by a process that died: its lease is already over
+    assert store.claim(running_id, "dead-worker", lease_seconds=-1)
+
+    job_queue = make_queue(lambda document_id: {"document": document_id})
+    job_queue.start()
+    wait_for(lambda: all(store.get(job_id)["status"] == DONE for job_id in (queued_id, running_id)))
+    assert store.get(running_id)["result"] == {"document": "running.pdf"}
+
+
+def test_start_leaves_jobs_leased_to_a_live_process(store, make_queue):
+    job_id, _ = store.create_or_join("a.pdf", "hash")
+    assert store.claim(job_id, "live-worker", lease_seconds=60)
+    calls = []
+
+    job_queue = make_queue(lambda document_id: calls.append(document_id) or {})
+    job_queue.start()
+    assert store.unfinished() == []
+    assert not store.claim(job_id, job_queue.owner, lease_seconds=60)
+    time.sleep(0.1)
+    assert calls == [] and store.get(job_id)["status"] == RUNNING
+
+
+def test_leases_are_renewed_while_a_job_runs(store, make_queue):
+    release = threading.Event()
+    job_queue = make_queue(lambda document_id: release.wait(5) and {}, lease_seconds=0.3)
+    job_id, _ = job_queue.submit("a.pdf", "hash")
+    wait_for(lambda: store.get(job_id)["status"] == RUNNING)
+    time.sleep(0.6)
+    assert not store.claim(job_id, "other-worker", lease_seconds=60)
+    release.set()
+    wait_for(lambda: store.get(job_id)["status"] == DONE)
+
+
+def test_handler_errors_mark_the_job_failed(make_queue):
+    def handler(document_id):
+        raise ValueError(f"cannot parse {document_id}")
+
+    job_queue = make_queue(handler)
+    job_id, _ = job_queue.submit("a.pdf", "hash")
+    wait_for(lambda: job_queue.store.get(job_id)["status"] == FAILED)
+    job = job_queue.store.get(job_id)
+    assert job["error"] == "cannot parse a.pdf" and job["result"] is None
+    assert job_queue.metrics()["failed"] == 1
+    # A failed job is not in flight, so the same upload gets a new job
+    assert job_queue.store.create_or_join("a.pdf", "hash")[1]
+
+
+def test_new_jobs_are_queued(store):
+    job_id, _ = store.create_or_join("a.pdf", "hash")
+    assert store.get(job_id)["status"] == QUEUED
+    assert store.unfinished() == [(job_id, "a.pdf")]
@@ -0,0 +1,115 @@
+"""LLMClientRegistry in backend/services/llm_service.py: client reuse and per-provider concurrency"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fake_chat_model import FakeChatModel
+from services import llm_service
+from services.llm_service import LLMClientRegistry, ainvoke_llm, get_llm, invoke_llm
+from shared.call_scheduler import CallScheduler
+
+RESUME_TEXT = "Jane Smith\nData engineer with 8 years of experience building pipelines."
+CONCURRENCY = 3
+
+
+class InFlightModel(FakeChatModel):
+    """FakeChatModel recording the most calls it had in flight at once"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._count_lock = threading.Lock()
+
+    def _enter(self):
+        with self._count_lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._count_lock:
+            self.in_flight -= 1
+
+    def invoke(self, prompt):
+        self._enter()
+        try:
+            return super().invoke(prompt)
+        finally:
+            self._exit()
+
+    async def ainvoke(self, prompt):
+        self._enter()
+        try:
+            return await super().ainvoke(prompt)
+        finally:
+            self._exit()
+
+
+@pytest.fixture
+def built(monkeypatch):
+    """Clients built by the registry, in order"""
+    clients = []
+
+    def factory(provider, temperature=0.5, top_p=0.95, model_name=None):
+        clients.append(InFlightModel(model_name=model_name or "fake-chat", temperature=temperature, latency=0.02, connect_latency=0))
+        return clients[-1]
+
+    monkeypatch.setattr(llm_service, "llm_clients", LLMClientRegistry(factory, concurrency=CONCURRENCY))
+    monkeypatch.setattr(llm_service, "llm_memo", None)
+    monkeypatch.setattr(llm_service, "call_scheduler", CallScheduler(rate_per_minute=1e9, burst=1e9))
+    return clients
+
+
+def call(provider):
+    return invoke_llm(get_llm(provider), RESUME_TEXT, "CV__summary")
+
+
+def test_one_client_per_provider_configuration(built):
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        list(executor.map(call, ["OpenAI"] * 12 + ["Google"] * 12))
+    assert [client.model_name for client in built] == ["fake-chat", "fake-chat"]
+    assert sorted(client.calls for client in built) == [12, 12]
+    assert get_llm("OpenAI") is get_llm("OpenAI") is not get_llm("OpenAI", temperature=0)
+    assert len(built) == 3
+
+
+def test_sync_calls_in_flight_stay_within_the_provider_limit(built):
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(call, ["OpenAI"] * 32))
+    assert len(built) == 1
+    assert built[0].max_in_flight == CONCURRENCY
+
+
+def test_async_calls_in_flight_stay_within_the_provider_limit(built):
+    async def main():
+        llm = get_llm("OpenAI")
+        await asyncio.gather(*(ainvoke_llm(llm, RESUME_TEXT, "CV__summary") for _ in range(32)))
+
+    asyncio.run(main())
+    assert len(built) == 1
+    assert built[0].calls == 32
+    assert built[0].max_in_flight == CONCURRENCY
+
+
+def test_sync_and_async_calls_share_one_client_and_limit(built):
+    async def main():
+        llm = get_llm("OpenAI")
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            sync_calls = [loop.run_in_executor(executor, call, "OpenAI") for _ in range(8)]
+            async_calls = [ainvoke_llm(llm, RESUME_TEXT, "CV__summary") for _ in range(8)]
+            await asyncio.gather(*sync_calls, *async_calls)
+
+    asyncio.run(main())
+    assert len(built) == 1
+    assert built[0].calls == 16
+    assert built[0].max_in_flight == CONCURRENCY
+
+
+def test_each_provider_has_its_own_limit(built):
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(call, ["OpenAI", "Google"] * 16))
+    assert len(built) == 2
+    assert all(client.max_in_flight == CONCURRENCY for client in built)
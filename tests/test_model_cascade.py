@@ -0,0 +1,177 @@
+"""ModelCascade in shared/model_cascade.py, alone and through backend invoke_cascade"""
+import json
+
+import pytest
+
+from bench_analysis_pipeline import RESPONSES
+from fake_chat_model import FakeAPIError, FakeChatModel
+from services import llm_service
+from services.analysis_pipeline import response_issue
+from services.llm_service import LLMClientRegistry, invoke_cascade
+from shared.call_scheduler import CallScheduler
+from shared.model_cascade import ModelCascade, ModelTier, parse_tiers
+
+TIERS = [ModelTier("small", "fake", 0.1, 0.4), ModelTier("medium", "fake", 1.0, 4.0), ModelTier("large", "fake", 5.0, 20.0)]
+
+
+class Calls:
+    """call(tier) answering from `results` per model (exceptions are raised) and recording the tiers tried"""
+
+    def __init__(self, **results):
+        self.results = results
+        self.models = []
+
+    def __call__(self, tier):
+        self.models.append(tier.model)
+        result = self.results[tier.model]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def short(result):
+    return "short_content" if len(result.split()) < 3 else None
+
+
+def test_accepted_result_stays_on_the_first_tier():
+    cascade = ModelCascade(TIERS)
+    call = Calls(small="a good long answer")
+
+    assert cascade.run(call, short) == "a good long answer"
+    assert call.models == ["small"]
+    stats = cascade.stats()["tiers"]
+    assert stats["small"]["accepted"] == 1
+    assert stats["medium"]["calls"] == 0
+
+
+def test_rejected_result_escalates_to_the_next_tier():
+    escalations = []
+    cascade = ModelCascade(TIERS, on_escalate=lambda tier, reason: escalations.append((tier.model, reason)))
+    call = Calls(small="too short", medium="a good long answer")
+
+    assert cascade.run(call, short) == "a good long answer"
+    assert call.models == ["small", "medium"]
+    assert escalations == [("small", "short_content")]
+    stats = cascade.stats()["tiers"]
+    assert stats["small"]["escalated"] == 1
+    assert stats["small"]["reasons"] == {"short_content": 1}
+    assert stats["medium"]["accepted"] == 1
+
+
+def test_errors_escalate_until_the_last_tier():
+    escalations = []
+    cascade = ModelCascade(TIERS, on_escalate=lambda tier, reason: escalations.append((tier.model, reason)))
+    call = Calls(small=FakeAPIError(503), medium="a good long answer")
+
+    assert cascade.run(call, short) == "a good long answer"
+    assert escalations == [("small", "FakeAPIError")]
+    assert cascade.stats()["tiers"]["small"]["errors"] == 1
+
+
+def test_last_tier_result_is_returned_unchecked():
+    checked = []
+
+    def reject(result):
+        checked.append(result)
+        return "short_content"
+
+    cascade = ModelCascade(TIERS)
+    call = Calls(small="a", medium="b", large="c")
+
+    # No further tier: the last result is kept even though the check would reject it
+    assert cascade.run(call, reject) == "c"
+    assert call.models == ["small", "medium", "large"]
+    assert checked == ["a", "b"]
+    assert cascade.stats()["tiers"]["large"]["accepted"] == 1
+
+
+def test_last_tier_errors_propagate():
+    cascade = ModelCascade(TIERS)
+    call = Calls(small="x", medium=FakeAPIError(500), large=FakeAPIError(400))
+
+    with pytest.raises(FakeAPIError) as error:
+        cascade.run(call, short)
+    assert error.value.status_code == 400
+    assert cascade.stats()["tiers"]["large"]["errors"] == 1
+
+
+def test_single_tier_is_never_checked():
+    cascade = ModelCascade(TIERS[:1])
+
+    assert cascade.run(Calls(small="x"), lambda result: pytest.fail("checked")) == "x"
+
+
+def test_token_costs_per_tier():
+    cascade = ModelCascade(TIERS)
+    cascade.record_tokens("small", 1_000_000, 500_000)
+    cascade.record_tokens("large", 2000, 1000)
+    cascade.record_tokens("unknown-model", 10**9, 10**9)
+
+    stats = cascade.stats()
+    assert stats["tiers"]["small"]["cost_usd"] == pytest.approx(0.3)
+    assert stats["tiers"]["large"]["cost_usd"] == pytest.approx(0.03)
+    assert stats["cost_usd"] == pytest.approx(0.33)
+
+
+def test_parse_tiers():
+    assert parse_tiers("openai/gpt-4o-mini:0.15:0.6, gpt-4o", default_provider="google") == [
+        ModelTier("gpt-4o-mini", "openai", 0.15, 0.6), ModelTier("gpt-4o", "google", 0.0, 0.0)
+    ]
+    with pytest.raises(ValueError):
+        parse_tiers("gpt-4o:0.15")
+    with pytest.raises(ValueError):
+        parse_tiers(" , ")
+
+
+@pytest.fixture
+def tier_models(monkeypatch):
+    """invoke_cascade over a small and a large fake tier; set .response per model"""
+    models = {}
+
+    def factory(provider, temperature=0.5, top_p=0.95, model_name=None):
+        return models.setdefault(model_name, FakeChatModel(model_name=model_name, latency=0, connect_latency=0))
+
+    monkeypatch.setattr(llm_service, "model_cascade", ModelCascade(TIERS[::2]))
+    monkeypatch.setattr(llm_service, "llm_clients", LLMClientRegistry(factory))
+    monkeypatch.setattr(llm_service, "llm_memo", None)
+    monkeypatch.setattr(llm_service, "call_scheduler", CallScheduler(rate_per_minute=1e9, burst=1e9))
+    for model in ("small", "large"):
+        factory("fake", model_name=model)
+    return models
+
+
+def overview(resume_text):
+    return invoke_cascade(
+        resume_text, "PROMPT_EVALUATE_RESUME",
+        lambda response: response_issue("PROMPT_EVALUATE_RESUME", response, 4),
+    )
+
+
+@pytest.mark.parametrize("cheap_response", [
+    "I cannot evaluate this resume.",
+    json.dumps({**RESPONSES["PROMPT_EVALUATE_RESUME"], "resume_cv_overview": "Good."}),
+])
+def test_invalid_or_short_responses_escalate(tier_models, cheap_response):
+    good = json.dumps(RESPONSES["PROMPT_EVALUATE_RESUME"])
+    tier_models["small"].response = cheap_response
+    tier_models["large"].response = good
+
+    assert overview("Jane Smith, data engineer.") == good
+    assert tier_models["small"].calls == tier_models["large"].calls == 1
+    reasons = llm_service.model_cascade.stats()["tiers"]["small"]["reasons"]
+    assert list(reasons) == ["invalid" if cheap_response.startswith("I ") else "short_content"]
+
+
+def test_good_response_stays_on_the_cheap_tier(tier_models):
+    good = json.dumps(RESPONSES["PROMPT_EVALUATE_RESUME"])
+    tier_models["small"].response = good
+
+    assert overview("Jane Smith, data engineer.") == good
+    assert tier_models["large"].calls == 0
+
+
+def test_last_tier_response_is_kept_when_every_tier_fails_the_check(tier_models):
+    tier_models["small"].response = tier_models["large"].response = "no JSON here"
+
+    assert overview("Jane Smith, data engineer.") == "no JSON here"
+    assert tier_models["small"].calls == tier_models["large"].calls == 1
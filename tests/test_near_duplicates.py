@@ -0,0 +1,60 @@
+"""NearDuplicateIndex in server/near_duplicates.py"""
+import sqlite3
+
+import pytest
+
+from near_duplicates import NearDuplicateIndex
+
+RESUME = " ".join(
+    f"Built batch and streaming pipeline number {i} on Spark and Kafka for the analytics team." for i in range(40)
+)
+EDITED = RESUME.replace("pipeline number 39", "pipeline number 390")
+
+
+@pytest.fixture
+def index(tmp_path):
+    return NearDuplicateIndex(tmp_path / "near_duplicates.sqlite", threshold=0.8)
+
+
+def test_matches_near_duplicates_of_the_same_version(index):
+    index.add("earlier", index.signature(RESUME), {"Skills": "abc"}, version="v1")
+
+    matches = index.query(index.signature(EDITED), version="v1")
+    assert [match.key for match in matches] == ["earlier"]
+    assert matches[0].similarity >= 0.8
+    assert matches[0].section_digests == {"Skills": "abc"}
+    assert index.query(index.signature(RESUME), exclude="earlier", version="v1") == []
+
+
+def test_ignores_entries_of_other_prompt_or_model_versions(index):
+    index.add("old-prompts", index.signature(RESUME), version="p1:flash")
+    index.add("other-models", index.signature(RESUME), version="p2:pro")
+
+    assert [match.key for match in index.query(index.signature(EDITED), version="p2:flash")] == []
+    assert [match.key for match in index.query(index.signature(EDITED), version="p2:pro")] == ["other-models"]
+
+
+def test_readding_a_key_replaces_its_version(index):
+    index.add("doc", index.signature(RESUME), version="v1")
+    index.add("doc", index.signature(RESUME), version="v2")
+
+    assert len(index) == 1
+    assert index.query(index.signature(RESUME), version="v1") == []
+    assert [match.key for match in index.query(index.signature(RESUME), version="v2")] == ["doc"]
+
+
+def test_entries_indexed_before_versioning_are_not_matched(tmp_path):
+    db_path = tmp_path / "near_duplicates.sqlite"
+    index = NearDuplicateIndex(db_path, threshold=0.8)
+    signature = index.signature(RESUME)
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute(
+            "CREATE TABLE documents ("
+            "id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, signature BLOB NOT NULL, sections TEXT NOT NULL)"
+        )
+        conn.execute("INSERT INTO documents (key, signature, sections) VALUES ('legacy', ?, '')", (signature.tobytes(),))
+
+    # The old documents table gains its version column on first use
+    assert index.query(signature, version="v1") == []
+    index.add("current", signature, version="v1")
+    assert [match.key for match in index.query(signature, version="v1")] == ["current"]
@@ -0,0 +1,78 @@
+"""ReportRenderer in backend/services/pdf_service.py: cache pruning around held reports"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from services.pdf_service import ReportRenderer
+
+REPORT_BYTES = 1000
+
+
+def fake_render(html_content, output_path):
+    output_path.write_bytes(b"%PDF-" + b"0" * (REPORT_BYTES - 5))
+
+
+def results(index):
+    return {"contact_info": {"candidate_name": f"Candidate {index}"}}
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    renderer = ReportRenderer(tmp_path, workers=2, render=fake_render, max_bytes=2 * REPORT_BYTES)
+    yield renderer
+    renderer.close()
+
+
+def render_all(renderer, indexes, hold=False):
+    async def run():
+        paths = []
+        for index in indexes:
+            path, _ = await renderer.render(results(index), hold=hold)
+            # Distinct mtimes, so pruning order is deterministic
+            os.utime(path, (time.time() + index, time.time() + index))
+            paths.append(path)
+        return paths
+
+    return asyncio.run(run())
+
+
+def test_prunes_the_oldest_reports_over_the_limit(renderer):
+    paths = render_all(renderer, range(4))
+
+    assert [path.exists() for path in paths] == [False, False, True, True]
+
+
+def test_held_reports_are_not_pruned_until_released(renderer):
+    held, = render_all(renderer, [0], hold=True)
+    others = render_all(renderer, range(1, 4))
+
+    assert held.exists()
+    assert renderer.stats()["held"] == 1
+    assert not others[0].exists()
+
+    renderer.release([held])
+    render_all(renderer, [4])
+    assert not held.exists()
+    assert renderer.stats()["held"] == 0
+
+
+def test_cached_report_can_be_held(renderer):
+    first, = render_all(renderer, [0])
+    again, = render_all(renderer, [0], hold=True)
+    render_all(renderer, range(1, 4))
+
+    assert again == first and first.exists()
+    renderer.release([again])
+
+
+def test_failed_render_releases_its_hold(tmp_path):
+    def failing_render(html_content, output_path):
+        raise OSError("wkhtmltopdf not found")
+
+    renderer = ReportRenderer(tmp_path, render=failing_render, max_bytes=REPORT_BYTES)
+    with pytest.raises(OSError):
+        render_all(renderer, [0], hold=True)
+    assert renderer.stats()["held"] == 0
+    renderer.close()
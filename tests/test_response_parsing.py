@@ -0,0 +1,97 @@
+"""shared/response_parsing.py against the malformed-response corpus in benchmarks/response_corpus.py"""
+import random
+from typing import Dict, List
+
+import pytest
+from pydantic import BaseModel, Field
+
+from models.resume_analysis import ResumeAnalysisResponse
+from response_corpus import chunks, iter_cases
+from shared.response_parsing import JSONStreamParser, extract_json, parse_response, validate
+
+CASES = list(iter_cases(400, seed=0))
+COMPLETE = [case for case in CASES if case["expected"] is not None]
+TRUNCATED = [case for case in CASES if case["expected"] is None]
+
+
+def case_id(case) -> str:
+    return f"{case['shape']}-{'+'.join(case['mutations']) or 'clean'}"
+
+
+class SectionAnalysis(BaseModel):
+    score: int = Field(ge=0, le=100)
+    content: str
+    suggestions: List[str]
+
+
+class OverviewAnalysis(BaseModel):
+    overview: str
+    strengths: List[str]
+    weaknesses: List[str]
+
+
+class BatchAnalysis(OverviewAnalysis):
+    sections: Dict[str, SectionAnalysis]
+
+
+MODELS = {
+    "section": SectionAnalysis,
+    "overview": OverviewAnalysis,
+    "batch": BatchAnalysis,
+    "backend": ResumeAnalysisResponse,
+}
+
+
+def stream(text: str, seed: int = 0) -> JSONStreamParser:
+    """A parser fed `text` in random-sized chunks, checking partial() after each one"""
+    parser = JSONStreamParser()
+    rng = random.Random(seed)
+    for chunk in chunks(text, rng):
+        parser.feed(chunk)
+        partial = parser.partial()
+        assert partial is None or isinstance(partial, (dict, list))
+    return parser
+
+
+def test_corpus_covers_truncated_responses():
+    assert TRUNCATED
+    assert {case["shape"] for case in COMPLETE} == set(MODELS)
+
+
+@pytest.mark.parametrize("case", COMPLETE, ids=case_id)
+def test_extract_json_recovers_case(case):
+    assert extract_json(case["text"]) == case["expected"]
+
+
+@pytest.mark.parametrize("case", COMPLETE, ids=case_id)
+def test_stream_parser_completes_case(case):
+    objects = [value for value in stream(case["text"]).values if isinstance(value, dict)]
+    assert objects and objects[0] == case["expected"]
+
+
+@pytest.mark.parametrize("case", COMPLETE, ids=case_id)
+def test_validator_accepts_case(case):
+    model = MODELS[case["shape"]]
+    assert isinstance(validate(case["expected"], model), model)
+    assert isinstance(parse_response(case["text"], model), model)
+
+
+@pytest.mark.parametrize("case", TRUNCATED, ids=case_id)
+def test_truncated_case_is_rejected_but_partial(case):
+    with pytest.raises(ValueError):
+        extract_json(case["text"])
+    parser = stream(case["text"])
+    assert not [value for value in parser.values if isinstance(value, dict)]
+    assert isinstance(parser.partial(), (dict, list))
+
+
+def test_partial_grows_with_truncated_overview():
+    text = '{"overview": "Strong backend engineer", "strengths": ["Leads migrations", "Quantifies imp'
+    parser = JSONStreamParser()
+    parser.feed(text[:40])
+    assert parser.partial() == {"overview": "Strong backend engineer"}
+    parser.feed(text[40:])
+    partial = parser.partial()
+    assert partial["overview"] == "Strong backend engineer"
+    assert partial["strengths"][0] == "Leads migrations"
+    assert parser.values == []
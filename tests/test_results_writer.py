@@ -0,0 +1,123 @@
+"""ResultsWriter in server/results_writer.py, against the SQLite backend"""
+import sqlite3
+import time
+
+import pytest
+
+from results_writer import ANALYSES_TABLE, SCORES_TABLE, ResultsWriter, SQLiteResultsBackend, create_results_writer
+
+RESULTS = {
+    "overview": "Data engineer.",
+    "sections": [
+        {"name": "Skills", "score": 80, "content": "Broad skills.", "suggestions": ["Add Spark"]},
+        {"name": "Education", "score": 0, "content": "Analysis failed: timeout", "suggestions": [], "failed": True},
+    ],
+    "overallScore": 80,
+}
+
+
+class FlakyBackend(SQLiteResultsBackend):
+    """SQLite backend whose first `failures` writes raise"""
+
+    def __init__(self, db_path, failures=1):
+        super().__init__(db_path)
+        self.failures = failures
+        self.writes = []
+
+    def write(self, table, rows):
+        self.writes.append((table, len(rows)))
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("backend unavailable")
+        super().write(table, rows)
+
+
+def count(db_path, table):
+    with sqlite3.connect(str(db_path)) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "results.sqlite"
+
+
+def test_flushes_once_max_rows_are_buffered(db_path):
+    # Each analysis buffers two rows: the analysis and its one scored section
+    writer = ResultsWriter(SQLiteResultsBackend(db_path), max_rows=4, flush_interval=60)
+    try:
+        writer.add_analysis("a1", "a1.pdf", RESULTS)
+        time.sleep(0.1)
+        assert writer.stats()["pending_rows"] == 2
+        assert count(db_path, ANALYSES_TABLE) == 0
+
+        writer.add_analysis("a2", "a2.pdf", RESULTS)
+        assert wait_for(lambda: count(db_path, ANALYSES_TABLE) == 2)
+        assert count(db_path, SCORES_TABLE) == 2
+        assert writer.stats()["pending_rows"] == 0
+    finally:
+        writer.close()
+
+
+def test_flushes_after_the_interval(db_path):
+    writer = ResultsWriter(SQLiteResultsBackend(db_path), max_rows=1000, flush_interval=0.05)
+    try:
+        writer.add_analysis("a1", "a1.pdf", RESULTS)
+        assert wait_for(lambda: count(db_path, ANALYSES_TABLE) == 1)
+        assert writer.stats()["flushes"] == 1
+    finally:
+        writer.close()
+
+
+def test_failed_sections_are_not_scored(db_path):
+    writer = create_results_writer(f"sqlite:{db_path}", flush_interval=60)
+    writer.add_analysis("a1", "a1.pdf", RESULTS)
+    writer.close()
+
+    with sqlite3.connect(str(db_path)) as conn:
+        assert conn.execute(f"SELECT id, sectionName, score FROM {SCORES_TABLE}").fetchall() == [("a1:0", "Skills", 80)]
+
+
+def test_failed_flush_is_retried_without_duplicates(db_path):
+    backend = FlakyBackend(db_path)
+    writer = ResultsWriter(backend, max_rows=1000, flush_interval=60)
+    try:
+        writer.add_analysis("a1", "a1.pdf", RESULTS)
+        writer.flush()
+        assert writer.stats()["flush_errors"] == 1
+        assert writer.stats()["pending_rows"] == 2
+
+        writer.flush()
+        # Writing the same analysis again replaces its rows
+        writer.add_analysis("a1", "a1.pdf", RESULTS)
+        writer.flush()
+    finally:
+        writer.close()
+
+    assert count(db_path, ANALYSES_TABLE) == 1
+    assert count(db_path, SCORES_TABLE) == 1
+    assert backend.writes[:3] == [(ANALYSES_TABLE, 1), (ANALYSES_TABLE, 1), (SCORES_TABLE, 1)]
+    assert writer.stats()["rows_written"] == 4
+
+
+def test_close_flushes_the_remaining_rows(db_path):
+    writer = ResultsWriter(SQLiteResultsBackend(db_path), max_rows=1000, flush_interval=60)
+    writer.add_analysis("a1", "a1.pdf", RESULTS)
+    writer.add_analysis("a2", "a2.pdf", RESULTS, status="failed")
+    assert count(db_path, ANALYSES_TABLE) == 0
+
+    writer.close()
+    assert count(db_path, ANALYSES_TABLE) == 2
+    assert count(db_path, SCORES_TABLE) == 2
+    assert writer.stats()["pending_rows"] == 0
+    # Closing twice is harmless
+    writer.close()